@@ -0,0 +1,49 @@
+"""
+Compares the precompiled keyword classifier against the list scans it replaced.
+
+Usage: python benchmarks/classifier_benchmark.py [copies]
+"""
+
+import sys
+import timeit
+
+from lcwc.feed import FeedParser
+from lcwc.feed.utils import (
+    CLASSIFIER,
+    FIRE_UNIT_NAMES,
+    LOCATION_NAMES,
+    MEDICAL_UNIT_NAMES,
+)
+
+sys.path.insert(0, "benchmarks")
+
+from feed_parser_benchmark import make_feed
+
+
+def scan_segment(segment: str) -> bool:
+    """The previous implementation: a list scan that rebuilt the keyword list per call"""
+    if any(k in segment.split() for k in FIRE_UNIT_NAMES + MEDICAL_UNIT_NAMES):
+        return True
+    return any(k in segment for k in LOCATION_NAMES)
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    entries = FeedParser().read_entries(make_feed(copies))
+    segments = [
+        segment for entry in entries for segment in entry.description.split(";")[1:]
+    ]
+    number = 20
+
+    scan = timeit.timeit(lambda: [scan_segment(s) for s in segments], number=number)
+    compiled = timeit.timeit(
+        lambda: [CLASSIFIER.classify_segment(s) for s in segments], number=number
+    )
+
+    print(f"{len(segments):,} segments")
+    print(f"list scan   {scan / number * 1000:>10.3f} ms")
+    print(f"classifier  {compiled / number * 1000:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compares the size and throughput of the compact binary codec against the JSON encoders.
+
+Usage: python benchmarks/codec_benchmark.py [copies]
+"""
+
+import io
+import json
+import sys
+import timeit
+
+sys.path.insert(0, "tests")
+
+from lcwc.utils import encoding
+from lcwc.utils.compact import CompactCodec
+from lcwc.utils.encoding import IncidentEncoder
+from samples import make_incidents
+
+
+def report(name: str, size: int, encode_time: float, decode_time: float, count: int):
+    print(
+        f"{name:<16} {size:>10,} bytes  "
+        f"encode {count / encode_time:>12,.0f}/s  decode {count / decode_time:>12,.0f}/s"
+    )
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    incidents = make_incidents() * copies
+    count = len(incidents)
+    number = 5
+
+    print(f"{count:,} incidents, JSON backend: {encoding.JSON_BACKEND}")
+
+    data = json.dumps(incidents, cls=IncidentEncoder)
+    encode_time = timeit.timeit(
+        lambda: json.dumps(incidents, cls=IncidentEncoder), number=number
+    )
+    # the legacy decoder can't decode a list so decode the dicts directly
+    decode_time = timeit.timeit(
+        lambda: [type(i).from_dict(d) for i, d in zip(incidents, json.loads(data))],
+        number=number,
+    )
+    report(
+        "IncidentEncoder", len(data), encode_time / number, decode_time / number, count
+    )
+
+    def dump() -> bytes:
+        buffer = io.BytesIO()
+        encoding.dump_ndjson(incidents, buffer)
+        return buffer.getvalue()
+
+    data = dump()
+    encode_time = timeit.timeit(dump, number=number)
+    decode_time = timeit.timeit(
+        lambda: list(encoding.iter_ndjson(io.BytesIO(data))), number=number
+    )
+    report("ndjson", len(data), encode_time / number, decode_time / number, count)
+
+    codec = CompactCodec()
+    data = codec.encode(incidents)
+    encode_time = timeit.timeit(lambda: codec.encode(incidents), number=number)
+    decode_time = timeit.timeit(lambda: codec.decode(data), number=number)
+    report("CompactCodec", len(data), encode_time / number, decode_time / number, count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Compares the ElementTree feed reader against feedparser on a large feed built from the fixture.
+
+Usage: python benchmarks/feed_parser_benchmark.py [copies]
+"""
+
+import re
+import sys
+import timeit
+
+from lcwc.agencies.agencyresolver import AgencyResolver
+from lcwc.feed import FeedParser
+
+
+def make_feed(copies: int) -> bytes:
+    """Replicates the items of the fixture feed, giving each copy unique guids"""
+    with open("tests/fixtures/feed.xml", "rb") as f:
+        feed = f.read()
+    start = feed.index(b"<item>")
+    end = feed.rindex(b"</item>") + len(b"</item>")
+    items = feed[start:end]
+
+    copied = b"".join(
+        re.sub(rb"<guid([^>]*)>", rb"<guid\1>%d-" % i, items) for i in range(copies)
+    )
+    return feed[:start] + copied + feed[end:]
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    feed = make_feed(copies)
+    resolver = AgencyResolver()
+    number = 5
+
+    parsers = [("feedparser", FeedParser(fast=False)), ("ElementTree", FeedParser())]
+    count = len(parsers[0][1].parse(feed, resolver))
+    print(f"{count:,} items, {len(feed):,} bytes")
+
+    for name, parser in parsers:
+        read = timeit.timeit(lambda: parser.read_entries(feed), number=number)
+        parse = timeit.timeit(lambda: parser.parse(feed, resolver), number=number)
+        print(
+            f"{name:<12} read {read / number * 1000:>10.3f} ms  "
+            f"parse {parse / number * 1000:>10.3f} ms  "
+            f"{count * number / parse:>10,.0f} incidents/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
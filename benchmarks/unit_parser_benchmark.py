@@ -0,0 +1,49 @@
+"""
+Compares parsing the units of a busy ArcGIS layer one at a time against the batch parser.
+
+Usage: python benchmarks/unit_parser_benchmark.py [copies]
+"""
+
+import json
+import sys
+import timeit
+
+from lcwc.agencies.agencyresolver import AgencyResolver
+from lcwc.category import IncidentCategory
+from lcwc.utils.unitparser import UnitParser
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    resolver = AgencyResolver()
+
+    names = []
+    for layer in range(3):
+        with open(f"tests/fixtures/arcgis_{layer}.json") as f:
+            for feature in json.load(f)["features"]:
+                units = feature["attributes"].get("CurrentUnits")
+                if units:
+                    names.extend(units.split(","))
+    # a storm or mass-casualty poll repeats the same units across many incidents
+    names = names * copies
+    number = 10
+
+    single = timeit.timeit(
+        lambda: [
+            UnitParser.parse_unit(name, IncidentCategory.FIRE, resolver)
+            for name in names
+        ],
+        number=number,
+    )
+    batch = timeit.timeit(
+        lambda: UnitParser.parse_units(names, IncidentCategory.FIRE, resolver),
+        number=number,
+    )
+
+    print(f"{len(names):,} unit assignments")
+    print(f"parse_unit   {single / number * 1000:>10.3f} ms/poll")
+    print(f"parse_units  {batch / number * 1000:>10.3f} ms/poll")
+
+
+if __name__ == "__main__":
+    main()
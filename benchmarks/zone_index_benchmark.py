@@ -0,0 +1,66 @@
+"""
+Compares zone assignment with the grid index (scalar and NumPy) against testing every polygon.
+
+Usage: python benchmarks/zone_index_benchmark.py [grid size] [points]
+"""
+
+import math
+import random
+import sys
+import timeit
+
+from lcwc.zones import Zone, ZoneIndex, numpy
+
+
+def make_zones(size: int) -> list[Zone]:
+    """Builds a size x size grid of 32-sided polygons tiling the county's extent"""
+    width, height = 0.7 / size, 0.5 / size
+    zones = []
+    for col in range(size):
+        for row in range(size):
+            cx, cy = -76.7 + (col + 0.5) * width, 39.7 + (row + 0.5) * height
+            angles = [2 * math.pi * k / 32 for k in range(33)]
+            xs = tuple(cx + width / 2 * math.cos(a) for a in angles)
+            ys = tuple(cy + height / 2 * math.sin(a) for a in angles)
+            zones.append(Zone(f"{col}-{row}", {}, [[(xs, ys)]]))
+    return zones
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    zones = make_zones(size)
+    index = ZoneIndex(zones)
+
+    rng = random.Random(0)
+    points = [
+        (rng.uniform(-76.7, -76.0), rng.uniform(39.7, 40.2)) for _ in range(count)
+    ]
+    number = 5
+
+    def naive():
+        return [
+            next((zone for zone in zones if zone.contains(x, y)), None)
+            for x, y in points
+        ]
+
+    assert naive() == index.locate_many(points, vectorized=False)
+
+    brute = timeit.timeit(naive, number=number)
+    grid = timeit.timeit(
+        lambda: index.locate_many(points, vectorized=False), number=number
+    )
+
+    print(f"{len(zones):,} zones, {count:,} points")
+    print(f"every polygon {brute / number * 1000:>10.3f} ms")
+    print(f"grid index    {grid / number * 1000:>10.3f} ms")
+    if numpy is not None:
+        assert naive() == index.locate_many(points, vectorized=True)
+        vectorized = timeit.timeit(
+            lambda: index.locate_many(points, vectorized=True), number=number
+        )
+        print(f"grid + NumPy  {vectorized / number * 1000:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
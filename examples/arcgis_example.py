@@ -1,13 +1,11 @@
-import aiohttp
 import asyncio
 from lcwc.arcgis import ArcGISClient
 
 
 async def main():
-    client = ArcGISClient()
-
-    async with aiohttp.ClientSession() as session:
-        incidents = await client.get_incidents(session)
+    # the client creates and owns a pooled session for the duration of the block
+    async with ArcGISClient() as client:
+        incidents = await client.get_incidents()
 
         for incident in incidents:
             print("-----")
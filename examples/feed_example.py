@@ -1,13 +1,11 @@
-import aiohttp
 import asyncio
 from lcwc.feed import FeedClient
 
 
 async def main():
-    client = FeedClient()
-
-    async with aiohttp.ClientSession() as session:
-        incidents = await client.get_incidents(session)
+    # the client creates and owns a pooled session for the duration of the block
+    async with FeedClient() as client:
+        incidents = await client.get_incidents()
 
         for incident in incidents:
             print("-----")
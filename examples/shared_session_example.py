@@ -0,0 +1,27 @@
+import asyncio
+from lcwc.arcgis import ArcGISClient
+from lcwc.feed import FeedClient
+from lcwc.utils.session import create_session
+from lcwc.web import WebClient
+
+
+async def main():
+    # a single pooled session keeps TLS connections to each host warm between polls
+    async with create_session() as session:
+        clients = [
+            FeedClient(session=session),
+            WebClient(session=session),
+            ArcGISClient(session=session),
+        ]
+
+        for _ in range(3):
+            results = await asyncio.gather(*[c.get_incidents() for c in clients])
+
+            for client, incidents in zip(clients, results):
+                print(f"{client.name}: {len(incidents)} incidents")
+
+            await asyncio.sleep(30)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,13 +1,11 @@
-import aiohttp
 import asyncio
 from lcwc.web import WebClient
 
 
 async def main():
-    client = WebClient()
-
-    async with aiohttp.ClientSession() as session:
-        incidents = await client.get_incidents(session)
+    # the client creates and owns a pooled session for the duration of the block
+    async with WebClient() as client:
+        incidents = await client.get_incidents()
 
         for incident in incidents:
             print("-----")
@@ -0,0 +1,5 @@
+import sys
+
+from lcwc.cli import main
+
+sys.exit(main())
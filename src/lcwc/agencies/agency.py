@@ -32,6 +32,17 @@ class Agency(BaseModel):
     """ The phone number of the agency """
     phone: str
 
+    def to_dict(self) -> dict:
+        """Returns a JSON-compatible dictionary representation of the agency"""
+        d = dict(self)
+        d["category"] = self.category.value
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Agency":
+        """Creates an agency from a dictionary produced by to_dict"""
+        return cls(**d)
+
     def __eq__(self, other):
         if not isinstance(other, Agency):
             return False
@@ -39,3 +50,6 @@ class Agency(BaseModel):
             self.category == other.category
             and self.station_number == other.station_number
         )
+
+    def __hash__(self) -> int:
+        return hash((self.category, self.station_number))
@@ -4,21 +4,35 @@ from lcwc.category import IncidentCategory
 
 import aiohttp
 from bs4 import BeautifulSoup
+from typing import Optional
 
 
 import logging
 
+from lcwc.utils.cache import CachedResponse, ResponseCache, cache_key
+
 
 class AgencyClient:
     """Client used for fetching lists of agencies from the LCWC website"""
 
-    def __init__(self) -> None:
+    URL = "https://www.lcwc911.us/about/agencies-dispatched"
+    """ The URL of the agency list """
+
+    def __init__(self, cache: Optional[ResponseCache] = None) -> None:
+        """
+        :param cache: (optional) A response cache, so processes resolving agencies at the same
+            time fetch the agency pages once
+        """
+        self.cache = cache
         self.logger = logging.getLogger(__name__)
 
     async def get_agencies(
         self, session: aiohttp.ClientSession, categories: list[IncidentCategory]
     ) -> list[Agency]:
-        """Fetches a list of agencies for the given categories"""
+        """Fetches a list of agencies for the given categories
+
+        :raises aiohttp.ClientResponseError: If an agency page responds with an error status
+        """
 
         # ids are not zero-indexed unlike almost everywhere else
         id_map = {
@@ -34,14 +48,45 @@ class AgencyClient:
             if cat not in id_map:
                 self.logger.error(f"Invalid category in agency lookup: {cat}")
             id = id_map[cat]
-            url = f"https://www.lcwc911.us/about/agencies-dispatched?field_agency_type_target_id={id}"
+            url = f"{self.URL}?field_agency_type_target_id={id}"
 
-            async with session.get(url) as resp:
-                parsed_agencies = self.__parse_agencies_page(await resp.text(), cat)
-                agencies.extend(parsed_agencies)
+            html = await self.__fetch(session, url)
+            parsed_agencies = self.__parse_agencies_page(html, cat)
+            agencies.extend(parsed_agencies)
 
         return agencies
 
+    async def __fetch(self, session: aiohttp.ClientSession, url: str) -> str:
+        # error pages are raised rather than parsed, whether or not a cache is used
+        async def fetch() -> CachedResponse:
+            async with session.get(url) as resp:
+                resp.raise_for_status()
+                return CachedResponse(
+                    await resp.read(),
+                    str(resp.url),
+                    resp.status,
+                    resp.reason or "",
+                    {"Content-Type": resp.headers.get("Content-Type", "")},
+                )
+
+        if self.cache is None:
+            response = await fetch()
+        else:
+            response = await self.cache.fetch(cache_key(url), fetch)
+        try:
+            return response.body.decode(self.__charset(response), errors="replace")
+        except LookupError:  # unknown charset
+            return response.body.decode("utf-8", errors="replace")
+
+    @staticmethod
+    def __charset(response: CachedResponse) -> str:
+        content_type = response.headers.get("Content-Type", "")
+        for param in content_type.split(";")[1:]:
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "charset" and value:
+                return value.strip('"')
+        return "utf-8"
+
     def __parse_agencies_page(
         self, html: str, category: IncidentCategory
     ) -> list[Agency]:
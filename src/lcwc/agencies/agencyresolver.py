@@ -12,12 +12,16 @@ class AgencyResolver:
 
     def __init__(self, load_known: bool = True):
         self.agencies = ALL_KNOWN_AGENCIES if load_known else []
+        self._station_index: dict[IncidentCategory, dict[str, Agency]] = {}
+        self._indexed_count = 0
 
     def add_agency(self, agency: Agency):
         self.agencies.append(agency)
+        self._station_index.clear()
 
     def remove_agency(self, agency: Agency):
         self.agencies.remove(agency)
+        self._station_index.clear()
 
     def get_agency(self, station_id: str, category: IncidentCategory) -> Agency:
         """Attempts to find the agency associated with the given station id and category within the list of agencies provided"""
@@ -25,6 +29,25 @@ class AgencyResolver:
             if agency.station_number == station_id and agency.category == category:
                 return agency
 
+    def get_station_index(self, category: IncidentCategory) -> dict[str, Agency]:
+        """Returns a mapping of station id to agency for the given category, for bulk lookups
+
+        The index is built once per category and rebuilt when the agencies change. Like
+        get_agency, the first agency listed for a station wins.
+        """
+        if self._indexed_count != len(self.agencies):
+            self._station_index.clear()
+            self._indexed_count = len(self.agencies)
+
+        index = self._station_index.get(category)
+        if index is None:
+            index = {}
+            for agency in self.agencies:
+                if agency.category == category:
+                    index.setdefault(agency.station_number, agency)
+            self._station_index[category] = index
+        return index
+
     def get_agencies(self, category: IncidentCategory) -> list[Agency]:
         return [agency for agency in self.agencies if agency.category == category]
 
@@ -1,2 +1,3 @@
 from .client import ArcGISClient
 from .incident import ArcGISIncident
+from .query import ArcGISQuery
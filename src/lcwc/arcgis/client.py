@@ -1,30 +1,108 @@
+import asyncio
 import logging
 import aiohttp
 import datetime
 import json
-import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Union
 
 import pytz
 from lcwc import Client
 from lcwc.agencies.agencyresolver import AgencyResolver
-from lcwc.agencies.exceptions import OutOfCountyException, PendingUnitException
 from lcwc.arcgis.incident import ArcGISIncident, Coordinates
+from lcwc.arcgis.query import ArcGISQuery
 from lcwc.category import IncidentCategory
 from lcwc.unit import Unit
+from lcwc.normalize import collapse_whitespace
+from lcwc.utils import instrumentation
+from lcwc.utils.diagnostics import INVALID_FEATURE, ParseDiagnostics
+from lcwc.utils.instrumentation import FETCH, LOCATE, PARSE, RESOLVE
+from lcwc.utils.cache import ResponseCache
+from lcwc.utils.resilience import Resilience
 from lcwc.utils.restadapter import RestAdapter, RestException
 from lcwc.utils.unitparser import UnitParser
 
+if TYPE_CHECKING:
+    from lcwc.zones import ZoneIndex
+
 
 class ArcGISException(Exception):
     pass
 
 
+HOSTNAME = "utility.arcgis.com"
+""" The host of the ArcGIS REST API """
+
+BASE = "usrsvcs/servers/a1f6aa7faab44b1582029509c46dce86/rest/services/Maps/Public_LiveFeeds/MapServer/"
+""" The path of the live feeds map service """
+
+LOCATION_FIELDS = ("IncidentMunicipality", "PublicLocation")
+""" The attributes that, when changed, mean an incident's geometry must be fetched again """
+
+
+@dataclass
+class CachedFeature:
+    """A feature kept between incremental polls"""
+
+    """ The attributes of the feature when it was last parsed """
+    attributes: dict
+
+    """ The geometry of the feature """
+    geometry: dict
+
+    """ The incident parsed from the feature """
+    incident: ArcGISIncident
+
+
 class ArcGISClient(Client):
     """Client for the ArcGIS REST API"""
 
-    def __init__(self, agency_resolver: AgencyResolver = AgencyResolver()) -> None:
-        super().__init__()
+    MIN_POLL_INTERVAL = 30
+    """ Each poll queries every layer and may page or fetch geometry """
+
+    def __init__(
+        self,
+        agency_resolver: AgencyResolver = AgencyResolver(),
+        session: Optional[aiohttp.ClientSession] = None,
+        resilience: Optional[Resilience] = None,
+        zone_index: Union[
+            "ZoneIndex", dict[IncidentCategory, "ZoneIndex"], None
+        ] = None,
+        incremental: bool = False,
+        hostname: str = HOSTNAME,
+        base: str = BASE,
+        scheme: str = "https",
+        query: Optional[ArcGISQuery] = None,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
+        """
+        :param agency_resolver: Resolves the agencies of units
+        :param session: (optional) A shared session, see Client
+        :param resilience: (optional) The retry and circuit breaker policy for requests
+        :param zone_index: (optional) The response zones incidents are assigned to after
+            parsing, either one index for every category or an index per category
+            (ex: fire boxes for fire incidents and first-due areas for medical incidents)
+        :param incremental: Whether to poll incrementally: each layer is queried without
+            geometry, only new or changed features are parsed, and geometry is only fetched
+            (by object id) for incidents that are new or have moved
+        :param hostname: The host of the ArcGIS REST API
+        :param base: The path of the map service
+        :param scheme: The URL scheme of the ArcGIS REST API
+        :param query: (optional) The layers, fields, envelope and paging of the layer queries
+        :param cache: (optional) A response cache shared with other clients, see Client
+        """
+        super().__init__(session, resilience, cache)
         self.agency_resolver = agency_resolver
+        self.zone_index = zone_index
+        self.incremental = incremental
+        self.hostname = hostname
+        self.base = base
+        self.scheme = scheme
+        self.query = query or ArcGISQuery()
+        self.features: dict[IncidentCategory, dict[int, CachedFeature]] = {}
+        """ The features of the last incremental poll, by category and incident number """
+        self.object_id_fields: dict[IncidentCategory, str] = {}
+        """ The object id field of each layer, as named by its last incremental query """
         self.logger = logging.getLogger(__name__)
 
     @property
@@ -33,186 +111,484 @@ class ArcGISClient(Client):
 
     async def get_incidents(
         self,
-        session: aiohttp.ClientSession,
+        session: aiohttp.ClientSession = None,
         timeout: int = 10,
         throw_on_error: bool = False,
     ) -> list[ArcGISIncident]:
         """Fetches the page and parses the contents and returns a list of incidents"""
 
-        layer_mapping = {
-            IncidentCategory.FIRE: 0,
-            IncidentCategory.MEDICAL: 1,
-            IncidentCategory.TRAFFIC: 2,
-        }
-
-        # some fields are only present for certain incident types (ex: Priority is only present for medical and traffic)
-        fields = {
-            IncidentCategory.FIRE: [
-                "IncidentNumber",
-                "IncidentMunicipality",
-                "IncidentOrigination",
-                "PrimaryAgency",
-                "CurrentUnits",
-                "PublicLocation",
-                "PublicType",
-                "IsPublic",
-            ],
-            IncidentCategory.MEDICAL: [
-                "IncidentNumber",
-                "IncidentMunicipality",
-                "IncidentOrigination",
-                "PrimaryAgency",
-                "CurrentUnits",
-                "PublicLocation",
-                "PublicType",
-                "IsPublic",
-                "Priority",
-            ],
-            IncidentCategory.TRAFFIC: [
-                "IncidentNumber",
-                "IncidentMunicipality",
-                "IncidentOrigination",
-                "PrimaryAgency",
-                "CurrentUnits",
-                "PublicLocation",
-                "PublicType",
-                "IsPublic",
-                "Priority",
-            ],
-        }
+        session = self._get_session(session)
+        adapter = RestAdapter(
+            session,
+            self.hostname,
+            self.base,
+            resilience=self.resilience,
+            scheme=self.scheme,
+            cache=self.cache,
+            name=self.name,
+        )
 
         incidents = []
+        diagnostics = ParseDiagnostics(self.name)
 
         for cat in IncidentCategory:
-            if cat == IncidentCategory.UNKNOWN:
+            if cat not in self.query.layers:
                 continue
 
-            if cat not in layer_mapping:
-                self.logger.error(f"No layer mapping for {cat}")
+            params = self.query.params(cat)
+            if self.incremental:
+                # geometry is fetched separately by object id, which is needed to do so
+                params["returnGeometry"] = "false"
+                params.pop("outSR", None)
+                params["outFields"] += "," + self.object_id_fields.get(cat, "OBJECTID")
+
+            data = await self.__query_all(adapter, cat, params, throw_on_error)
+            if data is None:
                 continue
 
-            layer_id = layer_mapping[cat]
-
-            """ Actual spatial extent of Lancaster County based LanCo GIS data
-            lanco_spatial = {
-                'xmin': -8548898.732776089,
-                'ymin': 4845979.963808246,
-                'xmax': -8432714.449782776,
-                'ymax': 4909881.3194545675,
-                'spatialReference': {
-                    'wkid': 102100
-                }
-            }
-            """
-
-            # seems we need to expand the spatial extent to get all incidents
-            lanco_spatial = {
-                "xmin": -8657540.868810708,
-                "ymin": 4794222.228992932,
-                "xmax": -8290643.133041878,
-                "ymax": 5048910.407239126,
-                "spatialReference": {"wkid": 102100},
-            }
-
-            params = {
-                "f": "json",
-                "where": "1=1",
-                "returnGeometry": "true",
-                "spatialRel": "esriSpatialRelIntersects",
-                "geometry": json.dumps(lanco_spatial),
-                "geometryType": "esriGeometryEnvelope",
-                "inSR": 102100,
-                "outFields": ",".join(fields[cat]),
-                "outSR": 4326,  # return coordinates in WGS84
-                "currentTimestamp": int(
-                    datetime.datetime.now().timestamp() * 1000
-                ),  # add a timestamp to prevent caching
-            }
-
-            adapter = RestAdapter(
-                session,
-                "utility.arcgis.com",
-                "usrsvcs/servers/a1f6aa7faab44b1582029509c46dce86/rest/services/Maps/Public_LiveFeeds/MapServer/",
-            )
+            if self.incremental:
+                parsed = await self.__update_features(
+                    adapter, cat, data, diagnostics, throw_on_error
+                )
+            else:
+                with instrumentation.span(
+                    PARSE, source=self.name, layer=self.query.layers[cat]
+                ):
+                    parsed = self.parse_features(cat, data["features"], diagnostics)
 
-            try:
+            self.assign_zones(cat, parsed)
+            incidents.extend(parsed)
+
+        diagnostics.publish()
+        if diagnostics:
+            self.logger.debug("Parse failures: %s", diagnostics.counts)
+        self.diagnostics = diagnostics
+
+        return incidents
+
+    async def __query(
+        self,
+        adapter: RestAdapter,
+        category: IncidentCategory,
+        params: dict,
+        throw_on_error: bool,
+    ) -> Optional[dict]:
+        layer_id = self.query.layers[category]
+        params = {
+            **params,
+            "currentTimestamp": int(
+                datetime.datetime.now().timestamp() * 1000
+            ),  # add a timestamp to prevent caching
+        }
+
+        try:
+            with instrumentation.span(FETCH, source=self.name, layer=layer_id):
                 resp = await adapter.get(endpoint=f"{layer_id}/query", ep_params=params)
 
-            except RestException as e:
-                self.logger.error(f"{cat} Error: {e}")
-                if throw_on_error:
-                    raise e
-                continue
+        except RestException as e:
+            self.logger.error(f"{category} Error: {e}")
+            if throw_on_error:
+                raise e
+            return None
 
-            self.logger.debug(f"{resp.url}")
+        self.logger.debug(f"{resp.url}")
 
-            if resp.status_code != 200:
-                if throw_on_error:
-                    raise ArcGISException(error)
-                self.logger.error(f"Error: {resp.status_code} for {cat}")
-                continue
+        if resp.status_code != 200:
+            if throw_on_error:
+                raise ArcGISException(f"Error: {resp.status_code} for {category}")
+            self.logger.error(f"Error: {resp.status_code} for {category}")
+            return None
 
-            error = resp.data.get("error", None)
-            if error:
-                if throw_on_error:
-                    raise ArcGISException(error)
-                self.logger.error(f"Response error: {error}")
-                continue
+        error = resp.data.get("error", None)
+        if error:
+            if throw_on_error:
+                raise ArcGISException(error)
+            self.logger.error(f"Response error: {error}")
+            return None
+
+        return resp.data
 
-            if "features" not in resp.data:
+    async def __query_all(
+        self,
+        adapter: RestAdapter,
+        category: IncidentCategory,
+        params: dict,
+        throw_on_error: bool,
+    ) -> Optional[dict]:
+        """Queries a layer, fetching the remaining pages when the first exceeds the transfer limit
+
+        The remaining pages are fetched concurrently once their number is known from a count
+        query. If any page fails the layer is treated as failed (None is returned, or the error
+        raised with throw_on_error), since a partial layer would report the incidents of the
+        missing page as removed.
+        """
+        page_size = self.query.page_size
+        first = params
+        if page_size:
+            first = {**params, "resultOffset": 0, "resultRecordCount": page_size}
+        data = await self.__query(adapter, category, first, throw_on_error)
+        if data is None or "features" not in data:
+            return None
+        if not data.get("exceededTransferLimit"):
+            return data
+
+        features = list(data["features"])
+        # without a page size, the server's limit is whatever it returned
+        page_size = page_size or len(features)
+        if not page_size:
+            return data
+
+        async def fetch(offset: int, semaphore: asyncio.Semaphore) -> Optional[dict]:
+            page = {**params, "resultOffset": offset, "resultRecordCount": page_size}
+            async with semaphore:
+                result = await self.__query(adapter, category, page, throw_on_error)
+            if result is None or "features" not in result:
+                self.logger.warning(f"{category}: page at {offset} failed")
+                return None
+            return result
+
+        semaphore = asyncio.Semaphore(self.query.max_concurrency)
+        offset = len(features)
+        count = await self.__count(adapter, category, params)
+        more = count is None
+        if count is not None and count > offset:
+            offsets = list(range(offset, count, page_size))
+            pages = await asyncio.gather(*(fetch(o, semaphore) for o in offsets))
+            if any(page is None for page in pages):
+                return None
+            for page in pages:
+                features.extend(page["features"])
+            offset = offsets[-1] + page_size
+            # the layer grew while it was being paged
+            more = pages[-1].get("exceededTransferLimit", False)
+
+        while more:
+            page = await fetch(offset, semaphore)
+            if page is None:
+                return None
+            if not page["features"]:
+                break
+            features.extend(page["features"])
+            offset += len(page["features"])
+            more = page.get("exceededTransferLimit", False)
+
+        # features that moved between pages while paging are only kept once
+        seen = set()
+        unique = []
+        for feature in features:
+            attributes = feature.get("attributes") or {}
+            key = attributes.get("OBJECTID", attributes.get("IncidentNumber"))
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            unique.append(feature)
+
+        self.logger.debug(f"{category}: {len(unique)} features in {count} records")
+        return {**data, "features": unique, "exceededTransferLimit": False}
+
+    async def __count(
+        self, adapter: RestAdapter, category: IncidentCategory, params: dict
+    ) -> Optional[int]:
+        params = {
+            k: v
+            for k, v in params.items()
+            if k not in ("outFields", "orderByFields", "returnGeometry", "outSR")
+        }
+        params["returnCountOnly"] = "true"
+        data = await self.__query(adapter, category, params, throw_on_error=False)
+        count = data.get("count") if data is not None else None
+        return count if isinstance(count, int) else None
+
+    async def __update_features(
+        self,
+        adapter: RestAdapter,
+        category: IncidentCategory,
+        data: dict,
+        diagnostics: ParseDiagnostics,
+        throw_on_error: bool,
+    ) -> list[ArcGISIncident]:
+        """Reuses the incidents of unchanged features and parses the rest, fetching geometry
+        only for features that are new or have moved"""
+        known = self.features.get(category, {})
+        object_id_field = data.get("objectIdFieldName", "OBJECTID")
+        self.object_id_fields[category] = object_id_field
+
+        current: dict[int, CachedFeature] = {}
+        numbers = []
+        changed = []  # features with known geometry to parse
+        located = (
+            []
+        )  # features whose geometry must be fetched, with their cached feature
+        for feature in data["features"]:
+            attributes = feature.get("attributes") or {}
+            number = self.__incident_number(attributes)
+            numbers.append(number)
+            cached = known.get(number) if number is not None else None
+            if cached is not None and cached.attributes == attributes:
+                current[number] = cached
+            elif cached is not None and all(
+                cached.attributes.get(f) == attributes.get(f) for f in LOCATION_FIELDS
+            ):
+                changed.append({"attributes": attributes, "geometry": cached.geometry})
+            else:
+                located.append((feature, cached))
+
+        if located and self.query.return_geometry:
+            object_ids = [
+                (f.get("attributes") or {}).get(object_id_field) for f, _ in located
+            ]
+            if None in object_ids:
+                # the layer's id field wasn't requested, so locate the features by incident
+                # number from a full query instead; the next poll requests the right field
+                self.logger.warning(
+                    f"{category}: features have no {object_id_field}, "
+                    "querying the layer with geometry"
+                )
+                keys = [
+                    self.__incident_number(f.get("attributes") or {})
+                    for f, _ in located
+                ]
+                geometries = await self.__fetch_layer_geometries(
+                    adapter, category, throw_on_error
+                )
+            else:
+                keys = object_ids
+                geometries = await self.__fetch_geometries(
+                    adapter, category, object_id_field, object_ids, throw_on_error
+                )
+            for (feature, cached), key in zip(located, keys):
+                attributes = feature.get("attributes") or {}
+                geometry = geometries.get(key)
+                if geometry is not None:
+                    changed.append({"attributes": attributes, "geometry": geometry})
+                elif cached is not None:
+                    # keep a known incident at its previous location rather than report it
+                    # removed, and cache its previous location so it is located next poll
+                    stale = {f: cached.attributes.get(f) for f in LOCATION_FIELDS}
+                    changed.append(
+                        {
+                            "attributes": attributes,
+                            "geometry": cached.geometry,
+                            "cached_attributes": {**attributes, **stale},
+                        }
+                    )
+                # otherwise it is new and closed between the queries or the fetch failed,
+                # so it is retried next poll
+        else:
+            changed.extend(
+                {"attributes": f.get("attributes") or {}, "geometry": None}
+                for f, _ in located
+            )
+
+        with instrumentation.span(
+            PARSE, source=self.name, layer=self.query.layers[category]
+        ):
+            parsed = self.parse_features(category, changed, diagnostics)
+
+        by_number = {incident.number: incident for incident in parsed}
+        for feature in changed:
+            number = self.__incident_number(feature["attributes"])
+            incident = by_number.get(number)
+            if incident is not None:
+                current[number] = CachedFeature(
+                    feature.get("cached_attributes", feature["attributes"]),
+                    feature["geometry"],
+                    incident,
+                )
+
+        # keep the order of the query response
+        incidents = [
+            current[n].incident for n in dict.fromkeys(numbers) if n in current
+        ]
+
+        self.logger.debug(
+            f"{category}: {len(incidents) - len(parsed)} unchanged, "
+            f"{len(parsed)} parsed, {len(located)} located"
+        )
+        self.features[category] = current
+        return incidents
+
+    async def __fetch_geometries(
+        self,
+        adapter: RestAdapter,
+        category: IncidentCategory,
+        object_id_field: str,
+        object_ids: list,
+        throw_on_error: bool,
+    ) -> dict:
+        object_ids = [str(i) for i in object_ids if i is not None]
+        if not object_ids:
+            return {}
+
+        params = {
+            "f": "json",
+            "objectIds": ",".join(object_ids),
+            "returnGeometry": "true",
+            "outFields": object_id_field,
+            "outSR": self.query.out_sr,
+            "orderByFields": object_id_field,
+        }
+        data = await self.__query_all(adapter, category, params, throw_on_error)
+        if data is None:
+            return {}
+
+        geometries = {}
+        for feature in data["features"]:
+            object_id = (feature.get("attributes") or {}).get(object_id_field)
+            if object_id is not None and feature.get("geometry"):
+                geometries[object_id] = feature["geometry"]
+        return geometries
+
+    async def __fetch_layer_geometries(
+        self, adapter: RestAdapter, category: IncidentCategory, throw_on_error: bool
+    ) -> dict:
+        data = await self.__query_all(
+            adapter, category, self.query.params(category), throw_on_error
+        )
+        if data is None:
+            return {}
+
+        geometries = {}
+        for feature in data["features"]:
+            number = self.__incident_number(feature.get("attributes") or {})
+            if number is not None and feature.get("geometry"):
+                geometries[number] = feature["geometry"]
+        return geometries
+
+    @staticmethod
+    def __incident_number(attributes: dict) -> Optional[int]:
+        try:
+            return int(attributes["IncidentNumber"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def parse_features(
+        self,
+        category: IncidentCategory,
+        features: list[dict],
+        diagnostics: Optional[ParseDiagnostics] = None,
+    ) -> list[ArcGISIncident]:
+        """Parses the features of a layer query response into incidents
+
+        Features that can't be parsed are skipped and units that can't be parsed are left out
+        of their incident; both are recorded in the diagnostics.
+
+        :param category: The category of the layer the features came from
+        :param features: The features of the query response
+        :param diagnostics: (optional) The diagnostics to record failures in. If omitted, a new
+            one is created, published and stored as the client's diagnostics.
+        :return: A list of incidents
+        :rtype: list[ArcGISIncident]
+        """
+        owned = diagnostics is None
+        if owned:
+            diagnostics = ParseDiagnostics(self.name)
+
+        # every unit of the layer is parsed in one pass so repeated units are parsed once
+        unit_names = [self.__extract_unit_names(feature) for feature in features]
+        errors = {}
+        with instrumentation.span(RESOLVE, source=self.name):
+            units = UnitParser.parse_units(
+                (name for names in unit_names for name in names),
+                category,
+                self.agency_resolver,
+                errors,
+            )
+
+        # requested attributes must be present, the others are parsed as None
+        expected = self.query.out_fields(category)
+
+        incidents = []
+        for feature, names in zip(features, unit_names):
+            feature_units = [units[name] for name in names if name in units]
+            try:
+                incidents.append(
+                    self.__parse_incident(category, feature, feature_units, expected)
+                )
+            except (KeyError, TypeError, ValueError, pytz.InvalidTimeError):
+                # including dates that are ambiguous or skipped when the clocks change
+                attributes = feature.get("attributes") or {}
+                diagnostics.record(
+                    INVALID_FEATURE, str(attributes.get("IncidentNumber", feature))
+                )
                 continue
 
-            for feature in resp.data["features"]:
-                incident = self.__parse_incident(cat, feature, self.agency_resolver)
-                incidents.append(incident)
+            diagnostics.parsed += len(feature_units)
+            for name in names:
+                if name in errors:
+                    diagnostics.record_exception(errors[name], name)
 
+        if owned:
+            diagnostics.publish()
+            self.diagnostics = diagnostics
         return incidents
 
+    def assign_zones(
+        self, category: IncidentCategory, incidents: list[ArcGISIncident]
+    ) -> None:
+        """Assigns parsed incidents to the response zones of their category, if any
+
+        :param category: The category of the incidents
+        :param incidents: The incidents to assign
+        """
+        zone_index = self.zone_index
+        if isinstance(zone_index, dict):
+            zone_index = zone_index.get(category)
+        if zone_index is None or not incidents:
+            return
+        with instrumentation.span(LOCATE, source=self.name):
+            zone_index.assign(incidents)
+
+    def __extract_unit_names(self, feature: dict) -> list[str]:
+        # unit names are condensed, lacking spaces and delimiters (ex: MED8611)
+        current_units = (feature.get("attributes") or {}).get("CurrentUnits")
+        if not isinstance(current_units, str):
+            return []
+        return [name.strip() for name in current_units.split(",") if name.strip()]
+
     def __parse_incident(
         self,
         category: IncidentCategory,
         incident: dict,
-        agency_resolver: AgencyResolver = None,
+        units: list[Unit],
+        expected: list[str],
     ) -> ArcGISIncident:
         attributes = incident["attributes"]
-        geometry = incident["geometry"]
+        geometry = incident.get("geometry")
+        for name in expected:
+            if name not in attributes:
+                raise KeyError(name)
 
         # convert date to UTC
+        date = None
+        if attributes.get("IncidentOrigination") is not None:
+            raw_date = datetime.datetime.fromtimestamp(
+                attributes["IncidentOrigination"] / 1000
+            )
+            local_tz = pytz.timezone("America/New_York")
+            local_dt = local_tz.localize(raw_date, is_dst=None)
+            date = local_dt.astimezone(pytz.utc)
 
-        raw_date = datetime.datetime.fromtimestamp(
-            attributes["IncidentOrigination"] / 1000
-        )
-        local_tz = pytz.timezone("America/New_York")
-        local_dt = local_tz.localize(raw_date, is_dst=None)
-        date = local_dt.astimezone(pytz.utc)
-
-        municipality = attributes["IncidentMunicipality"]
-
-        intersection = re.sub(
-            " +", " ", attributes["PublicLocation"]
-        )  # collapse multiple spaces
-
-        unit_names = []
-        # unit names are condensed, lacking spaces and delimiters (ex: MED8611)
-        if "CurrentUnits" in attributes and attributes["CurrentUnits"] is not None:
-            unit_names = attributes["CurrentUnits"].split(",")
+        municipality = attributes.get("IncidentMunicipality")
 
-        units = []
-        for unit_name in unit_names:
-            u = UnitParser.parse_unit(unit_name, category, agency_resolver)
-            units.append(u)
+        location = attributes.get("PublicLocation")
+        intersection = collapse_whitespace(location) if location else location
 
         number = int(attributes["IncidentNumber"])
 
-        if "Priority" in attributes:
+        if attributes.get("Priority") is not None:
             priority = int(attributes["Priority"])
         else:
             priority = None
-        agency = attributes["PrimaryAgency"]
-        public = bool(attributes["IsPublic"])
-        description = attributes["PublicType"]
-
-        coords = Coordinates(geometry["x"], geometry["y"])
+        agency = attributes.get("PrimaryAgency")
+        public = attributes.get("IsPublic")
+        public = bool(public) if public is not None else None
+        description = attributes.get("PublicType")
+
+        coords = None
+        if geometry:
+            coords = Coordinates(geometry["x"], geometry["y"])
 
         incident = ArcGISIncident(
             category,
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from lcwc.incident import Incident
 from collections import namedtuple
+from typing import Optional
 
 
 @dataclass
@@ -13,6 +14,15 @@ class Coordinates:
     """ The latitude of the incident """
     latitude: float
 
+    def to_dict(self) -> dict:
+        """Returns a JSON-compatible dictionary representation of the coordinates"""
+        return {"longitude": self.longitude, "latitude": self.latitude}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Coordinates":
+        """Creates coordinates from a dictionary produced by to_dict"""
+        return cls(d["longitude"], d["latitude"])
+
 
 @dataclass
 class ArcGISIncident(Incident):
@@ -21,14 +31,35 @@ class ArcGISIncident(Incident):
     """ The number of the incident """
     number: int
 
-    """ The priority of the incident """
-    priority: int
+    """ The priority of the incident, if the layer provides it """
+    priority: Optional[int]
 
     """ The agency handling the incident """
-    agency: str
+    agency: Optional[str]
+
+    """ Whether the incident is public, or None if it wasn't requested """
+    public: Optional[bool]
+
+    """ The coordinates of the incident, or None if geometry wasn't requested """
+    coordinates: Optional[Coordinates]
+
+    """ The name of the response zone containing the incident, if assigned (see lcwc.zones) """
+    zone: Optional[str] = None
+
+    @property
+    def key(self) -> int:
+        return self.number
 
-    """ Whether the incident is public """
-    public: bool
+    def to_dict(self) -> dict:
+        d = super().to_dict()
+        if self.coordinates is not None:
+            d["coordinates"] = self.coordinates.to_dict()
+        return d
 
-    """ The coordinates of the incident """
-    coordinates: Coordinates
+    @classmethod
+    def from_dict(cls, d: dict) -> "ArcGISIncident":
+        coordinates = d.get("coordinates")
+        if coordinates is not None:
+            d = d.copy()
+            d["coordinates"] = Coordinates.from_dict(coordinates)
+        return super().from_dict(d)
@@ -0,0 +1,204 @@
+import dataclasses
+import json
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Optional
+
+from lcwc.category import IncidentCategory
+
+LAYERS = {
+    IncidentCategory.FIRE: 0,
+    IncidentCategory.MEDICAL: 1,
+    IncidentCategory.TRAFFIC: 2,
+}
+""" The map service layer of each incident category """
+
+# some fields are only present for certain incident types (ex: Priority is only present for medical and traffic)
+FIELDS = {
+    IncidentCategory.FIRE: [
+        "IncidentNumber",
+        "IncidentMunicipality",
+        "IncidentOrigination",
+        "PrimaryAgency",
+        "CurrentUnits",
+        "PublicLocation",
+        "PublicType",
+        "IsPublic",
+    ],
+    IncidentCategory.MEDICAL: [
+        "IncidentNumber",
+        "IncidentMunicipality",
+        "IncidentOrigination",
+        "PrimaryAgency",
+        "CurrentUnits",
+        "PublicLocation",
+        "PublicType",
+        "IsPublic",
+        "Priority",
+    ],
+    IncidentCategory.TRAFFIC: [
+        "IncidentNumber",
+        "IncidentMunicipality",
+        "IncidentOrigination",
+        "PrimaryAgency",
+        "CurrentUnits",
+        "PublicLocation",
+        "PublicType",
+        "IsPublic",
+        "Priority",
+    ],
+}
+""" The attributes each layer provides """
+
+FIELDS_ANY = frozenset(f for fields in FIELDS.values() for f in fields)
+""" Every attribute provided by at least one layer """
+
+REQUIRED_FIELDS = ("IncidentNumber",)
+""" The attributes always requested, since incidents are identified by them """
+
+""" Actual spatial extent of Lancaster County based LanCo GIS data
+lanco_spatial = {
+    'xmin': -8548898.732776089,
+    'ymin': 4845979.963808246,
+    'xmax': -8432714.449782776,
+    'ymax': 4909881.3194545675,
+    'spatialReference': {
+        'wkid': 102100
+    }
+}
+"""
+
+# seems we need to expand the spatial extent to get all incidents
+LANCO_SPATIAL = {
+    "xmin": -8657540.868810708,
+    "ymin": 4794222.228992932,
+    "xmax": -8290643.133041878,
+    "ymax": 5048910.407239126,
+    "spatialReference": {"wkid": 102100},
+}
+""" The envelope incidents are queried within """
+
+WGS84 = 4326
+""" The spatial reference of longitude/latitude coordinates """
+
+
+def _freeze(value: Any) -> Any:
+    # read-only views of (nested) mappings, so a shared query can't be modified
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    return value
+
+
+@dataclass(frozen=True)
+class ArcGISQuery:
+    """The parameters of the layer queries made by ArcGISClient
+
+    Queries are immutable and hashable; the layers and envelope are read-only mappings and the
+    builder methods return a modified copy, so a query can be shared between clients:
+
+        query = ArcGISQuery().select("IncidentNumber", "CurrentUnits").without_geometry()
+    """
+
+    """ The attributes to request, or None for every attribute the layer provides """
+    fields: Optional[tuple[str, ...]] = None
+
+    """ The layer of each incident category, categories without a layer aren't queried """
+    layers: Mapping[IncidentCategory, int] = field(
+        default_factory=lambda: LAYERS, hash=False
+    )
+
+    """ The envelope to query within, including its spatialReference """
+    envelope: Mapping[str, Any] = field(
+        default_factory=lambda: LANCO_SPATIAL, hash=False
+    )
+
+    """ The spatial reference coordinates are returned in """
+    out_sr: int = WGS84
+
+    """ Whether to return geometry (the incidents' coordinates are None without it) """
+    return_geometry: bool = True
+
+    """ The SQL where clause """
+    where: str = "1=1"
+
+    """ The number of features requested per page, or None to use the server's limit """
+    page_size: Optional[int] = None
+
+    """ The maximum number of pages fetched at once when a layer exceeds the page size """
+    max_concurrency: int = 4
+
+    """ The fields pages are ordered by, so that pages don't overlap """
+    order_by: str = "IncidentNumber"
+
+    def __post_init__(self) -> None:
+        if self.max_concurrency < 1:
+            # a semaphore of zero would never let a page be fetched
+            raise ValueError("The maximum concurrency must be at least 1")
+        object.__setattr__(self, "layers", _freeze(self.layers))
+        object.__setattr__(self, "envelope", _freeze(self.envelope))
+
+    def select(self, *fields: str) -> "ArcGISQuery":
+        """Returns a copy requesting only the given attributes (plus REQUIRED_FIELDS)"""
+        return dataclasses.replace(self, fields=tuple(fields) if fields else None)
+
+    def without_geometry(self) -> "ArcGISQuery":
+        """Returns a copy that doesn't request geometry"""
+        return dataclasses.replace(self, return_geometry=False)
+
+    def within(self, envelope: Mapping[str, Any]) -> "ArcGISQuery":
+        """Returns a copy querying within the given envelope (with a spatialReference)"""
+        return dataclasses.replace(self, envelope=envelope)
+
+    def on_layers(self, layers: Mapping[IncidentCategory, int]) -> "ArcGISQuery":
+        """Returns a copy querying the given layer of each category"""
+        return dataclasses.replace(self, layers=layers)
+
+    def paged(self, page_size: int, max_concurrency: int = 4) -> "ArcGISQuery":
+        """Returns a copy requesting pages of the given size"""
+        if page_size <= 0:
+            raise ValueError("The page size must be positive")
+        return dataclasses.replace(
+            self, page_size=page_size, max_concurrency=max_concurrency
+        )
+
+    def out_fields(self, category: IncidentCategory) -> list[str]:
+        """Returns the attributes requested from the layer of a category"""
+        available = FIELDS.get(category, [])
+        if self.fields is None:
+            return list(available)
+        requested = list(REQUIRED_FIELDS) + [
+            f for f in self.fields if f not in REQUIRED_FIELDS
+        ]
+        # known attributes of other layers are dropped, since requesting them is an error
+        return [f for f in requested if f in available or f not in FIELDS_ANY]
+
+    def params(self, category: IncidentCategory) -> dict:
+        """Returns the query parameters for the layer of a category
+
+        :param category: The category of the layer
+        :return: The parameters, without pagination
+        :rtype: dict
+        """
+        spatial_reference = self.envelope.get("spatialReference") or {}
+        params = {
+            "f": "json",
+            "where": self.where,
+            "returnGeometry": "true" if self.return_geometry else "false",
+            "spatialRel": "esriSpatialRelIntersects",
+            "geometry": json.dumps(_thaw(self.envelope)),
+            "geometryType": "esriGeometryEnvelope",
+            "outFields": ",".join(self.out_fields(category)),
+            "orderByFields": self.order_by,
+        }
+        if "wkid" in spatial_reference:
+            params["inSR"] = spatial_reference["wkid"]
+        if self.return_geometry:
+            params["outSR"] = self.out_sr
+        return params
@@ -0,0 +1,384 @@
+import argparse
+import asyncio
+import cProfile
+import json
+import logging
+import os
+import sys
+import timeit
+from typing import Callable, Iterable, Optional
+
+from lcwc.agencies.agencyresolver import AgencyResolver
+from lcwc.arcgis import ArcGISClient
+from lcwc.category import IncidentCategory
+from lcwc.client import Client
+from lcwc.feed import FeedClient, FeedParser
+from lcwc.incident import Incident
+from lcwc.poller import PollResult, Poller
+from lcwc.utils.compact import CompactCodec
+from lcwc.utils.encoding import NDJSONWriter, encode_json, to_tagged_dict
+from lcwc.utils.session import create_session
+from lcwc.web import WebClient, WebParser
+
+SOURCES = {
+    "feed": FeedClient,
+    "web": WebClient,
+    "arcgis": ArcGISClient,
+}
+""" The clients selectable with --source """
+
+FORMATS = ["table", "json", "ndjson"]
+""" The output formats for fetch and watch """
+
+
+def create_clients(source: str) -> list[Client]:
+    """Creates the clients for a --source value ("all" selects every client)"""
+    if source == "all":
+        return [cls() for cls in SOURCES.values()]
+    return [SOURCES[source]()]
+
+
+def add_source_argument(parser: argparse.ArgumentParser, default: str) -> None:
+    parser.add_argument(
+        "--source",
+        choices=list(SOURCES) + ["all"],
+        default=default,
+        help=f"the incident source to use (default: {default})",
+    )
+
+
+def format_row(incident: Incident, prefix: str = "") -> str:
+    """Formats an incident as a single line of the table output"""
+    units = ", ".join(str(unit) for unit in incident.units)
+    date = incident.date.strftime("%Y-%m-%d %H:%M") if incident.date else ""
+    return (
+        f"{prefix}{date:<16}  {incident.category.value:<8}  "
+        f"{(incident.municipality or '')[:28]:<28}  {(incident.intersection or '')[:36]:<36}  "
+        f"{(incident.description or '')[:32]:<32}  {units}"
+    )
+
+
+def write_incidents(incidents: list[Incident], fmt: str, out=None) -> None:
+    out = out or sys.stdout
+    if fmt == "table":
+        for incident in incidents:
+            out.write(format_row(incident) + "\n")
+    elif fmt == "json":
+        out.write(json.dumps([to_tagged_dict(i) for i in incidents], indent=2) + "\n")
+    else:
+        out.flush()
+        with NDJSONWriter(out.buffer) as writer:
+            writer.write_many(incidents)
+
+
+async def fetch_all(clients: list[Client]) -> list[Incident]:
+    """Fetches the incidents of every client, skipping (and logging) clients that fail
+
+    :raises Exception: The first failure, if every client failed
+    """
+    async with create_session() as session:
+        results = await asyncio.gather(
+            *[c.get_incidents(session) for c in clients], return_exceptions=True
+        )
+
+    incidents, errors = [], []
+    for client, result in zip(clients, results):
+        if isinstance(result, BaseException):
+            logging.getLogger(__name__).error(
+                f"Fetching {client.name} failed: {result}"
+            )
+            errors.append(result)
+        else:
+            incidents.extend(result)
+    if errors and len(errors) == len(clients):
+        raise errors[0]
+    return incidents
+
+
+def fetch(args: argparse.Namespace) -> int:
+    incidents = asyncio.run(fetch_all(create_clients(args.source)))
+    write_incidents(incidents, args.format)
+    return 0
+
+
+def print_delta(result: PollResult, fmt: str) -> None:
+    changes = [
+        ("added", "+ ", result.delta.added),
+        ("removed", "- ", result.delta.removed),
+        ("updated", "~ ", result.delta.updated),
+    ]
+    for change, prefix, incidents in changes:
+        for incident in incidents:
+            if fmt == "table":
+                print(format_row(incident, prefix), flush=True)
+            else:
+                event = to_tagged_dict(incident)
+                event["change"] = change
+                event["source"] = result.client.name
+                print(encode_json(event).decode("utf-8"), flush=True)
+
+
+def delta_printer(fmt: str, initial: bool) -> Callable[[PollResult], None]:
+    """Returns a poll subscriber printing each delta
+
+    The first successful poll is a snapshot rather than a change, so it's skipped unless
+    `initial` is set.
+    """
+    seeded = initial
+
+    def subscriber(result: PollResult) -> None:
+        nonlocal seeded
+        if seeded:
+            print_delta(result, fmt)
+        seeded = True
+
+    return subscriber
+
+
+async def watch_async(args: argparse.Namespace) -> None:
+    async with create_session() as session:
+        pollers = [
+            Poller(client, session, interval=args.interval)
+            for client in create_clients(args.source)
+        ]
+
+        # run() makes the first poll, so the baseline isn't fetched twice at startup
+        for poller in pollers:
+            poller.subscribe(delta_printer(args.format, args.initial))
+
+        try:
+            await asyncio.gather(*[poller.run() for poller in pollers])
+        finally:
+            await asyncio.gather(*[poller.stop() for poller in pollers])
+
+
+def watch(args: argparse.Namespace) -> int:
+    try:
+        asyncio.run(watch_async(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+async def export_async(args: argparse.Namespace) -> int:
+    clients = create_clients(args.source)
+
+    if args.format == "compact":
+        incidents = await fetch_all(clients)
+        with open(args.output, "wb") as f:
+            f.write(CompactCodec().encode(incidents))
+        return len(incidents)
+
+    with NDJSONWriter(args.output) as writer:
+        if not args.follow:
+            writer.write_many(await fetch_all(clients))
+            return writer.count
+
+        # append every new or changed incident until interrupted
+        async with create_session() as session:
+            pollers = [Poller(c, session, interval=args.interval) for c in clients]
+            for poller in pollers:
+                poller.subscribe(
+                    lambda r: writer.write_many(r.delta.added + r.delta.updated)
+                )
+            try:
+                await asyncio.gather(*[poller.run() for poller in pollers])
+            except asyncio.CancelledError:
+                pass
+            finally:
+                await asyncio.gather(*[poller.stop() for poller in pollers])
+        return writer.count
+
+
+def export(args: argparse.Namespace) -> int:
+    try:
+        count = asyncio.run(export_async(args))
+        print(f"Exported {count} incidents to {args.output}", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def load_benchmarks(fixtures: str) -> list[tuple[str, Callable[[], list]]]:
+    """Creates the parser benchmarks for the fixtures in the given directory
+
+    :param fixtures: The fixture directory (feed.xml, web.html and arcgis_<layer>.json)
+    :return: A list of (name, function) pairs, each function returning the parsed incidents
+    :rtype: list[tuple[str, Callable[[], list]]]
+    """
+    resolver = AgencyResolver()
+    benchmarks = []
+
+    path = os.path.join(fixtures, "feed.xml")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            feed = f.read()
+        parser = FeedParser()
+        benchmarks.append(("FeedParser", lambda: parser.parse(feed, resolver)))
+
+    path = os.path.join(fixtures, "web.html")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            html = f.read()
+        web_parser = WebParser()
+        benchmarks.append(("WebParser", lambda: web_parser.parse(html, resolver)))
+
+    layers = []
+    for layer, category in enumerate(
+        [IncidentCategory.FIRE, IncidentCategory.MEDICAL, IncidentCategory.TRAFFIC]
+    ):
+        path = os.path.join(fixtures, f"arcgis_{layer}.json")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                layers.append((category, json.load(f)["features"]))
+    if layers:
+        client = ArcGISClient(resolver)
+        benchmarks.append(
+            (
+                "ArcGISClient",
+                lambda: [
+                    i
+                    for cat, feats in layers
+                    for i in client.parse_features(cat, feats)
+                ],
+            )
+        )
+
+    return benchmarks
+
+
+def run_benchmarks(
+    benchmarks: Iterable[tuple[str, Callable[[], list]]], number: int
+) -> list[tuple[str, float, int]]:
+    """Runs each benchmark and returns (name, seconds per run, incidents per run)"""
+    results = []
+    for name, func in benchmarks:
+        count = len(func())
+        seconds = timeit.timeit(func, number=number) / number
+        results.append((name, seconds, count))
+    return results
+
+
+def bench(args: argparse.Namespace) -> int:
+    benchmarks = load_benchmarks(args.fixtures)
+    if not benchmarks:
+        print(f"No fixtures found in {args.fixtures}, pass --fixtures", file=sys.stderr)
+        return 1
+
+    for name, seconds, count in run_benchmarks(benchmarks, args.number):
+        rate = count / seconds if seconds else 0
+        print(
+            f"{name:<16} {seconds * 1000:>10.3f} ms/run  {count:>6} incidents  {rate:>12,.0f} incidents/s"
+        )
+    return 0
+
+
+def serve(args: argparse.Namespace) -> int:
+    from lcwc.server import IncidentServer
+
+    server = IncidentServer(create_clients(args.source), interval=args.interval)
+    server.run(args.host, args.port)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="lcwc",
+        description="Lancaster County-Wide Communications live incident tools",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="enable debug logging"
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="profile the command with cProfile and write the stats to FILE",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fetch_parser = subparsers.add_parser("fetch", help="fetch the current incidents")
+    add_source_argument(fetch_parser, "web")
+    fetch_parser.add_argument("--format", choices=FORMATS, default="table")
+    fetch_parser.set_defaults(func=fetch)
+
+    watch_parser = subparsers.add_parser(
+        "watch", help="poll continuously and print only the changes"
+    )
+    add_source_argument(watch_parser, "web")
+    watch_parser.add_argument("--format", choices=["table", "ndjson"], default="table")
+    watch_parser.add_argument(
+        "--interval", type=float, default=30, help="initial polling interval"
+    )
+    watch_parser.add_argument(
+        "--initial", action="store_true", help="print the initial snapshot as well"
+    )
+    watch_parser.set_defaults(func=watch)
+
+    export_parser = subparsers.add_parser(
+        "export", help="export incidents to an archive file"
+    )
+    export_parser.add_argument(
+        "output", help="the archive to write (gzip-compressed if it ends in .gz)"
+    )
+    add_source_argument(export_parser, "all")
+    export_parser.add_argument(
+        "--format", choices=["ndjson", "compact"], default="ndjson"
+    )
+    export_parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="keep polling and append new or changed incidents (ndjson only)",
+    )
+    export_parser.add_argument(
+        "--interval", type=float, default=30, help="initial polling interval"
+    )
+    export_parser.set_defaults(func=export)
+
+    bench_parser = subparsers.add_parser(
+        "bench", help="benchmark the parsers against saved fixtures"
+    )
+    bench_parser.add_argument(
+        "--fixtures",
+        required=True,
+        help="the fixture directory (ex: tests/fixtures in a source checkout)",
+    )
+    bench_parser.add_argument(
+        "--number", type=int, default=100, help="the number of runs per parser"
+    )
+    bench_parser.set_defaults(func=bench)
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="serve incidents over HTTP and Server-Sent Events"
+    )
+    add_source_argument(serve_parser, "all")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8080)
+    serve_parser.add_argument(
+        "--interval", type=float, default=30, help="initial polling interval"
+    )
+    serve_parser.set_defaults(func=serve)
+
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+
+    if args.command == "export" and args.follow and args.format != "ndjson":
+        parser.error("--follow is only supported with --format ndjson")
+
+    if not args.profile:
+        return args.func(args)
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(args.func, args)
+    finally:
+        profiler.dump_stats(args.profile)
+        print(f"Profile written to {args.profile}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
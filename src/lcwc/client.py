@@ -1,12 +1,50 @@
+import time
+from typing import Optional
 from aiohttp import ClientSession
+from yarl import URL
 
 
 from abc import ABC, abstractmethod
 
 from lcwc.incident import Incident
+from lcwc.utils import instrumentation
+from lcwc.utils.cache import CachedResponse, ResponseCache, SingleFlight, cache_key
+from lcwc.utils.instrumentation import CACHE_HITS, FETCH
+from lcwc.utils.resilience import (
+    DEFAULT_RESILIENCE,
+    HTTPStatusException,
+    Resilience,
+    parse_retry_after,
+)
+from lcwc.utils.session import create_session
 
 
 class Client(ABC):
+    MIN_POLL_INTERVAL = 15
+    """ The shortest interval, in seconds, at which the source should be polled, set by each source """
+
+    def __init__(
+        self,
+        session: Optional[ClientSession] = None,
+        resilience: Optional[Resilience] = None,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
+        """
+        :param session: (optional) A shared session to use when none is passed to get_incidents.
+            If omitted, the client creates and owns a pooled session; use the client as an
+            async context manager (or call close()) to release it.
+        :param resilience: (optional) The retry and circuit breaker policy for requests.
+            Defaults to a policy shared by all clients so circuit state is tracked per host.
+        :param cache: (optional) A response cache, usually shared with other clients or
+            processes polling the same source, so upstream is requested once per TTL
+        """
+        self.session = session
+        self._owns_session = False
+        self.resilience = resilience or DEFAULT_RESILIENCE
+        self.cache = cache
+        self.diagnostics = None
+        """ The ParseDiagnostics of the last call to get_incidents, if the client records them """
+
     @property
     @abstractmethod
     def name(self):
@@ -14,5 +52,158 @@ class Client(ABC):
 
     # TODO allow specification of timeout and incident categories
     @abstractmethod
-    def get_incidents(self, session: ClientSession) -> list[Incident]:
+    def get_incidents(self, session: ClientSession = None) -> list[Incident]:
         pass
+
+    def _get_session(self, session: Optional[ClientSession] = None) -> ClientSession:
+        """Returns the session to use for a request, creating an owned session if needed
+
+        :param session: The session passed by the caller, if any
+        :return: A client session
+        :rtype: ClientSession
+        """
+        if session is not None:
+            return session
+        if self.session is None or self.session.closed:
+            self.session = create_session()
+            self._owns_session = True
+        return self.session
+
+    async def _fetch(self, session: ClientSession, url: str, timeout: int) -> bytes:
+        """Fetches the body of the given URL, retrying transient failures
+
+        :param session: The session to use
+        :param url: The URL to fetch
+        :param timeout: The timeout in seconds for each attempt
+        :return: The response body
+        :rtype: bytes
+        :raises HTTPStatusException: If the final attempt doesn't return 200
+        """
+
+        async def attempt() -> CachedResponse:
+            async with session.get(url, timeout=timeout) as resp:
+                if resp.status != 200:
+                    raise HTTPStatusException(
+                        resp.status,
+                        f"Unable to fetch {url}: {resp.status}",
+                        parse_retry_after(resp.headers.get("Retry-After")),
+                    )
+                return CachedResponse(
+                    await resp.read(),
+                    str(resp.url),
+                    resp.status,
+                    resp.reason or "",
+                    dict(resp.headers),
+                )
+
+        async def fetch() -> CachedResponse:
+            with instrumentation.span(FETCH, source=self.name):
+                return await self.resilience.call(URL(url).host, attempt)
+
+        if self.cache is None:
+            return (await fetch()).body
+        return (await self.cache.fetch(cache_key(url), fetch)).body
+
+    def coalesced(self, freshness: float = 0.0) -> "CoalescingClient":
+        """Returns a wrapper sharing concurrent get_incidents calls to this client
+
+        :param freshness: How long, in seconds, a result is reused after it is fetched
+        :return: The wrapper
+        :rtype: CoalescingClient
+        """
+        return CoalescingClient(self, freshness)
+
+    async def close(self) -> None:
+        """Closes the session if it is owned by the client"""
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+            self._owns_session = False
+
+    async def __aenter__(self) -> "Client":
+        self._get_session()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+class CoalescingClient(Client):
+    """Wraps a client so concurrent get_incidents calls share a single fetch
+
+    Calls made while a fetch is in flight await the same result (or exception) instead of
+    requesting and parsing the source again, and with a freshness window a completed result
+    is reused until it is that many seconds old. Calls are shared when their arguments other
+    than the session match. Each caller gets its own list, but the incidents in it are shared,
+    so they shouldn't be modified.
+    """
+
+    def __init__(self, client: Client, freshness: float = 0.0) -> None:
+        """
+        :param client: The client to wrap
+        :param freshness: (optional) How long, in seconds, a result is reused after it is
+            fetched. Defaults to only sharing calls in flight.
+        """
+        super().__init__(client.session, client.resilience, client.cache)
+        self.client = client
+        self.freshness = freshness
+        self.MIN_POLL_INTERVAL = client.MIN_POLL_INTERVAL
+        self.diagnostics = client.diagnostics
+        """ The ParseDiagnostics of the wrapped client's last fetch """
+
+        self.flight = SingleFlight()
+        # call arguments -> (monotonic time fetched, incidents)
+        self._results: dict[tuple, tuple[float, list[Incident]]] = {}
+
+    @property
+    def name(self) -> str:
+        """Returns the name of the wrapped client"""
+        return self.client.name
+
+    async def get_incidents(
+        self, session: ClientSession = None, **kwargs
+    ) -> list[Incident]:
+        """Returns the wrapped client's incidents, sharing a fetch in flight or still fresh
+
+        :param session: The aiohttp session to use if a fetch is started
+        :param kwargs: Additional arguments passed to the wrapped client's get_incidents
+        :return: A list of incidents
+        :rtype: list[Incident]
+        """
+        # arguments are compared by their repr, so unhashable values can be passed
+        key = tuple((name, repr(kwargs[name])) for name in sorted(kwargs))
+        result = self._results.get(key)
+        if result is not None and time.monotonic() - result[0] < self.freshness:
+            instrumentation.increment(CACHE_HITS, cache="incidents")
+            return list(result[1])
+
+        if key in self.flight:
+            instrumentation.increment(CACHE_HITS, cache="coalesced")
+
+        async def fetch() -> list[Incident]:
+            incidents = await self.client.get_incidents(session, **kwargs)
+            self.diagnostics = self.client.diagnostics
+            if self.freshness > 0:
+                now = time.monotonic()
+                # only results still fresh are kept, so distinct arguments don't pile up
+                self._results = {
+                    k: r
+                    for k, r in self._results.items()
+                    if now - r[0] < self.freshness
+                }
+                self._results[key] = (now, incidents)
+            return incidents
+
+        return list(await self.flight.do(key, fetch))
+
+    def invalidate(self) -> None:
+        """Discards the fresh results, so the next call fetches again"""
+        self._results.clear()
+
+    async def close(self) -> None:
+        """Closes the wrapped client"""
+        await self.client.close()
+
+    async def __aenter__(self) -> "CoalescingClient":
+        await self.client.__aenter__()
+        return self
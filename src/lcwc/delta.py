@@ -0,0 +1,105 @@
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+from lcwc.incident import Incident
+
+
+@dataclass
+class IncidentDelta:
+    """Represents the changes between two polls of the same source"""
+
+    """ Incidents that are new since the previous poll """
+    added: list[Incident] = field(default_factory=list)
+
+    """ Incidents that are no longer present """
+    removed: list[Incident] = field(default_factory=list)
+
+    """ Incidents that are still present but changed (ex: units assigned or cleared) """
+    updated: list[Incident] = field(default_factory=list)
+
+    @property
+    def churn(self) -> int:
+        """Returns the total number of changed incidents"""
+        return len(self.added) + len(self.removed) + len(self.updated)
+
+    def __bool__(self) -> bool:
+        return self.churn > 0
+
+    def to_dict(self) -> dict:
+        """Returns a JSON-compatible dictionary representation of the delta"""
+        return {
+            "added": [incident.to_dict() for incident in self.added],
+            "removed": [incident.to_dict() for incident in self.removed],
+            "updated": [incident.to_dict() for incident in self.updated],
+        }
+
+    def merge(self, newer: "IncidentDelta") -> "IncidentDelta":
+        """Combines this delta with a later one into the net change across both
+
+        :param newer: The delta that followed this one
+        :return: The combined delta
+        :rtype: IncidentDelta
+        """
+        added = {incident.key: incident for incident in self.added}
+        removed = {incident.key: incident for incident in self.removed}
+        updated = {incident.key: incident for incident in self.updated}
+
+        for incident in newer.added:
+            key = incident.key
+            before = removed.pop(key, None)
+            if before is None:
+                added[key] = incident
+            elif before != incident:
+                updated[key] = incident
+
+        for incident in newer.updated:
+            key = incident.key
+            if key in added:
+                added[key] = incident
+            else:
+                updated[key] = incident
+
+        for incident in newer.removed:
+            key = incident.key
+            # an incident that came and went in between is no change at all
+            if added.pop(key, None) is None:
+                updated.pop(key, None)
+                removed[key] = incident
+
+        return IncidentDelta(
+            list(added.values()), list(removed.values()), list(updated.values())
+        )
+
+    def filter(self, predicate: Callable[[Incident], bool]) -> "IncidentDelta":
+        """Returns the part of the delta matching the predicate"""
+        return IncidentDelta(
+            [i for i in self.added if predicate(i)],
+            [i for i in self.removed if predicate(i)],
+            [i for i in self.updated if predicate(i)],
+        )
+
+
+def diff_incidents(
+    previous: Iterable[Incident], current: Iterable[Incident]
+) -> IncidentDelta:
+    """Computes the changes between two polls of the same source
+
+    Incidents are matched by their key, then compared field by field (including units).
+
+    :param previous: The incidents from the previous poll
+    :param current: The incidents from the current poll
+    :return: The delta between the polls
+    :rtype: IncidentDelta
+    """
+    old = {incident.key: incident for incident in previous}
+    delta = IncidentDelta()
+
+    for incident in current:
+        before = old.pop(incident.key, None)
+        if before is None:
+            delta.added.append(incident)
+        elif before != incident:
+            delta.updated.append(incident)
+
+    delta.removed = list(old.values())
+    return delta
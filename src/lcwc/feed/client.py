@@ -1,6 +1,11 @@
+from typing import Optional
 import aiohttp
 from lcwc import Client
 from lcwc.agencies.agencyresolver import AgencyResolver
+from lcwc.utils import instrumentation
+from lcwc.utils.instrumentation import PARSE
+from lcwc.utils.cache import ResponseCache
+from lcwc.utils.resilience import Resilience
 from lcwc.agencies.exceptions import OutOfCountyException
 
 from lcwc.feed.incident import FeedIncident
@@ -13,7 +18,17 @@ class FeedClient(Client):
     URL = "https://webcad.lcwc911.us/Pages/Public/LiveIncidentsFeed.aspx"
     """ The URL of the live incident feed """
 
-    def __init__(self, agency_resolver: AgencyResolver = AgencyResolver()) -> None:
+    MIN_POLL_INTERVAL = 30
+    """ The feed is a generated RSS document, refreshed less often than the incident page """
+
+    def __init__(
+        self,
+        agency_resolver: AgencyResolver = AgencyResolver(),
+        session: Optional[aiohttp.ClientSession] = None,
+        resilience: Optional[Resilience] = None,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
+        super().__init__(session, resilience, cache)
         self.agency_resolver = agency_resolver
         self.parser = FeedParser()
 
@@ -23,20 +38,19 @@ class FeedClient(Client):
         return "FeedClient"
 
     async def get_incidents(
-        self, session: aiohttp.ClientSession, timeout: int = 10
+        self, session: aiohttp.ClientSession = None, timeout: int = 10
     ) -> list[FeedIncident]:
         """Gets the live incident feed and returns a list of incidents
 
-        :param session: The aiohttp session to use
+        :param session: The aiohttp session to use (defaults to the client's session)
         :param timeout: The timeout for the request
         :return: A list of incidents
         :rtype: list[Incident]
         """
-        response = None
-        async with session.get(self.URL, timeout=timeout) as resp:
-            if resp.status == 200:
-                response = await resp.read()
-            else:
-                raise Exception(f"Unable to fetch live incident feed: {resp.status}")
-
-        return self.parser.parse(response, self.agency_resolver)
+        session = self._get_session(session)
+        response = await self._fetch(session, self.URL, timeout)
+
+        with instrumentation.span(PARSE, source=self.name):
+            incidents = self.parser.parse(response, self.agency_resolver)
+        self.diagnostics = self.parser.diagnostics
+        return incidents
@@ -8,3 +8,7 @@ class FeedIncident(Incident):
 
     """Returns the guid of the incident"""
     guid: str
+
+    @property
+    def key(self) -> str:
+        return self.guid
@@ -1,18 +1,19 @@
 import datetime
+import io
 import logging
+import time
+import xml.etree.ElementTree as ET
+from typing import Iterator, NamedTuple, Optional, Union
 import feedparser as FP
 import pytz
 from lcwc.agencies.agencyresolver import AgencyResolver
-from lcwc.agencies.exceptions import OutOfCountyException, PendingUnitException
 from lcwc.feed.incident import FeedIncident
 from lcwc.unit import Unit
-from lcwc.utils.unitparser import UnitParser, UnitParserException
-from .utils import (
-    FIRE_UNIT_NAMES,
-    LOCATION_NAMES,
-    MEDICAL_UNIT_NAMES,
-    determine_category,
-)
+from lcwc.utils import instrumentation
+from lcwc.utils.diagnostics import UNIT_EXCEPTIONS, ParseDiagnostics
+from lcwc.utils.instrumentation import DECODE, RESOLVE
+from lcwc.utils.unitparser import UnitParser
+from .utils import CLASSIFIER, KeywordClassifier, SegmentKind
 
 """
 Example entry:
@@ -27,9 +28,33 @@ Example entry:
 """
 
 
+class FeedEntry(NamedTuple):
+    """The fields of a feed item used to build an incident"""
+
+    guid: str
+    published: str
+    title: str
+    description: str
+
+
 class FeedParser:
-    def __init__(self) -> None:
+    SOURCE = "FeedClient"
+    """ The source label used for instrumentation """
+
+    def __init__(
+        self, fast: bool = True, classifier: Optional[KeywordClassifier] = None
+    ) -> None:
+        """
+        :param fast: Whether to read the feed with ElementTree, falling back to feedparser
+            only if the feed is malformed. If False, feedparser is always used.
+        :param classifier: (optional) The keyword classifier for description segments and
+            categories, defaults to the classifier built from the default keyword lists
+        """
+        self.fast = fast
+        self.classifier = classifier or CLASSIFIER
         self.logger = logging.getLogger(__name__)
+        self.diagnostics = ParseDiagnostics(self.SOURCE)
+        """ The diagnostics of the last parse """
 
     def parse(
         self, contents: bytes, agency_resolver: AgencyResolver
@@ -41,17 +66,16 @@ class FeedParser:
         :rtype: list[Incident]
         """
         incidents = []
+        diagnostics = ParseDiagnostics(self.SOURCE)
+        # unit resolution is only timed while instrumentation is active
+        current = instrumentation.current()
+        resolve_time = 0.0
 
-        d = FP.parse(contents)
-
-        def has_intersection(details_segment: str) -> bool:
-            return any(k in details_segment for k in LOCATION_NAMES)
-
-        def has_unit_names(details_segment: str) -> bool:
-            details_split = details_segment.split()
-            return any(k in details_split for k in FIRE_UNIT_NAMES + MEDICAL_UNIT_NAMES)
+        with instrumentation.span(DECODE, source=self.SOURCE):
+            entries = self.read_entries(contents)
 
-        for entry in d.entries:
+        classifier = self.classifier
+        for entry in entries:
             guid = entry.guid
             gmt_date = datetime.datetime.strptime(
                 entry.published, "%a, %d %b %Y %H:%M:%S %Z"
@@ -64,7 +88,7 @@ class FeedParser:
             # [municipality];[intersection]
             # [municipality];[units assigned]
             # [municipality]
-            details_split = entry["description"].strip().split(";", maxsplit=3)
+            details_split = entry.description.strip().split(";", maxsplit=3)
 
             # first item is always the municipality
             municipality = details_split[0].strip()
@@ -74,28 +98,31 @@ class FeedParser:
 
             # skip if only municipality is present
             if len(details_split) >= 2:
-                if has_unit_names(details_split[1]):
+                kind = classifier.classify_segment(details_split[1])
+                if kind is SegmentKind.UNITS:
                     unit_names = self.__extract_unit_names(details_split[1])
                 else:
-                    if has_intersection(details_split[1]):
+                    if kind is SegmentKind.LOCATION:
                         intersection = details_split[1].strip()
-                    if len(details_split) > 2 and has_unit_names(details_split[2]):
+                    if len(details_split) > 2 and classifier.has_unit_names(
+                        details_split[2]
+                    ):
                         unit_names = self.__extract_unit_names(details_split[2])
 
             # we need to resolve the category before we can properly parse the units
-            category = determine_category(description, unit_names)
+            category = classifier.determine_category(description, unit_names)
 
+            start = time.perf_counter() if current is not None else 0.0
             units = []
             for unit_name in unit_names:
                 try:
                     u = UnitParser.parse_unit(unit_name, category, agency_resolver)
                     units.append(u)
-                except OutOfCountyException:
-                    self.logger.debug(f"Unit {unit_name} is out of county")
-                except PendingUnitException:
-                    self.logger.debug(f"Unit {unit_name} is pending")
-                except UnitParserException:
-                    self.logger.debug(f"Unable to parse unit {unit_name}")
+                except UNIT_EXCEPTIONS as e:
+                    diagnostics.record_exception(e, unit_name)
+            if current is not None:
+                resolve_time += time.perf_counter() - start
+            diagnostics.parsed += len(units)
 
             incidents.append(
                 FeedIncident(
@@ -103,8 +130,58 @@ class FeedParser:
                 )
             )
 
+        if current is not None:
+            current.record_span(RESOLVE, resolve_time, source=self.SOURCE)
+        diagnostics.publish()
+        if diagnostics:
+            self.logger.debug("Unit parse failures: %s", diagnostics.counts)
+        self.diagnostics = diagnostics
+
         return incidents
 
+    def read_entries(self, contents: Union[bytes, str]) -> list[FeedEntry]:
+        """Reads the items of the feed, with ElementTree if possible and feedparser otherwise
+
+        :param contents: The xml of the live incident feed
+        :return: A list of feed entries
+        :rtype: list[FeedEntry]
+        """
+        if self.fast:
+            try:
+                return list(self.__iter_entries(contents))
+            except ET.ParseError as e:
+                self.logger.warning(f"Malformed feed, falling back to feedparser: {e}")
+
+        d = FP.parse(contents)
+        # a truncated feed can end with a partial entry that can't be turned into an incident
+        return [
+            FeedEntry(
+                entry.guid,
+                entry.published,
+                entry.get("title", ""),
+                entry.get("description", ""),
+            )
+            for entry in d.entries
+            if "guid" in entry and "published" in entry
+        ]
+
+    def __iter_entries(self, contents: Union[bytes, str]) -> Iterator[FeedEntry]:
+        if isinstance(contents, str):
+            contents = contents.encode("utf-8")
+
+        # items are read as they are closed and then cleared, so memory stays flat
+        for _, element in ET.iterparse(io.BytesIO(contents), events=("end",)):
+            if element.tag != "item":
+                continue
+            # feedparser strips surrounding whitespace, so the fast path does too
+            yield FeedEntry(
+                element.findtext("guid", "").strip(),
+                element.findtext("pubDate", "").strip(),
+                element.findtext("title", "").strip(),
+                element.findtext("description", "").strip(),
+            )
+            element.clear()
+
     def __extract_unit_names(self, units_data: str) -> list[str]:
         """Extracts the units from the data string
 
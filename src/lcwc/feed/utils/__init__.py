@@ -1,3 +1,7 @@
+import re
+from enum import Enum
+from typing import Iterable, Optional
+
 from lcwc.category import IncidentCategory
 from lcwc.unit import Unit
 
@@ -50,6 +54,127 @@ FIRE_DESCRIPTION_KEYWORDS = ["FIRE"]
 TRAFFIC_DESCRIPTION_KEYWORDS = ["TRAFFIC", "VEHICLE"]
 
 
+FIRE_UNIT_KEYWORDS = frozenset(FIRE_UNIT_NAMES)
+MEDICAL_UNIT_KEYWORDS = frozenset(MEDICAL_UNIT_NAMES)
+LOCATION_KEYWORDS = frozenset(LOCATION_NAMES)
+
+
+class SegmentKind(Enum):
+    """What a ;-separated segment of a feed item's description contains"""
+
+    UNITS = "units"
+    LOCATION = "location"
+    OTHER = "other"
+
+
+def _alternation(keywords: Iterable[str]) -> str:
+    # longest first so a keyword is never cut short by one of its prefixes
+    return "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+
+
+class KeywordClassifier:
+    """Classifies feed description segments, unit names and incident descriptions by keyword
+
+    Each kind of lookup is a single precompiled regular expression, so a segment is
+    classified in one pass over the text. Unit keywords match whole words (or phrases,
+    such as "FIRE POLICE"), while location and description keywords match anywhere.
+    """
+
+    def __init__(
+        self,
+        fire_units: Iterable[str] = FIRE_UNIT_KEYWORDS,
+        medical_units: Iterable[str] = MEDICAL_UNIT_KEYWORDS,
+        locations: Iterable[str] = LOCATION_KEYWORDS,
+        fire_descriptions: Iterable[str] = FIRE_DESCRIPTION_KEYWORDS,
+        medical_descriptions: Iterable[str] = MEDICAL_DESCRIPTION_KEYWORDS,
+        traffic_descriptions: Iterable[str] = TRAFFIC_DESCRIPTION_KEYWORDS,
+    ) -> None:
+        self.fire_units = frozenset(fire_units)
+        self.medical_units = frozenset(medical_units)
+        self.locations = frozenset(locations)
+
+        units = (
+            rf"(?<!\S)(?:(?P<fire>{_alternation(self.fire_units)})"
+            rf"|(?P<medical>{_alternation(self.medical_units)}))(?!\S)"
+        )
+        self.unit_pattern = re.compile(units)
+        self.location_pattern = re.compile(_alternation(self.locations))
+        self.segment_pattern = re.compile(
+            rf"{units}|(?P<location>{_alternation(self.locations)})"
+        )
+        self.description_pattern = re.compile(
+            rf"(?P<traffic>{_alternation(traffic_descriptions)})"
+            rf"|(?P<medical>{_alternation(medical_descriptions)})"
+            rf"|(?P<fire>{_alternation(fire_descriptions)})"
+        )
+
+    def classify_segment(self, segment: str) -> SegmentKind:
+        """Determines whether a description segment lists units, names a location or neither
+
+        :param segment: The segment to classify
+        :return: UNITS if any unit keyword is present, otherwise LOCATION if any location keyword is
+        :rtype: SegmentKind
+        """
+        kind = SegmentKind.OTHER
+        for match in self.segment_pattern.finditer(segment):
+            if match.lastgroup != "location":
+                return SegmentKind.UNITS
+            kind = SegmentKind.LOCATION
+        return kind
+
+    def has_unit_names(self, segment: str) -> bool:
+        return self.unit_pattern.search(segment) is not None
+
+    def has_intersection(self, segment: str) -> bool:
+        return self.location_pattern.search(segment) is not None
+
+    def unit_category(self, unit_name: str) -> Optional[IncidentCategory]:
+        """Returns the category implied by a unit name, preferring fire, or None"""
+        category = None
+        for match in self.unit_pattern.finditer(unit_name):
+            if match.lastgroup == "fire":
+                return IncidentCategory.FIRE
+            category = IncidentCategory.MEDICAL
+        return category
+
+    def determine_category(
+        self, description: str, unit_names: list[str]
+    ) -> IncidentCategory:
+        """Determines the category of an incident based on the description and units assigned
+
+        :param description: The description of the incident
+        :param unit_names: The names of the units assigned to the incident
+        :return: The category of the incident
+        :rtype: IncidentCategory
+        """
+
+        # check for unit matches
+        for unit_name in unit_names:
+            category = self.unit_category(unit_name)
+            if category is not None:
+                return category
+
+        found = {m.lastgroup for m in self.description_pattern.finditer(description)}
+
+        # extra note regarding traffic incidents: they tend to not have units assigned
+        # unless there is an accompanying fire or medical incident for the same call
+        # this needs to be checked before the description check for other categories
+        if len(unit_names) == 0 and "traffic" in found:
+            return IncidentCategory.TRAFFIC
+
+        # perform a basic description check
+        if "medical" in found:
+            return IncidentCategory.MEDICAL
+        if "fire" in found:
+            return IncidentCategory.FIRE
+
+        return IncidentCategory.UNKNOWN
+
+
+CLASSIFIER = KeywordClassifier()
+""" The classifier built from the default keyword lists """
+
+
 def determine_category(description: str, unit_names: list[str]) -> IncidentCategory:
     """Determines the category of an incident based on the description and units assigned
 
@@ -58,28 +183,4 @@ def determine_category(description: str, unit_names: list[str]) -> IncidentCateg
     :return: The category of the incident
     :rtype: IncidentCategory
     """
-
-    # check for unit matches
-    for unit_name in unit_names:
-        unit_names_split = unit_name.split()
-
-        if any(k in unit_names_split for k in FIRE_UNIT_NAMES):
-            return IncidentCategory.FIRE
-        elif any(k in unit_names_split for k in MEDICAL_UNIT_NAMES):
-            return IncidentCategory.MEDICAL
-
-    # extra note regarding traffic incidents: they tend to not have units assigned
-    # unless there is an accompanying fire or medical incident for the same call
-    # this needs to be checked before the description check for other categories
-    if len(unit_names) == 0 and any(
-        k in description for k in TRAFFIC_DESCRIPTION_KEYWORDS
-    ):
-        return IncidentCategory.TRAFFIC
-
-    # perform a basic description check
-    if any(k in description for k in MEDICAL_DESCRIPTION_KEYWORDS):
-        return IncidentCategory.MEDICAL
-    if any(k in description for k in FIRE_DESCRIPTION_KEYWORDS):
-        return IncidentCategory.FIRE
-
-    return IncidentCategory.UNKNOWN
+    return CLASSIFIER.determine_category(description, unit_names)
@@ -0,0 +1,240 @@
+import logging
+import os
+import tempfile
+from typing import Iterable, Optional, Union
+
+from lcwc.arcgis.incident import ArcGISIncident, Coordinates
+from lcwc.incident import Incident
+from lcwc.normalize import (
+    DIRECTION_ABBREVIATIONS,
+    STREET_ABBREVIATIONS,
+    canonical_intersection,
+    canonical_municipality,
+)
+from lcwc.poller import PollResult
+from lcwc.utils.encoding import decode_json, encode_json
+
+"""
+Offline geocoding of feed and web incidents from the locations ArcGIS has already reported.
+
+Only ArcGIS incidents carry coordinates, but every source reports the same municipalities and
+intersections. A Gazetteer learns (municipality, intersection) -> coordinates from ArcGIS
+incidents and looks up the canonical location (see lcwc.normalize) of incidents from other
+sources, falling back to the known location in the municipality sharing the most street names.
+"""
+
+GAZETTEER_VERSION = 1
+""" The version of the on-disk gazetteer format """
+
+STOP_TOKENS = frozenset(
+    set(STREET_ABBREVIATIONS.values())
+    | set(DIRECTION_ABBREVIATIONS.values())
+    | {"&", "BLOCK", "OF"}
+)
+""" Tokens too common to identify a location, ignored by fallback matching """
+
+
+def location_tokens(intersection: str) -> frozenset[str]:
+    """Returns the tokens of a canonical intersection used for fallback matching"""
+    return frozenset(
+        token for token in intersection.split() if token not in STOP_TOKENS
+    )
+
+
+class Gazetteer:
+    """Learns the coordinates of locations from ArcGIS incidents and geocodes other incidents
+
+    Subscribe it to an ArcGIS poller (`poller.subscribe(gazetteer.update)`) so it learns as
+    incidents arrive, then call geocode() on feed or web incidents. Locations are keyed by their
+    canonical (municipality, intersection), and repeated sightings are averaged. An inverted
+    index of (municipality, token) -> locations serves the fallback, so a miss only scores the
+    locations that share a street name with the incident.
+    """
+
+    def __init__(self, min_score: float = 0.5) -> None:
+        """
+        :param min_score: The lowest token overlap (Jaccard index) accepted by fallback matching
+        """
+        self.min_score = min_score
+        self.dirty = False
+        """ Whether locations were learned since the gazetteer was last loaded or saved """
+
+        # (municipality, intersection) -> [longitude sum, latitude sum, sightings]
+        self._locations: dict[tuple[str, str], list] = {}
+        self._tokens: dict[tuple[str, str], set[tuple[str, str]]] = {}
+        self.logger = logging.getLogger(__name__)
+
+    def _add(
+        self,
+        key: tuple[str, str],
+        longitude: float,
+        latitude: float,
+        count: int = 1,
+    ) -> None:
+        entry = self._locations.get(key)
+        if entry is not None:
+            entry[0] += longitude * count
+            entry[1] += latitude * count
+            entry[2] += count
+            return
+
+        self._locations[key] = [longitude * count, latitude * count, count]
+        municipality, intersection = key
+        for token in location_tokens(intersection):
+            self._tokens.setdefault((municipality, token), set()).add(key)
+
+    def learn(self, incident: Incident) -> bool:
+        """Learns the location of an incident with coordinates
+
+        :param incident: The incident, only ArcGIS incidents with coordinates are learned
+        :return: True if the location was learned, False otherwise
+        :rtype: bool
+        """
+        if not isinstance(incident, ArcGISIncident) or incident.coordinates is None:
+            return False
+        municipality = canonical_municipality(incident.municipality)
+        intersection = canonical_intersection(incident.intersection)
+        if municipality is None or intersection is None:
+            return False
+
+        coordinates = incident.coordinates
+        self._add(
+            (municipality, intersection), coordinates.longitude, coordinates.latitude
+        )
+        self.dirty = True
+        return True
+
+    def learn_many(self, incidents: Iterable[Incident]) -> int:
+        """Learns the locations of incidents, such as those read with iter_ndjson
+
+        :param incidents: The incidents
+        :return: The number of incidents learned
+        :rtype: int
+        """
+        return sum(self.learn(incident) for incident in incidents)
+
+    def update(self, result: PollResult) -> None:
+        """Learns the locations of the incidents added or updated by a poll result
+
+        Updates are learned too, since an incident can gain coordinates or move after it was added.
+        """
+        self.learn_many(result.delta.added + result.delta.updated)
+
+    def lookup(
+        self, municipality: Optional[str], intersection: Optional[str]
+    ) -> Optional[Coordinates]:
+        """Returns the coordinates of a location
+
+        :param municipality: The municipality as reported by any source
+        :param intersection: The intersection as reported by any source
+        :return: The average coordinates of the exact location if it is known, otherwise those
+            of the best fallback match, or None
+        :rtype: Optional[Coordinates]
+        """
+        municipality = canonical_municipality(municipality)
+        intersection = canonical_intersection(intersection)
+        if municipality is None or intersection is None:
+            return None
+
+        key = (municipality, intersection)
+        entry = self._locations.get(key)
+        if entry is None:
+            key = self._match(municipality, intersection)
+            if key is None:
+                return None
+            entry = self._locations[key]
+        return Coordinates(entry[0] / entry[2], entry[1] / entry[2])
+
+    def _match(self, municipality: str, intersection: str) -> Optional[tuple[str, str]]:
+        tokens = location_tokens(intersection)
+        if not tokens:
+            return None
+
+        overlaps: dict[tuple[str, str], int] = {}
+        for token in tokens:
+            for key in self._tokens.get((municipality, token), ()):
+                overlaps[key] = overlaps.get(key, 0) + 1
+
+        best, best_rank = None, (self.min_score, 0)
+        for key, overlap in overlaps.items():
+            # ties go to the location seen most often
+            rank = (
+                overlap / len(tokens | location_tokens(key[1])),
+                self._locations[key][2],
+            )
+            if rank >= best_rank:
+                best, best_rank = key, rank
+        return best
+
+    def geocode(self, incident: Incident) -> Optional[Coordinates]:
+        """Returns the coordinates of an incident
+
+        :param incident: The incident, from any source
+        :return: The incident's own coordinates if it has them, otherwise the learned
+            coordinates of its location, or None if the location is unknown
+        :rtype: Optional[Coordinates]
+        """
+        if isinstance(incident, ArcGISIncident) and incident.coordinates is not None:
+            return incident.coordinates
+        return self.lookup(incident.municipality, incident.intersection)
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """Writes the gazetteer to a JSON file, replacing it atomically
+
+        :param path: The path to write to
+        """
+        entries = [
+            [municipality, intersection, lon / count, lat / count, count]
+            for (municipality, intersection), (lon, lat, count) in sorted(
+                self._locations.items()
+            )
+        ]
+        data = encode_json({"version": GAZETTEER_VERSION, "locations": entries})
+
+        path = os.fspath(path)
+        fd, tmp = tempfile.mkstemp(
+            dir=os.path.dirname(path) or ".", prefix=".gazetteer-"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.dirty = False
+        self.logger.debug(f"Saved {len(entries)} locations to {path}")
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike], min_score: float = 0.5) -> "Gazetteer":
+        """Reads a gazetteer written by save()
+
+        :param path: The path to read from
+        :param min_score: The lowest token overlap accepted by fallback matching
+        :return: The gazetteer, empty if the file doesn't exist
+        :rtype: Gazetteer
+        :raises ValueError: If the file was written by an unsupported version
+        """
+        gazetteer = cls(min_score)
+        if not os.path.exists(path):
+            return gazetteer
+
+        with open(path, "rb") as f:
+            data = decode_json(f.read())
+        if data.get("version") != GAZETTEER_VERSION:
+            raise ValueError(f"Unsupported gazetteer version: {data.get('version')}")
+
+        for municipality, intersection, longitude, latitude, count in data["locations"]:
+            gazetteer._add((municipality, intersection), longitude, latitude, count)
+        gazetteer.logger.debug(f"Loaded {len(gazetteer)} locations from {path}")
+        return gazetteer
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __contains__(self, location: tuple) -> bool:
+        municipality, intersection = location
+        return (
+            canonical_municipality(municipality),
+            canonical_intersection(intersection),
+        ) in self._locations
@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import Iterable, Optional
+
+from lcwc.category import IncidentCategory
+from lcwc.poller import PollResult, Poller
+
+
+class BackpressurePolicy(str, Enum):
+    """Determines what happens when a subscriber's queue is full"""
+
+    DROP_OLDEST = "drop-oldest"
+    """ Discard the oldest queued update """
+    COALESCE = "coalesce"
+    """ Merge every queued update into a single update carrying the net change """
+
+
+@dataclass
+class SubscriptionStats:
+    """Delivery and lag metrics for a subscription"""
+
+    """ The number of updates handed to the subscriber """
+    delivered: int = 0
+
+    """ The number of updates discarded because the queue was full """
+    dropped: int = 0
+
+    """ The number of updates merged because the queue was full """
+    coalesced: int = 0
+
+    """ The highest number of updates waiting in the queue """
+    max_pending: int = 0
+
+    """ The time the last delivered update spent queued, in seconds """
+    last_lag: float = 0.0
+
+    """ The longest time an update spent queued, in seconds """
+    max_lag: float = 0.0
+
+
+class Subscription:
+    """A subscriber's view of the hub, backed by its own bounded queue
+
+    Iterate with `async for result in subscription` or call get().
+    """
+
+    def __init__(
+        self,
+        hub: "IncidentHub",
+        categories: Optional[frozenset],
+        municipalities: Optional[frozenset],
+        maxsize: int,
+        policy: BackpressurePolicy,
+        include_empty: bool,
+    ) -> None:
+        self.hub = hub
+        self.categories = categories
+        self.municipalities = municipalities
+        self.policy = policy
+        self.include_empty = include_empty
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.stats = SubscriptionStats()
+        self.closed = False
+
+    @property
+    def filter_key(self) -> tuple:
+        return (self.categories, self.municipalities, self.include_empty)
+
+    @property
+    def pending(self) -> int:
+        """Returns the number of updates waiting to be consumed"""
+        return self.queue.qsize()
+
+    def matches(self, incident) -> bool:
+        if self.categories is not None and incident.category not in self.categories:
+            return False
+        if self.municipalities is not None and (
+            incident.municipality is None
+            or incident.municipality.upper() not in self.municipalities
+        ):
+            return False
+        return True
+
+    def _offer(self, result: Optional[PollResult]) -> None:
+        """Queues an update without blocking, applying the backpressure policy"""
+        item = (time.monotonic(), result)
+
+        if self.queue.full():
+            if self.policy == BackpressurePolicy.COALESCE and result is not None:
+                queued = []
+                while not self.queue.empty():
+                    queued.append(self.queue.get_nowait())
+                enqueued_at, merged = queued[0]
+                for _, newer in queued[1:] + [item]:
+                    merged = replace(newer, delta=merged.delta.merge(newer.delta))
+                self.stats.coalesced += len(queued)
+                # keep the oldest enqueue time so lag reflects the oldest change
+                item = (enqueued_at, merged)
+            else:
+                self.queue.get_nowait()
+                self.stats.dropped += 1
+
+        self.queue.put_nowait(item)
+        self.stats.max_pending = max(self.stats.max_pending, self.queue.qsize())
+
+    async def get(self) -> Optional[PollResult]:
+        """Waits for the next update, returning None once the subscription is closed"""
+        enqueued_at, result = await self.queue.get()
+        if result is None:
+            return None
+        lag = time.monotonic() - enqueued_at
+        self.stats.delivered += 1
+        self.stats.last_lag = lag
+        self.stats.max_lag = max(self.stats.max_lag, lag)
+        return result
+
+    def close(self) -> None:
+        """Unsubscribes from the hub and wakes any waiting consumer"""
+        if self.closed:
+            return
+        self.closed = True
+        self.hub._remove(self)
+        self._offer(None)
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> PollResult:
+        result = await self.get()
+        if result is None:
+            raise StopAsyncIteration
+        return result
+
+
+class IncidentHub:
+    """Fans out poll results from a single poller to many subscribers
+
+    Filters are evaluated once per distinct filter per update, no matter how many
+    subscribers share it, and a slow subscriber never blocks the others.
+    """
+
+    def __init__(self, poller: Optional[Poller] = None) -> None:
+        """
+        :param poller: (optional) The poller to subscribe to; results can also be passed to publish()
+        """
+        self.subscriptions: list[Subscription] = []
+        self.logger = logging.getLogger(__name__)
+        if poller is not None:
+            poller.subscribe(self.publish)
+
+    def subscribe(
+        self,
+        categories: Optional[Iterable[IncidentCategory]] = None,
+        municipalities: Optional[Iterable[str]] = None,
+        maxsize: int = 100,
+        policy: BackpressurePolicy = BackpressurePolicy.DROP_OLDEST,
+        include_empty: bool = False,
+    ) -> Subscription:
+        """Creates a subscription
+
+        :param categories: (optional) Only deliver incidents in these categories
+        :param municipalities: (optional) Only deliver incidents in these municipalities (case-insensitive)
+        :param maxsize: The maximum number of queued updates
+        :param policy: What to do when the queue is full
+        :param include_empty: Deliver updates even when nothing matching changed
+        :return: The subscription
+        :rtype: Subscription
+        """
+        subscription = Subscription(
+            self,
+            frozenset(categories) if categories is not None else None,
+            (
+                frozenset(m.upper() for m in municipalities)
+                if municipalities is not None
+                else None
+            ),
+            maxsize,
+            policy,
+            include_empty,
+        )
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def _remove(self, subscription: Subscription) -> None:
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+
+    def publish(self, result: PollResult) -> None:
+        """Delivers a poll result to every matching subscriber without blocking
+
+        :param result: The poll result to deliver
+        """
+        filtered: dict[tuple, Optional[PollResult]] = {}
+
+        for subscription in list(self.subscriptions):
+            key = subscription.filter_key
+            if key not in filtered:
+                filtered[key] = self._filter(subscription, result)
+            update = filtered[key]
+            if update is not None:
+                subscription._offer(update)
+
+    def _filter(
+        self, subscription: Subscription, result: PollResult
+    ) -> Optional[PollResult]:
+        if subscription.categories is None and subscription.municipalities is None:
+            update = result
+        else:
+            matches = subscription.matches
+            update = replace(
+                result,
+                incidents=[i for i in result.incidents if matches(i)],
+                delta=result.delta.filter(matches),
+            )
+
+        if not update.delta and not subscription.include_empty:
+            return None
+        return update
+
+    def stats(self) -> list[SubscriptionStats]:
+        """Returns the metrics of every subscription"""
+        return [subscription.stats for subscription in self.subscriptions]
+
+    def close(self) -> None:
+        """Closes every subscription"""
+        for subscription in list(self.subscriptions):
+            subscription.close()
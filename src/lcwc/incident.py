@@ -1,7 +1,10 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 import datetime
+import hashlib
+from typing import Optional
 
 from lcwc.category import IncidentCategory
+from lcwc.normalize import canonical_intersection, canonical_municipality
 from lcwc.unit import Unit
 
 
@@ -13,7 +16,7 @@ class Incident:
     category: IncidentCategory
 
     """ The date and time of the incident """
-    date: datetime
+    date: Optional[datetime.datetime]
 
     """ The description of the incident """
     description: str
@@ -26,3 +29,81 @@ class Incident:
 
     """ A list of units responding to the incident """
     units: list[Unit]
+
+    @property
+    def key(self):
+        """Returns a value identifying the incident across polls of the same source
+
+        Sources with static identifiers override this; otherwise the incident's
+        descriptive fields are used.
+        """
+        return (
+            self.category,
+            self.date,
+            self.description,
+            self.municipality,
+            self.intersection,
+        )
+
+    def to_dict(self) -> dict:
+        """Returns a JSON-compatible dictionary representation of the incident
+
+        :return: A dictionary of the incident fields
+        :rtype: dict
+        """
+        d = self.__dict__.copy()
+        d["category"] = self.category.value
+        d["date"] = self.date.isoformat() if self.date else None
+        d["units"] = [unit.to_dict() for unit in self.units]
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Incident":
+        """Creates an incident from a dictionary produced by to_dict
+
+        :param d: The dictionary to convert
+        :return: An incident of the calling type
+        :rtype: Incident
+        """
+        d = d.copy()
+        d["category"] = IncidentCategory(d["category"])
+        if d.get("date"):
+            d["date"] = datetime.datetime.fromisoformat(d["date"])
+        d["units"] = [Unit.from_dict(unit) for unit in d.get("units") or []]
+        # derived fields (ex: WebIncident.fingerprint) are computed, not passed in
+        init_fields = {f.name for f in fields(cls) if f.init}
+        return cls(**{k: v for k, v in d.items() if k in init_fields})
+
+
+def fingerprint(
+    category: IncidentCategory,
+    date: Optional[datetime.datetime],
+    municipality: Optional[str],
+    intersection: Optional[str],
+) -> str:
+    """Returns a stable identifier for an incident built from the fields every source reports
+
+    The date is floored to the minute in UTC, since the web page only reports minutes, and
+    the location is compared in its canonical form (see lcwc.normalize).
+
+    :param category: The category of the incident
+    :param date: The date and time of the incident
+    :param municipality: The municipality of the incident
+    :param intersection: The intersection of the incident
+    :return: A 16 character hex digest
+    :rtype: str
+    """
+    if date is not None:
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=datetime.timezone.utc)
+        date = date.astimezone(datetime.timezone.utc).replace(second=0, microsecond=0)
+
+    parts = [
+        category.value if category is not None else "",
+        date.isoformat() if date is not None else "",
+        canonical_municipality(municipality) or "",
+        canonical_intersection(intersection) or "",
+    ]
+    return hashlib.blake2b(
+        "\x1f".join(parts).encode("utf-8"), digest_size=8
+    ).hexdigest()
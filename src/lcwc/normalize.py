@@ -0,0 +1,134 @@
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from lcwc.incident import Incident
+
+"""
+Canonical forms of municipalities and intersections, so the same place reported by different
+sources (ex: "E HEMPFIELD TWP" and "EAST HEMPFIELD TOWNSHIP") compares equal and can be used
+as a dictionary key. Results are memoized, since the same few hundred places repeat on every poll.
+"""
+
+STREET_ABBREVIATIONS = {
+    "ALY": "ALLEY",
+    "AV": "AVENUE",
+    "AVE": "AVENUE",
+    "BLVD": "BOULEVARD",
+    "CIR": "CIRCLE",
+    "CT": "COURT",
+    "DR": "DRIVE",
+    "EXPY": "EXPRESSWAY",
+    "HWY": "HIGHWAY",
+    "LN": "LANE",
+    "PK": "PIKE",
+    "PKWY": "PARKWAY",
+    "PL": "PLACE",
+    "RD": "ROAD",
+    "RT": "ROUTE",
+    "RTE": "ROUTE",
+    "SQ": "SQUARE",
+    "ST": "STREET",
+    "TER": "TERRACE",
+    "TPKE": "TURNPIKE",
+}
+""" Street suffix abbreviations and their expansions """
+
+DIRECTION_ABBREVIATIONS = {
+    "N": "NORTH",
+    "S": "SOUTH",
+    "E": "EAST",
+    "W": "WEST",
+    "NE": "NORTHEAST",
+    "NW": "NORTHWEST",
+    "SE": "SOUTHEAST",
+    "SW": "SOUTHWEST",
+}
+""" Compass direction abbreviations and their expansions """
+
+MUNICIPALITY_ABBREVIATIONS = {
+    "TWP": "TOWNSHIP",
+    "TWSP": "TOWNSHIP",
+    "TOWNSHP": "TOWNSHIP",
+    "BORO": "BOROUGH",
+    "BORUGH": "BOROUGH",
+    "MT": "MOUNT",
+}
+""" Municipality abbreviations and their expansions """
+
+INTERSECTION_SEPARATOR = " & "
+""" The separator between the streets of a canonical intersection """
+
+_PUNCTUATION = re.compile(r"[.,]")
+_SEPARATOR = re.compile(r"\s*(?:&|/|\bAND\b)\s*")
+
+_STREET_TOKENS = {**DIRECTION_ABBREVIATIONS, **STREET_ABBREVIATIONS}
+_MUNICIPALITY_TOKENS = {**DIRECTION_ABBREVIATIONS, **MUNICIPALITY_ABBREVIATIONS}
+
+
+def collapse_whitespace(value: str) -> str:
+    """Strips the value and collapses runs of whitespace into single spaces"""
+    return " ".join(value.split())
+
+
+def _expand(value: str, abbreviations: dict[str, str]) -> str:
+    tokens = _PUNCTUATION.sub(" ", value.upper()).split()
+    return " ".join(abbreviations.get(token, token) for token in tokens)
+
+
+@lru_cache(maxsize=4096)
+def canonical_municipality(municipality: Optional[str]) -> Optional[str]:
+    """Returns the canonical form of a municipality name
+
+    :param municipality: The municipality as reported by a source
+    :return: The upper-cased name with abbreviations expanded, or None if empty
+    :rtype: Optional[str]
+    """
+    if not municipality:
+        return None
+    return _expand(municipality, _MUNICIPALITY_TOKENS) or None
+
+
+@lru_cache(maxsize=4096)
+def canonical_street(street: Optional[str]) -> Optional[str]:
+    """Returns the canonical form of a street name (ex: "N DUKE ST" -> "NORTH DUKE STREET")"""
+    if not street:
+        return None
+    return _expand(street, _STREET_TOKENS) or None
+
+
+@lru_cache(maxsize=16384)
+def canonical_intersection(intersection: Optional[str]) -> Optional[str]:
+    """Returns the canonical form of an intersection or address
+
+    Each street is canonicalized and the streets are sorted, so "RD A & RD B" and
+    "RD B / RD A" have the same canonical form.
+
+    :param intersection: The intersection as reported by a source
+    :return: The canonical intersection, or None if empty
+    :rtype: Optional[str]
+    """
+    if not intersection:
+        return None
+    streets = [canonical_street(s) for s in _SEPARATOR.split(intersection.upper())]
+    streets = sorted(s for s in streets if s)
+    return INTERSECTION_SEPARATOR.join(streets) or None
+
+
+def location_key(incident: "Incident") -> tuple[Optional[str], Optional[str]]:
+    """Returns the canonical (municipality, intersection) of an incident, for cross-source joins"""
+    return (
+        canonical_municipality(incident.municipality),
+        canonical_intersection(incident.intersection),
+    )
+
+
+def clear_caches() -> None:
+    """Clears the memoized canonical forms"""
+    for func in (
+        canonical_municipality,
+        canonical_street,
+        canonical_intersection,
+    ):
+        func.cache_clear()
@@ -0,0 +1,183 @@
+import asyncio
+import datetime
+import inspect
+import logging
+import random
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from aiohttp import ClientSession
+
+from lcwc.client import Client
+from lcwc.delta import IncidentDelta, diff_incidents
+from lcwc.incident import Incident
+from lcwc.utils.diagnostics import ParseDiagnostics
+
+
+@dataclass
+class PollResult:
+    """Represents the outcome of a single poll"""
+
+    """ The client that was polled """
+    client: Client
+
+    """ The time the poll completed """
+    timestamp: datetime.datetime
+
+    """ The incidents returned by the poll """
+    incidents: list[Incident] = field(default_factory=list)
+
+    """ The changes since the previous successful poll """
+    delta: IncidentDelta = field(default_factory=IncidentDelta)
+
+    """ The interval until the next poll, in seconds """
+    next_interval: float = 0.0
+
+    """ The parse diagnostics reported by the client, if any """
+    diagnostics: Optional[ParseDiagnostics] = None
+
+
+Subscriber = Callable[[PollResult], Union[None, Awaitable[None]]]
+
+
+class Poller:
+    """Polls a client on an interval that adapts to incident churn
+
+    The interval shrinks towards `min_interval` while incidents or units are changing and
+    grows towards `max_interval` while nothing changes. Each sleep is randomized by
+    `jitter` so replicas polling the same source drift apart instead of hitting it at once.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        session: Optional[ClientSession] = None,
+        interval: float = 30,
+        min_interval: Optional[float] = None,
+        max_interval: float = 120,
+        speedup: float = 0.5,
+        slowdown: float = 1.25,
+        jitter: float = 0.1,
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param client: The client to poll
+        :param session: (optional) The session to pass to the client, defaults to the client's own
+        :param interval: The initial interval in seconds
+        :param min_interval: The shortest interval, never below the client's MIN_POLL_INTERVAL
+        :param max_interval: The longest interval while idle or failing
+        :param speedup: The factor applied to the interval after a poll with changes
+        :param slowdown: The factor applied to the interval after a poll without changes
+        :param jitter: The fraction by which each sleep is randomized
+        :param kwargs: Additional arguments passed to client.get_incidents
+        """
+        self.client = client
+        self.session = session
+        self.min_interval = max(min_interval or 0, client.MIN_POLL_INTERVAL)
+        self.max_interval = max(max_interval, self.min_interval)
+        self.interval = min(max(interval, self.min_interval), self.max_interval)
+        self.speedup = speedup
+        self.slowdown = slowdown
+        self.jitter = jitter
+        self.kwargs = kwargs
+
+        self.incidents: list[Incident] = []
+        """ The incidents from the last successful poll """
+
+        self.last_result: Optional[PollResult] = None
+
+        self._subscribers: list[Subscriber] = []
+        self._task: Optional[asyncio.Task] = None
+        self._stop_requested = False
+        # created by run() so the event belongs to the running loop
+        self._wakeup: Optional[asyncio.Event] = None
+        self.logger = logging.getLogger(__name__)
+
+    def subscribe(self, subscriber: Subscriber) -> Callable[[], None]:
+        """Registers a callback (sync or async) that receives every PollResult
+
+        :param subscriber: The callback to register
+        :return: A function that unsubscribes the callback
+        :rtype: Callable[[], None]
+        """
+        self._subscribers.append(subscriber)
+        return lambda: self._subscribers.remove(subscriber)
+
+    def _adapt(self, churn: int) -> None:
+        if churn > 0:
+            self.interval = max(self.min_interval, self.interval * self.speedup)
+        else:
+            self.interval = min(self.max_interval, self.interval * self.slowdown)
+
+    def next_sleep(self) -> float:
+        """Returns the jittered delay until the next poll, in seconds"""
+        jittered = self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(self.min_interval, jittered)
+
+    async def poll_once(self) -> PollResult:
+        """Polls the client once, adapts the interval and notifies subscribers
+
+        :return: The result of the poll
+        :rtype: PollResult
+        """
+        incidents = await self.client.get_incidents(self.session, **self.kwargs)
+        delta = diff_incidents(self.incidents, incidents)
+        self.incidents = incidents
+        self._adapt(delta.churn)
+
+        result = PollResult(
+            self.client,
+            datetime.datetime.now(datetime.timezone.utc),
+            incidents,
+            delta,
+            self.interval,
+            self.client.diagnostics,
+        )
+        self.last_result = result
+
+        for subscriber in list(self._subscribers):
+            try:
+                ret = subscriber(result)
+                if inspect.isawaitable(ret):
+                    await ret
+            except Exception:
+                self.logger.exception(f"Subscriber failed for {self.client.name}")
+
+        return result
+
+    async def run(self) -> None:
+        """Polls until stop() is called"""
+        self._wakeup = asyncio.Event()
+        while not self._stop_requested:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # back off while the source is failing
+                self.logger.error(f"Polling {self.client.name} failed: {e}")
+                self._adapt(0)
+
+            if self._stop_requested:
+                break
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.next_sleep())
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> asyncio.Task:
+        """Starts polling in a background task"""
+        if self._task is None or self._task.done():
+            self._stop_requested = False
+            self._task = asyncio.ensure_future(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Stops polling and waits for the current poll to finish"""
+        self._stop_requested = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
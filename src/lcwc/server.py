@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import logging
+from typing import Iterable, Optional
+
+from aiohttp import ClientSession, web
+
+from lcwc.category import IncidentCategory
+from lcwc.client import Client
+from lcwc.hub import BackpressurePolicy, IncidentHub
+from lcwc.poller import PollResult, Poller
+from lcwc.utils.encoding import encode_json, to_tagged_dict
+from lcwc.utils.session import create_session
+
+"""
+Endpoints:
+
+    GET /incidents[?source=FeedClient]
+        The latest incidents from every (or one) source as a JSON array of type-tagged incidents.
+        Served from memory with an ETag, so unchanged snapshots are answered with 304.
+
+    GET /stream[?category=Fire&municipality=...]
+        A Server-Sent Events stream with one "delta" event per poll that changed matching incidents.
+"""
+
+
+class IncidentServer:
+    """Serves incidents from a single set of shared pollers to any number of HTTP clients"""
+
+    HEARTBEAT_INTERVAL = 15
+    """ How often a keep-alive comment is sent on idle streams, in seconds """
+
+    def __init__(
+        self,
+        clients: Iterable[Client],
+        session: Optional[ClientSession] = None,
+        interval: float = 30,
+        max_queue: int = 100,
+    ) -> None:
+        """
+        :param clients: The clients to poll
+        :param session: (optional) The session shared by the pollers, created on startup if omitted
+        :param interval: The initial polling interval in seconds
+        :param max_queue: The maximum number of queued updates per stream subscriber
+        """
+        self.clients = list(clients)
+        self.session = session
+        self._owns_session = session is None
+        self.interval = interval
+        self.max_queue = max_queue
+
+        self.pollers: list[Poller] = []
+        self.hub: Optional[IncidentHub] = None
+        self.snapshots: dict[str, PollResult] = {}
+        self._bodies: dict[str, tuple[bytes, str]] = {}
+        self.logger = logging.getLogger(__name__)
+
+    def create_app(self) -> web.Application:
+        """Creates the aiohttp application, starting the pollers with it"""
+        app = web.Application()
+        app.router.add_get("/incidents", self.handle_incidents)
+        app.router.add_get("/stream", self.handle_stream)
+        app.on_startup.append(self._on_startup)
+        app.on_shutdown.append(self._on_shutdown)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    async def _on_startup(self, app: web.Application) -> None:
+        if self.session is None:
+            self.session = create_session()
+
+        self.hub = IncidentHub()
+        for client in self.clients:
+            poller = Poller(client, self.session, interval=self.interval)
+            poller.subscribe(self._on_result)
+            poller.subscribe(self.hub.publish)
+            self.pollers.append(poller)
+            poller.start()
+
+    async def _on_shutdown(self, app: web.Application) -> None:
+        # ends open streams so the server can shut down
+        if self.hub is not None:
+            self.hub.close()
+
+    async def _on_cleanup(self, app: web.Application) -> None:
+        await asyncio.gather(*[poller.stop() for poller in self.pollers])
+        self.pollers = []
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _on_result(self, result: PollResult) -> None:
+        self.snapshots[result.client.name] = result
+        # rendered bodies are invalidated and re-rendered on the next request
+        self._bodies.clear()
+
+    def _render(self, source: Optional[str]) -> tuple[bytes, str]:
+        key = source or ""
+        cached = self._bodies.get(key)
+        if cached is not None:
+            return cached
+
+        incidents = []
+        for name, result in self.snapshots.items():
+            if source is None or name == source:
+                incidents.extend(to_tagged_dict(i) for i in result.incidents)
+
+        body = encode_json(incidents)
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        self._bodies[key] = (body, etag)
+        return body, etag
+
+    async def handle_incidents(self, request: web.Request) -> web.StreamResponse:
+        source = request.query.get("source")
+        if source is not None and source not in self.snapshots:
+            if source not in [client.name for client in self.clients]:
+                raise web.HTTPNotFound(text=f"Unknown source: {source}")
+
+        body, etag = self._render(source)
+        max_age = min((p.interval for p in self.pollers), default=self.interval)
+        headers = {"ETag": etag, "Cache-Control": f"max-age={int(max_age)}"}
+
+        if etag in request.headers.get("If-None-Match", ""):
+            return web.Response(status=304, headers=headers)
+
+        response = web.Response(
+            body=body, content_type="application/json", headers=headers
+        )
+        response.enable_compression()
+        return response
+
+    async def handle_stream(self, request: web.Request) -> web.StreamResponse:
+        categories = None
+        if "category" in request.query:
+            try:
+                categories = [
+                    IncidentCategory(c) for c in request.query.getall("category")
+                ]
+            except ValueError as e:
+                raise web.HTTPBadRequest(text=str(e))
+        municipalities = request.query.getall("municipality", None)
+
+        response = web.StreamResponse(
+            headers={
+                "Content-Type": "text/event-stream",
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",
+            }
+        )
+        await response.prepare(request)
+
+        subscription = self.hub.subscribe(
+            categories,
+            municipalities,
+            self.max_queue,
+            BackpressurePolicy.COALESCE,
+        )
+        try:
+            while True:
+                try:
+                    result = await asyncio.wait_for(
+                        subscription.get(), self.HEARTBEAT_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    await response.write(b": keep-alive\n\n")
+                    continue
+
+                if result is None:
+                    break
+
+                # incidents are tagged with their type, as in /incidents
+                delta = result.delta
+                event = {
+                    "added": [to_tagged_dict(i) for i in delta.added],
+                    "removed": [to_tagged_dict(i) for i in delta.removed],
+                    "updated": [to_tagged_dict(i) for i in delta.updated],
+                }
+                event["source"] = result.client.name
+                event["timestamp"] = result.timestamp.isoformat()
+                await response.write(
+                    b"event: delta\ndata: " + encode_json(event) + b"\n\n"
+                )
+        except ConnectionResetError:
+            pass
+        finally:
+            subscription.close()
+
+        return response
+
+    def run(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        """Runs the server until interrupted"""
+        web.run_app(self.create_app(), host=host, port=port)
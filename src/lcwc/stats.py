@@ -0,0 +1,298 @@
+import datetime
+import logging
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import pytz
+
+from lcwc.agencies.agency import Agency
+from lcwc.agencies.agencyresolver import AgencyResolver
+from lcwc.arcgis.incident import ArcGISIncident
+from lcwc.category import IncidentCategory
+from lcwc.incident import Incident
+from lcwc.poller import PollResult
+
+DEFAULT_TIMEZONE = pytz.timezone("America/New_York")
+""" The time zone busiest hours are reported in """
+
+
+def _timestamp(date: Optional[datetime.datetime]) -> float:
+    if date is None:
+        return datetime.datetime.now(datetime.timezone.utc).timestamp()
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=datetime.timezone.utc)
+    return date.timestamp()
+
+
+class RingCounter:
+    """Counts events in fixed-width time buckets over a rolling window
+
+    Buckets live in a fixed-size ring indexed by bucket number modulo its size, so adding an
+    event is O(1) and a bucket is reset lazily when the ring wraps around to it.
+    """
+
+    def __init__(self, bucket_seconds: float = 3600, buckets: int = 24 * 28) -> None:
+        """
+        :param bucket_seconds: The width of each bucket in seconds
+        :param buckets: The number of buckets kept, so the window is bucket_seconds * buckets
+        """
+        self.bucket_seconds = bucket_seconds
+        self.size = buckets
+        self.ids: list[Optional[int]] = [None] * buckets
+        self.values: list[int] = [0] * buckets
+        self.latest: Optional[int] = None
+
+    def _slot(self, timestamp: float) -> Optional[int]:
+        bucket = int(timestamp // self.bucket_seconds)
+        if self.latest is not None and bucket <= self.latest - self.size:
+            return None  # older than the ring can hold
+        if self.latest is None or bucket > self.latest:
+            self.latest = bucket
+        slot = bucket % self.size
+        if self.ids[slot] != bucket:
+            self.ids[slot] = bucket
+            self.values[slot] = 0
+        return slot
+
+    def add(self, timestamp: float, value: int = 1) -> None:
+        """Adds to the bucket containing the timestamp (events older than the ring are ignored)"""
+        slot = self._slot(timestamp)
+        if slot is not None:
+            self.values[slot] += value
+
+    def maximum(self, timestamp: float, value: int) -> None:
+        """Raises the bucket containing the timestamp to at least the given value"""
+        slot = self._slot(timestamp)
+        if slot is not None and value > self.values[slot]:
+            self.values[slot] = value
+
+    def buckets(self, now: float, window: float) -> Iterable[tuple[int, int]]:
+        """Yields (bucket start timestamp, value) for the non-empty buckets overlapping the window"""
+        end = int(now // self.bucket_seconds)
+        start = int((now - window) // self.bucket_seconds)
+        for bucket, value in zip(self.ids, self.values):
+            if bucket is not None and start <= bucket <= end and value:
+                yield bucket * self.bucket_seconds, value
+
+    def total(self, now: float, window: float) -> int:
+        return sum(value for _, value in self.buckets(now, window))
+
+    def peak(self, now: float, window: float) -> int:
+        return max((value for _, value in self.buckets(now, window)), default=0)
+
+
+class AgencyStats:
+    """Rolling per-agency workload statistics: call volume, concurrent commitments and busiest hours
+
+    Subscribe it to a poller (`poller.subscribe(stats.update)`) or backfill it from an archive
+    (`stats.backfill(iter_ndjson(path))`). An agency is credited with a call the first time one
+    of its units (or, for ArcGIS incidents, the primary agency) appears on an incident, at the
+    incident's date. Counters are ring buffers per (agency, category), so every update is O(1)
+    and windowed queries only visit the buckets of that agency.
+    """
+
+    def __init__(
+        self,
+        agency_resolver: AgencyResolver = AgencyResolver(),
+        bucket_seconds: float = 3600,
+        buckets: int = 24 * 28,
+        max_tracked: int = 10000,
+    ) -> None:
+        """
+        :param agency_resolver: Resolves the primary agency of ArcGIS incidents
+        :param bucket_seconds: The width of each counter bucket in seconds
+        :param buckets: The number of buckets kept per agency and category
+        :param max_tracked: The number of incidents remembered to avoid counting a call twice
+        """
+        self.agency_resolver = agency_resolver
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self.max_tracked = max_tracked
+
+        self.calls: dict[tuple[Agency, IncidentCategory], RingCounter] = {}
+        self.peaks: dict[tuple[Agency, IncidentCategory], RingCounter] = {}
+        self.committed: dict[tuple[Agency, IncidentCategory], int] = {}
+
+        # (category, agencies already credited) for each incident, oldest first
+        self._incidents: OrderedDict = OrderedDict()
+        self.logger = logging.getLogger(__name__)
+
+    def agencies_of(self, incident: Incident) -> set[Agency]:
+        """Returns the agencies working an incident"""
+        agencies = {unit.agency for unit in incident.units if unit.agency is not None}
+        if isinstance(incident, ArcGISIncident) and incident.agency:
+            primary = self.agency_resolver.get_station_index(incident.category).get(
+                str(incident.agency)
+            )
+            if primary is not None:
+                agencies.add(primary)
+        return agencies
+
+    def _counter(self, counters: dict, key: tuple) -> RingCounter:
+        counter = counters.get(key)
+        if counter is None:
+            counter = counters[key] = RingCounter(self.bucket_seconds, self.buckets)
+        return counter
+
+    def observe(
+        self,
+        incident: Incident,
+        source: str = "",
+        timestamp: Optional[datetime.datetime] = None,
+        commit: bool = True,
+    ) -> None:
+        """Records an incident that was added or updated
+
+        :param incident: The incident
+        :param source: The name of the client the incident came from
+        :param timestamp: The time of the observation used for concurrency, defaults to now
+        :param commit: Whether the agencies are counted as committed until release() is called
+        """
+        key = (source, type(incident).__name__, incident.key)
+        tracked = self._incidents.get(key)
+        if tracked is None:
+            tracked = self._incidents[key] = (incident.category, set())
+            if len(self._incidents) > self.max_tracked:
+                _, (category, forgotten) = self._incidents.popitem(last=False)
+                if commit:
+                    self._release(forgotten, category)
+        credited = tracked[1]
+
+        new = self.agencies_of(incident) - credited
+        if not new:
+            return
+
+        date = _timestamp(incident.date or timestamp)
+        now = _timestamp(timestamp)
+        for agency in new:
+            credited.add(agency)
+            stat_key = (agency, incident.category)
+            self._counter(self.calls, stat_key).add(date)
+            if commit:
+                committed = self.committed.get(stat_key, 0) + 1
+                self.committed[stat_key] = committed
+                self._counter(self.peaks, stat_key).maximum(now, committed)
+
+    def release(self, incident: Incident, source: str = "") -> None:
+        """Records that an incident has closed, ending its agencies' commitments"""
+        key = (source, type(incident).__name__, incident.key)
+        tracked = self._incidents.pop(key, None)
+        if tracked is not None:
+            self._release(tracked[1], tracked[0])
+
+    def _release(self, agencies: set[Agency], category: IncidentCategory) -> None:
+        for agency in agencies:
+            stat_key = (agency, category)
+            if self.committed.get(stat_key, 0) > 0:
+                self.committed[stat_key] -= 1
+
+    def update(self, result: PollResult) -> None:
+        """Records the changes of a poll result"""
+        source = result.client.name
+        for incident in result.delta.added + result.delta.updated:
+            self.observe(incident, source, result.timestamp)
+        for incident in result.delta.removed:
+            self.release(incident, source)
+
+    def backfill(self, incidents: Iterable[Incident]) -> int:
+        """Counts the calls of archived incidents, such as those read with iter_ndjson
+
+        Archives don't record when incidents closed, so commitments aren't tracked.
+
+        :param incidents: The archived incidents, in the order they were written
+        :return: The number of incidents read
+        :rtype: int
+        """
+        count = 0
+        for incident in incidents:
+            self.observe(incident, "archive", incident.date, commit=False)
+            count += 1
+        self.logger.debug(f"Backfilled {count} incidents")
+        return count
+
+    def _keys(
+        self, counters: dict, agency: Agency, category: Optional[IncidentCategory]
+    ) -> list:
+        if category is not None:
+            return [(agency, category)] if (agency, category) in counters else []
+        return [key for key in counters if key[0] == agency]
+
+    def call_volume(
+        self,
+        agency: Agency,
+        category: Optional[IncidentCategory] = None,
+        window: datetime.timedelta = datetime.timedelta(hours=24),
+        now: Optional[datetime.datetime] = None,
+    ) -> int:
+        """Returns the number of calls an agency was credited with within the window
+
+        :param agency: The agency
+        :param category: (optional) Only count calls of this category
+        :param window: How far back to count
+        :param now: The end of the window, defaults to now
+        :return: The number of calls
+        :rtype: int
+        """
+        end, seconds = _timestamp(now), window.total_seconds()
+        return sum(
+            self.calls[key].total(end, seconds)
+            for key in self._keys(self.calls, agency, category)
+        )
+
+    def concurrent(
+        self, agency: Agency, category: Optional[IncidentCategory] = None
+    ) -> int:
+        """Returns the number of open incidents an agency is currently committed to"""
+        return sum(
+            self.committed[key] for key in self._keys(self.committed, agency, category)
+        )
+
+    def peak_concurrent(
+        self,
+        agency: Agency,
+        category: Optional[IncidentCategory] = None,
+        window: datetime.timedelta = datetime.timedelta(hours=24),
+        now: Optional[datetime.datetime] = None,
+    ) -> int:
+        """Returns the most incidents an agency was committed to at once within the window
+
+        Without a category, this is the highest of the per-category peaks.
+        """
+        end, seconds = _timestamp(now), window.total_seconds()
+        return max(
+            (
+                self.peaks[key].peak(end, seconds)
+                for key in self._keys(self.peaks, agency, category)
+            ),
+            default=0,
+        )
+
+    def busiest_hours(
+        self,
+        agency: Agency,
+        category: Optional[IncidentCategory] = None,
+        window: datetime.timedelta = datetime.timedelta(days=7),
+        now: Optional[datetime.datetime] = None,
+        top: int = 3,
+        tz: datetime.tzinfo = DEFAULT_TIMEZONE,
+    ) -> list[tuple[int, int]]:
+        """Returns the hours of the day with the most calls within the window
+
+        :return: Up to `top` (hour, calls) pairs, busiest first
+        :rtype: list[tuple[int, int]]
+        """
+        end, seconds = _timestamp(now), window.total_seconds()
+        hours = [0] * 24
+        for key in self._keys(self.calls, agency, category):
+            for start, value in self.calls[key].buckets(end, seconds):
+                hour = datetime.datetime.fromtimestamp(start, tz).hour
+                hours[hour] += value
+        busiest = sorted(
+            ((hour, calls) for hour, calls in enumerate(hours) if calls),
+            key=lambda item: (-item[1], item[0]),
+        )
+        return busiest[:top]
+
+    def agencies(self) -> set[Agency]:
+        """Returns every agency with recorded calls"""
+        return {agency for agency, _ in self.calls}
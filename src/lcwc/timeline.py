@@ -0,0 +1,242 @@
+import datetime
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Hashable, Iterable, Optional
+
+from lcwc.agencies.agency import Agency
+from lcwc.incident import Incident
+from lcwc.poller import PollResult
+
+
+@dataclass
+class UnitAssignment:
+    """The period a unit was seen assigned to an incident
+
+    Polls only show which units are assigned, so first_seen approximates the dispatch time and
+    last_seen the time the unit cleared, both to within a polling interval.
+    """
+
+    """ The name of the client the incident came from """
+    source: str
+
+    """ The key of the incident (see Incident.key) """
+    incident_key: Hashable
+
+    """ The full name of the unit """
+    unit: str
+
+    """ The agency of the unit, if known """
+    agency: Optional[Agency]
+
+    """ The first poll the unit was seen on the incident """
+    first_seen: datetime.datetime
+
+    """ The last poll the unit was seen on the incident """
+    last_seen: datetime.datetime
+
+    """ Whether the unit has left the incident (or the incident has closed) """
+    cleared: bool
+
+    @property
+    def duration(self) -> datetime.timedelta:
+        return self.last_seen - self.first_seen
+
+
+@dataclass
+class AssignmentStats:
+    """Running totals of completed assignments"""
+
+    """ The number of completed assignments """
+    count: int = 0
+
+    """ The total time assigned, in seconds """
+    total: float = 0.0
+
+    @property
+    def mean(self) -> Optional[datetime.timedelta]:
+        """The average time assigned, or None without completed assignments"""
+        if not self.count:
+            return None
+        return datetime.timedelta(seconds=self.total / self.count)
+
+
+def _timestamp(date: datetime.datetime) -> float:
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=datetime.timezone.utc)
+    return date.timestamp()
+
+
+def _datetime(timestamp: float) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
+
+
+class UnitTimeline:
+    """Tracks when units are first and last seen on each incident across polls
+
+    Subscribe it to a poller (`poller.subscribe(timeline.update)`) or feed it results directly.
+    Open assignments are kept as [first_seen, last_seen, agency] keyed by
+    (source, incident key, unit name) with timestamps as floats, and completed assignments are
+    appended to a queue that compaction trims to the retention window. Per-agency averages are
+    updated as assignments complete, so queries never rescan the history.
+    """
+
+    def __init__(
+        self,
+        retention: datetime.timedelta = datetime.timedelta(hours=6),
+        compact_every: int = 100,
+    ) -> None:
+        """
+        :param retention: How long completed assignments are kept, and how long an open
+            assignment may go unseen (ex: its source stopped polling) before it is completed
+        :param compact_every: The number of updates between automatic compactions
+        """
+        self.retention = retention.total_seconds()
+        self.compact_every = compact_every
+
+        self._open: dict[tuple, list] = {}
+        self._open_by_source: dict[str, set] = {}
+        self._closed: deque = deque()
+        self._stats: dict[Optional[Agency], AssignmentStats] = {}
+        self._updates = 0
+        self.logger = logging.getLogger(__name__)
+
+    def update(self, result: PollResult) -> None:
+        """Records the units of a poll result"""
+        self.record(result.client.name, result.incidents, result.timestamp)
+
+    def record(
+        self, source: str, incidents: Iterable[Incident], timestamp: datetime.datetime
+    ) -> None:
+        """Records the units assigned to the incidents of a poll
+
+        Units of the source that are no longer present are completed at the last poll they
+        were seen in.
+
+        :param source: The name of the client that was polled
+        :param incidents: Every incident returned by the poll
+        :param timestamp: The time of the poll
+        """
+        now = _timestamp(timestamp)
+        seen = set()
+        for incident in incidents:
+            incident_key = incident.key
+            for unit in incident.units:
+                key = (source, incident_key, unit.full_name)
+                seen.add(key)
+                entry = self._open.get(key)
+                if entry is None:
+                    self._open[key] = [now, now, unit.agency]
+                else:
+                    entry[1] = now
+
+        previous = self._open_by_source.get(source, set())
+        for key in previous - seen:
+            self._complete(key)
+        self._open_by_source[source] = seen
+
+        self._updates += 1
+        if self.compact_every and self._updates % self.compact_every == 0:
+            self.compact(timestamp)
+
+    def _complete(self, key: tuple) -> None:
+        first, last, agency = self._open.pop(key)
+        stats = self._stats.get(agency)
+        if stats is None:
+            stats = self._stats[agency] = AssignmentStats()
+        stats.count += 1
+        stats.total += last - first
+        self._closed.append((key, first, last, agency))
+
+    def compact(self, now: Optional[datetime.datetime] = None) -> int:
+        """Drops completed assignments older than the retention window and completes open
+        assignments that haven't been seen within it
+
+        :param now: The current time, defaults to now
+        :return: The number of completed assignments dropped
+        :rtype: int
+        """
+        cutoff = (
+            _timestamp(now)
+            if now is not None
+            else datetime.datetime.now(datetime.timezone.utc).timestamp()
+        ) - self.retention
+
+        stale = [key for key, entry in self._open.items() if entry[1] < cutoff]
+        for key in stale:
+            self._open_by_source.get(key[0], set()).discard(key)
+            self._complete(key)
+
+        dropped = 0
+        # completed assignments are appended in roughly completion order
+        while self._closed and self._closed[0][2] < cutoff:
+            self._closed.popleft()
+            dropped += 1
+
+        if dropped or stale:
+            self.logger.debug(
+                "Compacted timeline: %d dropped, %d stale", dropped, len(stale)
+            )
+        return dropped
+
+    def average_assigned_time(
+        self, agency: Optional[Agency] = None
+    ) -> Optional[datetime.timedelta]:
+        """Returns the average time units stay assigned to an incident
+
+        Only completed assignments count. Totals are kept since the timeline was created and
+        are not affected by compaction.
+
+        :param agency: (optional) The agency to average over, otherwise every agency
+        :return: The average duration, or None without completed assignments
+        :rtype: Optional[datetime.timedelta]
+        """
+        if agency is not None:
+            stats = self._stats.get(agency)
+            return stats.mean if stats is not None else None
+
+        total = AssignmentStats()
+        for stats in self._stats.values():
+            total.count += stats.count
+            total.total += stats.total
+        return total.mean
+
+    def agency_stats(self) -> dict[Optional[Agency], AssignmentStats]:
+        """Returns the completed assignment totals per agency (None for units without one)"""
+        return dict(self._stats)
+
+    def assignments(
+        self, incident_key: Optional[Hashable] = None
+    ) -> list[UnitAssignment]:
+        """Returns the open and retained completed assignments, optionally of a single incident"""
+
+        def make(key: tuple, first: float, last: float, agency, cleared: bool):
+            return UnitAssignment(
+                key[0],
+                key[1],
+                key[2],
+                agency,
+                _datetime(first),
+                _datetime(last),
+                cleared,
+            )
+
+        assignments = [
+            make(key, first, last, agency, True)
+            for key, first, last, agency in self._closed
+            if incident_key is None or key[1] == incident_key
+        ]
+        assignments.extend(
+            make(key, first, last, agency, False)
+            for key, (first, last, agency) in self._open.items()
+            if incident_key is None or key[1] == incident_key
+        )
+        return assignments
+
+    @property
+    def open_count(self) -> int:
+        """The number of units currently assigned"""
+        return len(self._open)
+
+    def __len__(self) -> int:
+        return len(self._open) + len(self._closed)
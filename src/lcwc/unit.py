@@ -35,11 +35,39 @@ class Unit:
     """ The unit is pending assignment """
     pending: Optional[bool] = False
 
+    def to_dict(self) -> dict:
+        """Returns a JSON-compatible dictionary representation of the unit
+
+        :return: A dictionary of the unit fields
+        :rtype: dict
+        """
+        d = self.__dict__.copy()
+        if self.agency is not None:
+            d["agency"] = self.agency.to_dict()
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Unit":
+        """Creates a unit from a dictionary produced by to_dict
+
+        :param d: The dictionary to convert
+        :return: A Unit object
+        :rtype: Unit
+        """
+        agency = d.get("agency")
+        if agency is not None:
+            d = d.copy()
+            d["agency"] = Agency.from_dict(agency)
+        return cls(**d)
+
     def __eq__(self, other):
         if not isinstance(other, Unit):
             return NotImplemented
         return self.full_name == other.full_name
 
+    def __hash__(self) -> int:
+        return hash(self.full_name)
+
     def __str__(self) -> str:
         if self.full_name:
             return self.full_name
@@ -1,10 +1,14 @@
 import datetime
-from lcwc.web.incident import WebIncident as Incident
+from lcwc.incident import Incident
+from lcwc.normalize import canonical_intersection
 
 
 def is_related_incident(a: Incident, b: Incident, delta: datetime.timedelta) -> bool:
     """Determines if two incidents are related based on the intersection and time delta
 
+    Intersections are compared in their canonical form, so sources that abbreviate or order
+    the streets differently still match.
+
     :param a: The first incident
     :param b: The second incident
     :param delta: The time delta
@@ -12,6 +16,10 @@ def is_related_incident(a: Incident, b: Incident, delta: datetime.timedelta) ->
     :rtype: bool
     """
 
-    if a.intersection is None or b.intersection is None:
+    intersection = canonical_intersection(a.intersection)
+    if intersection is None:
         return False
-    return a.intersection == b.intersection and abs(a.date - b.date) <= delta
+    return (
+        intersection == canonical_intersection(b.intersection)
+        and abs(a.date - b.date) <= delta
+    )
@@ -0,0 +1,291 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Hashable, Optional, Protocol, TypeVar, Union
+
+from yarl import URL
+
+from lcwc.utils import instrumentation
+from lcwc.utils.instrumentation import CACHE_HITS
+
+"""
+A short-lived cache of upstream response bodies shared by every client.
+
+Processes (or clients within a process) polling the same endpoint can share a ResponseCache, so
+upstream sees one request per TTL instead of one per poller. Concurrent misses for the same
+request are coalesced into a single request within a process.
+"""
+
+T = TypeVar("T")
+
+IGNORED_PARAMS = frozenset({"currentTimestamp"})
+""" Query parameters that don't change the response, such as cache-busters """
+
+DEFAULT_TTL = 15.0
+""" How long responses are cached by default, in seconds (the shortest poll interval) """
+
+
+def cache_key(url: str, params: Optional[dict] = None, method: str = "GET") -> str:
+    """Returns the cache key of a request
+
+    Query parameters are merged with those of the URL and sorted, and IGNORED_PARAMS are
+    dropped, so requests that only differ by a cache-buster share a key.
+
+    :param url: The URL of the request
+    :param params: (optional) Additional query parameters
+    :param method: The HTTP method
+    :return: The cache key
+    :rtype: str
+    """
+    url = URL(url)
+    query = [(k, v) for k, v in url.query.items() if k not in IGNORED_PARAMS]
+    if params:
+        query += [(k, str(v)) for k, v in params.items() if k not in IGNORED_PARAMS]
+    return f"{method} {url.with_query(sorted(query))}"
+
+
+@dataclass
+class CachedResponse:
+    """Represents a successful upstream response"""
+
+    """ The response body """
+    body: bytes
+
+    """ The URL of the response """
+    url: str = ""
+
+    """ The HTTP status code """
+    status: int = 200
+
+    """ The reason phrase of the status """
+    reason: str = "OK"
+
+    """ The response headers """
+    headers: dict = field(default_factory=dict)
+
+
+class CacheBackend(Protocol):
+    """Stores cached responses (ex: in memory, on disk, or in Redis)
+
+    External stores only need these two coroutines; a Redis-compatible backend can store
+    each response under its key with SET ... EX ttl.
+    """
+
+    async def get(self, key: str) -> Optional[CachedResponse]: ...
+
+    async def set(self, key: str, response: CachedResponse, ttl: float) -> None: ...
+
+
+class MemoryBackend:
+    """Keeps responses in memory, evicting the least recently used past max_entries"""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        """
+        :param max_entries: The maximum number of responses kept
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, CachedResponse]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, response = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    async def set(self, key: str, response: CachedResponse, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskBackend:
+    """Keeps responses in a directory, so processes on the same host can share them
+
+    Each response is a file named by the hash of its key, holding a JSON header line followed
+    by the body. Files are replaced atomically, and expired files are ignored (and removed by
+    clear_expired()). Files are read and written in a worker thread, so the event loop isn't
+    blocked on disk I/O.
+    """
+
+    def __init__(self, directory: Union[str, os.PathLike]) -> None:
+        """
+        :param directory: The directory to keep responses in, created if needed
+        """
+        self.directory = os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+
+    def _path(self, key: str) -> str:
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{name}.cache")
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        return await asyncio.to_thread(self._read, key)
+
+    async def set(self, key: str, response: CachedResponse, ttl: float) -> None:
+        await asyncio.to_thread(self._write, key, response, ttl)
+
+    def _read(self, key: str) -> Optional[CachedResponse]:
+        try:
+            with open(self._path(key), "rb") as f:
+                header = json.loads(f.readline())
+                if header["expires"] <= time.time() or header["key"] != key:
+                    return None
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"Ignoring unreadable cache entry for {key}: {e}")
+            return None
+        return CachedResponse(
+            body, header["url"], header["status"], header["reason"], header["headers"]
+        )
+
+    def _write(self, key: str, response: CachedResponse, ttl: float) -> None:
+        header = {
+            "key": key,
+            "expires": time.time() + ttl,
+            "url": response.url,
+            "status": response.status,
+            "reason": response.reason,
+            "headers": response.headers,
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(header).encode("utf-8") + b"\n")
+                f.write(response.body)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def clear_expired(self) -> int:
+        """Removes expired responses
+
+        :return: The number of responses removed
+        :rtype: int
+        """
+        removed = 0
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith(".cache"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, "rb") as f:
+                    expired = json.loads(f.readline())["expires"] <= now
+                if expired:
+                    os.unlink(path)
+                    removed += 1
+            except (OSError, ValueError, KeyError):
+                continue
+        return removed
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into a single call
+
+    The first caller for a key starts the call; callers arriving while it is in flight await
+    the same result (or exception). Cancelling a waiter doesn't cancel the shared call.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Returns the result of func(), sharing a call already in flight for the key
+
+        :param key: Identifies calls that can share a result
+        :param func: Starts the call
+        :return: The result of the call
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+class ResponseCache:
+    """Caches successful upstream responses for a short TTL and coalesces concurrent misses"""
+
+    def __init__(
+        self, backend: Optional[CacheBackend] = None, ttl: float = DEFAULT_TTL
+    ) -> None:
+        """
+        :param backend: (optional) Where responses are kept, defaults to a MemoryBackend
+        :param ttl: How long responses are cached, in seconds. Sharing a cache only saves
+            requests when the TTL is at least the interval the pollers poll at.
+        """
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.flight = SingleFlight()
+        self.logger = logging.getLogger(__name__)
+
+    async def fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[CachedResponse]],
+        ttl: Optional[float] = None,
+        cacheable: Optional[Callable[[CachedResponse], bool]] = None,
+    ) -> CachedResponse:
+        """Returns the cached response for the key, calling fetch() on a miss
+
+        Failed fetches raise to every coalesced caller and are not cached.
+
+        :param key: The cache key of the request (see cache_key)
+        :param fetch: Makes the request
+        :param ttl: (optional) Overrides the cache's TTL for this response
+        :param cacheable: (optional) Decides whether a response is stored (ex: not when its
+            body reports an error); coalesced callers share the response either way
+        :return: The response
+        :rtype: CachedResponse
+        """
+        response = await self.backend.get(key)
+        if response is not None:
+            instrumentation.increment(CACHE_HITS, cache="response")
+            return response
+
+        if key in self.flight:
+            instrumentation.increment(CACHE_HITS, cache="coalesced")
+
+        async def fill() -> CachedResponse:
+            response = await fetch()
+            if cacheable is None or cacheable(response):
+                await self.backend.set(key, response, self.ttl if ttl is None else ttl)
+            return response
+
+        return await self.flight.do(key, fill)
@@ -0,0 +1,333 @@
+import datetime
+import struct
+from typing import Iterable, Optional
+
+from lcwc.agencies.agencyresolver import AgencyResolver
+from lcwc.arcgis.incident import ArcGISIncident, Coordinates
+from lcwc.category import IncidentCategory
+from lcwc.feed.incident import FeedIncident
+from lcwc.incident import Incident
+from lcwc.unit import Unit
+from lcwc.web.incident import WebIncident
+
+"""
+Compact binary snapshot format:
+
+    magic "LCWC" | version (1 byte)
+    string table: varint count, then varint length + UTF-8 bytes per string
+    varint incident count, then one record per incident
+
+Every string field is stored as a varint reference into the string table (0 = None), so
+repeated values such as municipalities, descriptions and unit names are only stored once.
+Units reference their agency by (category, station_number) and are re-resolved on decode.
+"""
+
+MAGIC = b"LCWC"
+VERSION = 3
+SUPPORTED_VERSIONS = (2, 3)
+""" The versions that can be decoded (version 2 couldn't store an unknown IsPublic) """
+
+INCIDENT_TYPES = [FeedIncident, WebIncident, ArcGISIncident]
+""" Supported incident types, indexed by their type byte """
+
+CATEGORIES = list(IncidentCategory)
+""" Incident categories, indexed by their category byte """
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+NAIVE_EPOCH = datetime.datetime(1970, 1, 1)
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+# date kinds
+_DATE_NONE = 0
+_DATE_AWARE = 1
+_DATE_NAIVE = 2
+
+# unit id kinds (the id is a string when a shorthand name can't be split)
+_ID_NONE = 0
+_ID_INT = 1
+_ID_STR = 2
+
+# unit flags
+_UNIT_SHORTHAND = 1
+_UNIT_OUT_OF_COUNTY = 2
+_UNIT_PENDING = 4
+_UNIT_AGENCY = 8
+
+_COORDINATES = struct.Struct("<dd")
+
+
+class CodecException(Exception):
+    pass
+
+
+def _write_varint(buf: bytearray, n: int) -> None:
+    while n > 0x7F:
+        buf.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+def _zigzag(n: int) -> int:
+    return n << 1 if n >= 0 else ((-n) << 1) - 1
+
+
+def _unzigzag(n: int) -> int:
+    return (n >> 1) ^ -(n & 1)
+
+
+class _Encoder:
+    def __init__(self) -> None:
+        self.buf = bytearray()
+        self.strings: dict[str, int] = {}
+
+    def varint(self, n: int) -> None:
+        _write_varint(self.buf, n)
+
+    def string(self, s: Optional[str]) -> None:
+        if s is None:
+            self.buf.append(0)
+            return
+        ref = self.strings.get(s)
+        if ref is None:
+            ref = self.strings[s] = len(self.strings) + 1
+        _write_varint(self.buf, ref)
+
+    def date(self, date: Optional[datetime.datetime]) -> None:
+        if date is None:
+            self.buf.append(_DATE_NONE)
+        elif date.tzinfo is None:
+            self.buf.append(_DATE_NAIVE)
+            _write_varint(self.buf, _zigzag((date - NAIVE_EPOCH) // MICROSECOND))
+        else:
+            self.buf.append(_DATE_AWARE)
+            _write_varint(self.buf, _zigzag((date - EPOCH) // MICROSECOND))
+
+    def unit(self, unit: Unit) -> None:
+        flags = 0
+        if unit.is_shorthand:
+            flags |= _UNIT_SHORTHAND
+        if unit.out_of_county:
+            flags |= _UNIT_OUT_OF_COUNTY
+        if unit.pending:
+            flags |= _UNIT_PENDING
+        if unit.agency is not None:
+            flags |= _UNIT_AGENCY
+        self.buf.append(flags)
+
+        self.string(unit.full_name)
+        self.string(unit.name)
+        self.string(unit.station_id)
+        self.string(unit.county_name)
+
+        if unit.id is None:
+            self.buf.append(_ID_NONE)
+        elif isinstance(unit.id, int):
+            self.buf.append(_ID_INT)
+            _write_varint(self.buf, _zigzag(unit.id))
+        else:
+            self.buf.append(_ID_STR)
+            self.string(unit.id)
+
+        if unit.agency is not None:
+            self.buf.append(CATEGORIES.index(unit.agency.category))
+            self.string(unit.agency.station_number)
+
+    def incident(self, incident: Incident) -> None:
+        incident_type = type(incident)
+        if incident_type not in INCIDENT_TYPES:
+            raise CodecException(f"Unsupported incident type: {incident_type}")
+
+        buf = self.buf
+        buf.append(INCIDENT_TYPES.index(incident_type))
+        buf.append(CATEGORIES.index(incident.category))
+        self.date(incident.date)
+        self.string(incident.description)
+        self.string(incident.municipality)
+        self.string(incident.intersection)
+
+        _write_varint(buf, len(incident.units))
+        for unit in incident.units:
+            self.unit(unit)
+
+        if incident_type is FeedIncident:
+            self.string(incident.guid)
+        elif incident_type is ArcGISIncident:
+            _write_varint(buf, _zigzag(incident.number))
+            if incident.priority is None:
+                buf.append(0)
+            else:
+                buf.append(1)
+                _write_varint(buf, _zigzag(incident.priority))
+            self.string(incident.agency)
+            if incident.public is None:
+                buf.append(0)
+            else:
+                buf.append(1)
+                buf.append(1 if incident.public else 0)
+            if incident.coordinates is None:
+                buf.append(0)
+            else:
+                buf.append(1)
+                buf += _COORDINATES.pack(
+                    incident.coordinates.longitude, incident.coordinates.latitude
+                )
+            self.string(incident.zone)
+
+    def finish(self, count: int) -> bytes:
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        _write_varint(out, len(self.strings))
+        # dicts preserve insertion order, which matches the assigned references
+        for s in self.strings:
+            encoded = s.encode("utf-8")
+            _write_varint(out, len(encoded))
+            out += encoded
+        _write_varint(out, count)
+        out += self.buf
+        return bytes(out)
+
+
+class _Decoder:
+    def __init__(self, data: bytes, agency_resolver: AgencyResolver) -> None:
+        self.data = memoryview(data)
+        self.pos = 0
+        self.agency_resolver = agency_resolver
+        self.strings: list[Optional[str]] = [None]
+        self.version = VERSION
+
+    def byte(self) -> int:
+        b = self.data[self.pos]
+        self.pos += 1
+        return b
+
+    def varint(self) -> int:
+        data = self.data
+        pos = self.pos
+        result = 0
+        shift = 0
+        while True:
+            b = data[pos]
+            pos += 1
+            result |= (b & 0x7F) << shift
+            if b < 0x80:
+                break
+            shift += 7
+        self.pos = pos
+        return result
+
+    def string(self) -> Optional[str]:
+        return self.strings[self.varint()]
+
+    def date(self) -> Optional[datetime.datetime]:
+        kind = self.byte()
+        if kind == _DATE_NONE:
+            return None
+        offset = datetime.timedelta(microseconds=_unzigzag(self.varint()))
+        return (EPOCH if kind == _DATE_AWARE else NAIVE_EPOCH) + offset
+
+    def unit(self) -> Unit:
+        flags = self.byte()
+        u = Unit(
+            full_name=self.string(),
+            is_shorthand=bool(flags & _UNIT_SHORTHAND),
+            name=self.string(),
+            station_id=self.string(),
+            county_name=self.string(),
+            out_of_county=bool(flags & _UNIT_OUT_OF_COUNTY),
+            pending=bool(flags & _UNIT_PENDING),
+        )
+
+        id_kind = self.byte()
+        if id_kind == _ID_INT:
+            u.id = _unzigzag(self.varint())
+        elif id_kind == _ID_STR:
+            u.id = self.string()
+
+        if flags & _UNIT_AGENCY:
+            category = CATEGORIES[self.byte()]
+            u.agency = self.agency_resolver.get_agency(self.string(), category)
+
+        return u
+
+    def incident(self) -> Incident:
+        incident_type = INCIDENT_TYPES[self.byte()]
+        category = CATEGORIES[self.byte()]
+        date = self.date()
+        description = self.string()
+        municipality = self.string()
+        intersection = self.string()
+        units = [self.unit() for _ in range(self.varint())]
+
+        fields = [category, date, description, municipality, intersection, units]
+
+        if incident_type is FeedIncident:
+            fields.append(self.string())
+        elif incident_type is ArcGISIncident:
+            number = _unzigzag(self.varint())
+            priority = _unzigzag(self.varint()) if self.byte() else None
+            agency = self.string()
+            if self.version < 3:
+                public = bool(self.byte())
+            else:
+                public = bool(self.byte()) if self.byte() else None
+            coordinates = None
+            if self.byte():
+                coordinates = Coordinates(
+                    *_COORDINATES.unpack_from(self.data, self.pos)
+                )
+                self.pos += _COORDINATES.size
+            zone = self.string()
+            fields += [number, priority, agency, public, coordinates, zone]
+
+        return incident_type(*fields)
+
+    def decode(self) -> list[Incident]:
+        if bytes(self.data[:4]) != MAGIC:
+            raise CodecException("Not a compact incident snapshot")
+        self.pos = 4
+        self.version = self.byte()
+        if self.version not in SUPPORTED_VERSIONS:
+            raise CodecException(f"Unsupported snapshot version: {self.version}")
+
+        for _ in range(self.varint()):
+            length = self.varint()
+            self.strings.append(str(self.data[self.pos : self.pos + length], "utf-8"))
+            self.pos += length
+
+        return [self.incident() for _ in range(self.varint())]
+
+
+class CompactCodec:
+    """Compact binary codec for FeedIncident, WebIncident and ArcGISIncident snapshots"""
+
+    def __init__(self, agency_resolver: AgencyResolver = AgencyResolver()) -> None:
+        """
+        :param agency_resolver: The agency resolver used to restore unit agencies on decode
+        """
+        self.agency_resolver = agency_resolver
+
+    def encode(self, incidents: Iterable[Incident]) -> bytes:
+        """Encodes a snapshot of incidents
+
+        :param incidents: The incidents to encode (may be of mixed types)
+        :return: The encoded snapshot
+        :rtype: bytes
+        """
+        encoder = _Encoder()
+        count = 0
+        for incident in incidents:
+            encoder.incident(incident)
+            count += 1
+        return encoder.finish(count)
+
+    def decode(self, data: bytes) -> list[Incident]:
+        """Decodes a snapshot produced by encode
+
+        :param data: The encoded snapshot
+        :return: A list of incidents
+        :rtype: list[Incident]
+        """
+        try:
+            return _Decoder(data, self.agency_resolver).decode()
+        except (IndexError, UnicodeDecodeError, struct.error) as e:
+            raise CodecException("Truncated or corrupt snapshot") from e
@@ -0,0 +1,122 @@
+from typing import Optional
+
+from lcwc.agencies.exceptions import OutOfCountyException, PendingUnitException
+from lcwc.utils import instrumentation
+from lcwc.utils.instrumentation import PARSE_FAILURES, UNITS_PARSED
+from lcwc.utils.unitparser import UnitParserException
+
+"""
+Per-parse accounting of the units (and features) that could not be parsed.
+
+A parser fills a ParseDiagnostics while it runs instead of logging every failure, so
+the cost of a failure is a dict increment and, for the first few, keeping the raw input.
+"""
+
+OUT_OF_COUNTY = "out_of_county"
+""" Reason: the unit belongs to an agency outside of the county """
+PENDING = "pending"
+""" Reason: the unit has not been assigned yet """
+UNPARSEABLE = "unparseable"
+""" Reason: the unit name did not match any known format """
+INVALID_FEATURE = "invalid_feature"
+""" Reason: an ArcGIS feature or web page row was missing attributes or had malformed values """
+
+UNIT_EXCEPTIONS = (UnitParserException, OutOfCountyException, PendingUnitException)
+""" The exceptions raised while parsing a unit that are recorded rather than propagated """
+
+
+def failure_reason(e: Exception) -> str:
+    """Returns the diagnostics reason for an exception raised while parsing"""
+    if isinstance(e, OutOfCountyException):
+        return OUT_OF_COUNTY
+    if isinstance(e, PendingUnitException):
+        return PENDING
+    return UNPARSEABLE
+
+
+class ParseDiagnostics:
+    """Counts parse failures by reason and keeps a sample of the raw inputs that failed"""
+
+    MAX_SAMPLES = 5
+    """ The default number of raw inputs kept per reason """
+
+    def __init__(
+        self, source: Optional[str] = None, max_samples: int = MAX_SAMPLES
+    ) -> None:
+        """
+        :param source: The name of the source being parsed (ex: FeedClient)
+        :param max_samples: The number of raw inputs kept per reason
+        """
+        self.source = source
+        self.max_samples = max_samples
+        self.parsed = 0
+        """ The number of units parsed successfully """
+        self.counts: dict[str, int] = {}
+        """ The number of failures per reason """
+        self.samples: dict[str, list[str]] = {}
+        """ The first raw inputs that failed, per reason """
+
+    def record(self, reason: str, raw: str) -> None:
+        """Records a failure
+
+        :param reason: The reason for the failure (ex: UNPARSEABLE)
+        :param raw: The raw input that failed to parse
+        """
+        count = self.counts.get(reason, 0)
+        self.counts[reason] = count + 1
+        if count < self.max_samples:
+            self.samples.setdefault(reason, []).append(raw)
+
+    def record_exception(self, e: Exception, raw: str) -> None:
+        """Records a failure, deriving the reason from the exception"""
+        self.record(failure_reason(e), raw)
+
+    @property
+    def failures(self) -> int:
+        """The total number of failures"""
+        return sum(self.counts.values())
+
+    @property
+    def failure_rate(self) -> float:
+        """The fraction of inputs that failed to parse"""
+        total = self.parsed + self.failures
+        return self.failures / total if total else 0.0
+
+    def merge(self, other: "ParseDiagnostics") -> "ParseDiagnostics":
+        """Adds the counts and samples of another diagnostics object to this one
+
+        :param other: The diagnostics to merge
+        :return: This diagnostics object
+        :rtype: ParseDiagnostics
+        """
+        self.parsed += other.parsed
+        for reason, count in other.counts.items():
+            self.counts[reason] = self.counts.get(reason, 0) + count
+            samples = self.samples.setdefault(reason, [])
+            samples.extend(
+                other.samples.get(reason, [])[: self.max_samples - len(samples)]
+            )
+        return self
+
+    def publish(self) -> None:
+        """Reports the counts to the active instrumentation, if any"""
+        current = instrumentation.current()
+        if current is None:
+            return
+        current.increment(UNITS_PARSED, self.parsed, source=self.source)
+        for reason, count in self.counts.items():
+            current.increment(PARSE_FAILURES, count, reason=reason, source=self.source)
+
+    def to_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "parsed": self.parsed,
+            "counts": dict(self.counts),
+            "samples": {reason: list(raw) for reason, raw in self.samples.items()},
+        }
+
+    def __bool__(self) -> bool:
+        return bool(self.counts)
+
+    def __repr__(self) -> str:
+        return f"ParseDiagnostics(source={self.source!r}, parsed={self.parsed}, counts={self.counts})"
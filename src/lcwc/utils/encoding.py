@@ -1,55 +1,340 @@
 import datetime
+import gzip
 import json
+import os
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    BinaryIO,
+    Iterable,
+    Iterator,
+    Type,
+    Union,
+)
 
-from lcwc.arcgis.incident import Coordinates
+from lcwc.arcgis.incident import ArcGISIncident, Coordinates
 from lcwc.category import IncidentCategory
+from lcwc.feed.incident import FeedIncident
 from lcwc.incident import Incident
 from lcwc.unit import Unit
+from lcwc.web.incident import WebIncident
+
+# prefer a native JSON library when one is installed, falling back to the stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+elif msgspec is not None:
+    JSON_BACKEND = "msgspec"
+    _dumps = msgspec.json.encode
+    _loads = msgspec.json.decode
+else:
+    JSON_BACKEND = "json"
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    _loads = json.loads
 
 # TODO use separate encoders/decoders for each client implementation?
 
+TYPE_KEY = "_type"
+""" The key used to tag serialized incidents with their incident type """
+
+INCIDENT_TYPES: dict[str, Type[Incident]] = {
+    t.__name__: t for t in (FeedIncident, WebIncident, ArcGISIncident)
+}
+""" The incident types that can be restored from a type tag """
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def encode_json(obj) -> bytes:
+    """Serializes JSON-compatible data with the fastest available backend
+
+    :param obj: The data to serialize
+    :return: The UTF-8 encoded JSON document
+    :rtype: bytes
+    """
+    return _dumps(obj)
+
+
+def decode_json(data: bytes):
+    """Deserializes a JSON document with the fastest available backend
+
+    :param data: The UTF-8 encoded JSON document
+    :return: The decoded data
+    """
+    return _loads(data)
+
+
+def dumps(incident: Incident) -> bytes:
+    """Serializes a single incident to JSON
+
+    :param incident: The incident to serialize
+    :return: The UTF-8 encoded JSON document
+    :rtype: bytes
+    """
+    return _dumps(incident.to_dict())
+
+
+def loads(data: bytes, incident_type: Type[Incident]) -> Incident:
+    """Deserializes a single incident from JSON
+
+    :param data: The JSON document produced by dumps
+    :param incident_type: The incident class to construct
+    :return: An incident of the given type
+    :rtype: Incident
+    """
+    return incident_type.from_dict(_loads(data))
+
+
+def dumps_many(incidents: Iterable[Incident]) -> bytes:
+    """Serializes a list of incidents to a JSON array
+
+    :param incidents: The incidents to serialize
+    :return: The UTF-8 encoded JSON document
+    :rtype: bytes
+    """
+    return _dumps([incident.to_dict() for incident in incidents])
+
+
+def loads_many(data: bytes, incident_type: Type[Incident]) -> list[Incident]:
+    """Deserializes a JSON array of incidents
+
+    :param data: The JSON document produced by dumps_many
+    :param incident_type: The incident class to construct
+    :return: A list of incidents of the given type
+    :rtype: list[Incident]
+    """
+    from_dict = incident_type.from_dict
+    return [from_dict(d) for d in _loads(data)]
+
+
+def to_tagged_dict(incident: Incident) -> dict:
+    """Returns the dictionary representation of an incident tagged with its type
+
+    :param incident: The incident to convert
+    :return: A dictionary of the incident fields plus the type tag
+    :rtype: dict
+    """
+    d = incident.to_dict()
+    d[TYPE_KEY] = type(incident).__name__
+    return d
+
+
+def from_tagged_dict(d: dict) -> Incident:
+    """Creates an incident from a dictionary produced by to_tagged_dict
+
+    :param d: The tagged dictionary to convert
+    :return: An incident of the tagged type
+    :rtype: Incident
+    """
+    d = d.copy()
+    name = d.pop(TYPE_KEY, None)
+    if name not in INCIDENT_TYPES:
+        raise ValueError(f"Unknown incident type: {name}")
+    return INCIDENT_TYPES[name].from_dict(d)
+
+
+class NDJSONWriter:
+    """Writes incidents as newline-delimited JSON, one type-tagged incident per line
+
+    Accepts a path or any writable binary file-like object (including socket.makefile("wb")).
+    Paths ending in .gz are gzip-compressed automatically.
+    """
+
+    def __init__(self, fp: Union[str, os.PathLike, BinaryIO], compress: bool = False):
+        """
+        :param fp: The path or binary file-like object to write to
+        :param compress: Whether to gzip-compress the output
+        """
+        self._owned = None
+        if isinstance(fp, (str, os.PathLike)):
+            path = os.fspath(fp)
+            compress = compress or path.endswith(".gz")
+            fp = gzip.open(path, "wb") if compress else open(path, "wb")
+            self._owned = fp
+        elif compress:
+            # closing the GzipFile flushes the trailer but leaves the caller's file open
+            fp = gzip.GzipFile(fileobj=fp, mode="wb")
+            self._owned = fp
+
+        self._fp = fp
+        self.count = 0
+        """ The number of incidents written """
+
+    def write(self, incident: Incident) -> None:
+        """Writes a single incident"""
+        self._fp.write(_dumps(to_tagged_dict(incident)) + b"\n")
+        self.count += 1
+
+    def write_many(self, incidents: Iterable[Incident]) -> int:
+        """Writes incidents from any iterable without materializing it
+
+        :param incidents: The incidents to write
+        :return: The number of incidents written
+        :rtype: int
+        """
+        start = self.count
+        for incident in incidents:
+            self.write(incident)
+        return self.count - start
+
+    def close(self) -> None:
+        if self._owned is not None:
+            self._owned.close()
+        else:
+            self._fp.flush()
+
+    def __enter__(self) -> "NDJSONWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class NDJSONReader:
+    """Reads type-tagged incidents from newline-delimited JSON one line at a time
+
+    Accepts a path or any readable binary file-like object (including socket.makefile("rb")).
+    Gzip-compressed paths are detected automatically.
+    """
+
+    def __init__(self, fp: Union[str, os.PathLike, BinaryIO], compress: bool = False):
+        """
+        :param fp: The path or binary file-like object to read from
+        :param compress: Whether the stream is gzip-compressed (detected automatically for paths)
+        """
+        self._owned = None
+        if isinstance(fp, (str, os.PathLike)):
+            with open(fp, "rb") as f:
+                compress = compress or f.read(2) == GZIP_MAGIC
+            fp = gzip.open(fp, "rb") if compress else open(fp, "rb")
+            self._owned = fp
+        elif compress:
+            fp = gzip.GzipFile(fileobj=fp, mode="rb")
+            self._owned = fp
+
+        self._fp = fp
+
+    def __iter__(self) -> Iterator[Incident]:
+        for line in self._fp:
+            if line.strip():
+                yield from_tagged_dict(_loads(line))
+
+    def close(self) -> None:
+        if self._owned is not None:
+            self._owned.close()
+
+    def __enter__(self) -> "NDJSONReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def dump_ndjson(
+    incidents: Iterable[Incident],
+    fp: Union[str, os.PathLike, BinaryIO],
+    compress: bool = False,
+) -> int:
+    """Streams incidents to a path or file-like object as newline-delimited JSON
+
+    :param incidents: The incidents to write
+    :param fp: The path or binary file-like object to write to
+    :param compress: Whether to gzip-compress the output
+    :return: The number of incidents written
+    :rtype: int
+    """
+    with NDJSONWriter(fp, compress) as writer:
+        return writer.write_many(incidents)
+
+
+def iter_ndjson(
+    fp: Union[str, os.PathLike, BinaryIO], compress: bool = False
+) -> Iterator[Incident]:
+    """Lazily reads incidents from a path or file-like object of newline-delimited JSON
+
+    :param fp: The path or binary file-like object to read from
+    :param compress: Whether the stream is gzip-compressed
+    :return: An iterator of incidents
+    :rtype: Iterator[Incident]
+    """
+    with NDJSONReader(fp, compress) as reader:
+        yield from reader
+
+
+async def aiter_ndjson(lines: AsyncIterable[bytes]) -> AsyncIterator[Incident]:
+    """Reads incidents from an async line source such as an asyncio.StreamReader
+
+    :param lines: The async iterable of newline-delimited JSON lines
+    :return: An async iterator of incidents
+    :rtype: AsyncIterator[Incident]
+    """
+    async for line in lines:
+        if line.strip():
+            yield from_tagged_dict(_loads(line))
+
 
 class UnitEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, Unit):
-            return obj.__dict__
+            return obj.to_dict()
         return json.JSONEncoder.default(self, obj)
 
 
 class UnitDecoder(json.JSONDecoder):
     def decode(self, s):
         obj = json.loads(s)
-        return Unit(**obj)
+        return Unit.from_dict(obj)
 
 
 class IncidentEncoder(json.JSONEncoder):
     def default(self, obj):
+        # to_dict converts nested units and coordinates so they never reach here
         if isinstance(obj, Incident):
-            return obj.__dict__
+            return obj.to_dict()
         if isinstance(obj, IncidentCategory):
             return str(obj.value)
         if isinstance(obj, datetime.datetime):
             return obj.isoformat()
-        if isinstance(obj, Unit):
-            return UnitEncoder().default(obj)
-        if isinstance(obj, Coordinates):
-            return obj.__dict__
+        if isinstance(obj, (Unit, Coordinates)):
+            return obj.to_dict()
         return json.JSONEncoder.default(self, obj)
 
 
 class IncidentDecoder(json.JSONDecoder):
-    def decode(self, s, incident_type):
-        if not issubclass(incident_type, Incident):
-            raise TypeError("incident_type must implement Incident")
+    """Decodes a single incident
 
-        obj = json.loads(s)
+    The incident type can be passed to decode, to the constructor (which allows
+    json.loads(s, cls=IncidentDecoder, incident_type=...)), or read from the type tag.
+    """
+
+    def __init__(self, *args, incident_type: Type[Incident] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.incident_type = incident_type
+
+    def decode(self, s, incident_type: Type[Incident] = None):
+        incident_type = incident_type or self.incident_type
 
-        obj["category"] = IncidentCategory(obj["category"])
-        if "date" in obj:
-            obj["date"] = datetime.datetime.fromisoformat(obj["date"])
-        if "units" in obj:
-            obj["units"] = [Unit(**unit) for unit in obj["units"]]
-        if "coordinates" in obj:
-            obj["coordinates"] = Coordinates(**obj["coordinates"])
+        obj = super().decode(s)
+
+        if incident_type is None:
+            return from_tagged_dict(obj)
+
+        if not issubclass(incident_type, Incident):
+            raise TypeError("incident_type must implement Incident")
 
-        return incident_type(**obj)
+        obj.pop(TYPE_KEY, None)
+        return incident_type.from_dict(obj)
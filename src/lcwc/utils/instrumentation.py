@@ -0,0 +1,263 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional, Protocol
+
+"""
+Timing and counter hooks for the hot paths of every client.
+
+Nothing is measured unless an Instrumentation is active, either globally via
+set_instrumentation() or for the current context (task) via Instrumentation.activate().
+"""
+
+FETCH = "fetch"
+""" Stage: the HTTP request, including retries """
+DECODE = "decode"
+""" Stage: turning the response body into a document (JSON, BeautifulSoup, feedparser) """
+PARSE = "parse"
+""" Stage: turning the document into incidents, including unit resolution """
+RESOLVE = "resolve"
+""" Stage: parsing unit names and resolving their agencies """
+LOCATE = "locate"
+""" Stage: assigning incidents to response zones """
+
+UNITS_PARSED = "units_parsed"
+""" Counter: units parsed successfully """
+PARSE_FAILURES = "parse_failures"
+""" Counter: units that could not be parsed, labelled with a reason """
+CACHE_HITS = "cache_hits"
+""" Counter: lookups answered from a cache, labelled with the cache name """
+
+
+class Listener(Protocol):
+    """Receives measurements from an Instrumentation"""
+
+    def on_span(self, stage: str, duration: float, labels: dict) -> None: ...
+
+    def on_count(self, name: str, value: int, labels: dict) -> None: ...
+
+
+@dataclass
+class StageStats:
+    """Aggregated timings of a single stage"""
+
+    """ The number of times the stage ran """
+    count: int = 0
+
+    """ The total time spent in the stage, in seconds """
+    total: float = 0.0
+
+    """ The longest single run of the stage, in seconds """
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class Instrumentation:
+    """Aggregates stage timings and counters and forwards them to listeners"""
+
+    def __init__(self, listeners: Optional[list[Listener]] = None) -> None:
+        self.listeners: list[Listener] = list(listeners or [])
+        self.stages: dict[tuple, StageStats] = {}
+        """ Timings keyed by (stage, source) """
+        self.counters: dict[tuple, int] = {}
+        """ Counters keyed by (name, *sorted label values) """
+
+    def add_listener(self, listener: Listener) -> None:
+        self.listeners.append(listener)
+
+    def record_span(self, stage: str, duration: float, **labels) -> None:
+        """Records the duration of a stage
+
+        :param stage: The stage name (ex: FETCH)
+        :param duration: The duration in seconds
+        :param labels: Labels such as source="FeedClient"
+        """
+        key = (stage, labels.get("source"))
+        stats = self.stages.get(key)
+        if stats is None:
+            stats = self.stages[key] = StageStats()
+        stats.count += 1
+        stats.total += duration
+        if duration > stats.max:
+            stats.max = duration
+
+        for listener in self.listeners:
+            listener.on_span(stage, duration, labels)
+
+    def increment(self, name: str, value: int = 1, **labels) -> None:
+        """Increments a counter
+
+        :param name: The counter name (ex: UNITS_PARSED)
+        :param value: The amount to add
+        :param labels: Labels such as source="FeedClient" or reason="pending"
+        """
+        if value == 0:
+            return
+        key = (name,) + tuple(sorted(labels.items()))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+        for listener in self.listeners:
+            listener.on_count(name, value, labels)
+
+    def count(self, name: str, **labels) -> int:
+        """Returns the total of a counter across every label combination matching the given labels"""
+        total = 0
+        for key, value in self.counters.items():
+            if key[0] == name and all(item in key[1:] for item in labels.items()):
+                total += value
+        return total
+
+    @contextmanager
+    def activate(self) -> Iterator["Instrumentation"]:
+        """Makes this instrumentation current for the enclosing context (and tasks created within it)"""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+_current: ContextVar[Optional[Instrumentation]] = ContextVar(
+    "lcwc_instrumentation", default=None
+)
+_global: Optional[Instrumentation] = None
+
+
+def set_instrumentation(instrumentation: Optional[Instrumentation]) -> None:
+    """Sets the instrumentation used when none is active for the current context"""
+    global _global
+    _global = instrumentation
+
+
+def current() -> Optional[Instrumentation]:
+    """Returns the active instrumentation, or None when nothing is being measured"""
+    return _current.get() or _global
+
+
+@contextmanager
+def span(stage: str, **labels) -> Iterator[None]:
+    """Times the enclosed block as the given stage (a no-op without active instrumentation)"""
+    instrumentation = current()
+    if instrumentation is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        instrumentation.record_span(stage, time.perf_counter() - start, **labels)
+
+
+def increment(name: str, value: int = 1, **labels) -> None:
+    """Increments a counter on the active instrumentation, if any"""
+    instrumentation = current()
+    if instrumentation is not None:
+        instrumentation.increment(name, value, **labels)
+
+
+_prometheus_metrics: dict = {}
+# (registry, namespace) -> (stage histogram, event counter), since a registry rejects
+# metrics registered twice
+
+
+class PrometheusListener:
+    """Exports measurements with prometheus_client (a no-op if it isn't installed)
+
+    Listeners sharing a registry and namespace share their metrics, so any number of them
+    can be created.
+    """
+
+    def __init__(self, registry=None, namespace: str = "lcwc") -> None:
+        """
+        :param registry: (optional) The CollectorRegistry to register with, defaults to the
+            default registry
+        :param namespace: The prefix of the metric names
+        """
+        self.logger = logging.getLogger(__name__)
+        try:
+            import prometheus_client
+        except ImportError:
+            self.logger.debug("prometheus_client is not installed")
+            self.enabled = False
+            return
+
+        self.enabled = True
+        if registry is None:
+            registry = prometheus_client.REGISTRY
+        metrics = _prometheus_metrics.get((registry, namespace))
+        if metrics is None:
+            metrics = _prometheus_metrics[(registry, namespace)] = (
+                prometheus_client.Histogram(
+                    f"{namespace}_stage_seconds",
+                    "Time spent in each client stage",
+                    ["stage", "source"],
+                    registry=registry,
+                ),
+                prometheus_client.Counter(
+                    f"{namespace}_events_total",
+                    "Units parsed, parse failures and cache hits",
+                    ["name", "source", "reason"],
+                    registry=registry,
+                ),
+            )
+        self.stage_seconds, self.events = metrics
+
+    def on_span(self, stage: str, duration: float, labels: dict) -> None:
+        if self.enabled:
+            self.stage_seconds.labels(stage, labels.get("source", "")).observe(duration)
+
+    def on_count(self, name: str, value: int, labels: dict) -> None:
+        if self.enabled:
+            self.events.labels(
+                name, labels.get("source", ""), labels.get("reason", "")
+            ).inc(value)
+
+
+class OpenTelemetryListener:
+    """Exports measurements as OpenTelemetry spans and metrics (a no-op if it isn't installed)"""
+
+    def __init__(self, tracer_provider=None, meter_provider=None) -> None:
+        self.logger = logging.getLogger(__name__)
+        try:
+            from opentelemetry import metrics, trace
+        except ImportError:
+            self.logger.debug("opentelemetry is not installed")
+            self.enabled = False
+            return
+
+        self.enabled = True
+        self.tracer = trace.get_tracer("lcwc", tracer_provider=tracer_provider)
+        meter = metrics.get_meter("lcwc", meter_provider=meter_provider)
+        self.stage_duration = meter.create_histogram(
+            "lcwc.stage.duration",
+            unit="s",
+            description="Time spent in each client stage",
+        )
+        self.events = meter.create_counter(
+            "lcwc.events", description="Units parsed, parse failures and cache hits"
+        )
+
+    def on_span(self, stage: str, duration: float, labels: dict) -> None:
+        if not self.enabled:
+            return
+        attributes = {k: str(v) for k, v in labels.items()}
+        self.stage_duration.record(duration, {"stage": stage, **attributes})
+        # the span is reported after the fact, so its start time is reconstructed
+        end = time.time_ns()
+        otel_span = self.tracer.start_span(
+            f"lcwc.{stage}",
+            start_time=end - int(duration * 1e9),
+            attributes=attributes,
+        )
+        otel_span.end(end_time=end)
+
+    def on_count(self, name: str, value: int, labels: dict) -> None:
+        if self.enabled:
+            self.events.add(
+                value, {"name": name, **{k: str(v) for k, v in labels.items()}}
+            )
@@ -0,0 +1,291 @@
+import asyncio
+import datetime
+import email.utils
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import aiohttp
+
+T = TypeVar("T")
+
+
+class HTTPStatusException(Exception):
+    """Raised when an upstream responds with an unexpected HTTP status"""
+
+    def __init__(
+        self, status: int, message: str = "", retry_after: Optional[float] = None
+    ) -> None:
+        super().__init__(message or f"Unexpected HTTP status: {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class CircuitOpenException(Exception):
+    """Raised without making a request while the circuit for a host is open"""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        super().__init__(f"Circuit open for {host}, retry in {retry_in:.1f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header given either in seconds or as an HTTP date
+
+    :param value: The header value
+    :return: The number of seconds to wait, or None if absent or invalid
+    :rtype: Optional[float]
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, (date - now).total_seconds())
+
+
+@dataclass
+class RetryPolicy:
+    """Determines which failures are retried and how long to wait between attempts"""
+
+    """ The maximum number of attempts per request, including the first """
+    max_attempts: int = 3
+
+    """ The delay before the first retry, in seconds """
+    base_delay: float = 0.5
+
+    """ The multiplier applied to the delay after each retry """
+    multiplier: float = 2.0
+
+    """ The maximum delay between attempts, in seconds """
+    max_delay: float = 10.0
+
+    """ Whether to randomize delays (full jitter) so replicas don't retry in lockstep """
+    jitter: bool = True
+
+    """ Whether to honour Retry-After headers """
+    respect_retry_after: bool = True
+
+    """ The longest Retry-After delay that will be waited out before giving up, in seconds """
+    max_retry_after: float = 60.0
+
+    """ HTTP statuses that are considered transient """
+    retry_statuses: frozenset = frozenset({408, 429, 500, 502, 503, 504})
+
+    def is_retryable(self, e: Exception) -> bool:
+        """Returns whether the given failure is transient and worth retrying"""
+        if isinstance(e, HTTPStatusException):
+            return e.status in self.retry_statuses
+        return isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError))
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Returns the delay before the given retry attempt
+
+        :param attempt: The number of attempts made so far (1 for the first retry)
+        :param retry_after: The delay requested by the upstream, if any
+        :return: The delay in seconds
+        :rtype: float
+        """
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        if self.respect_retry_after and retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+class RetryBudget:
+    """Caps retries to a fraction of recent requests so retries can't multiply load during an outage
+
+    Every request deposits `ratio` tokens and every retry withdraws one, up to `max_tokens`.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10.0) -> None:
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Attempts to spend a retry, returning False when the budget is exhausted"""
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class CircuitBreaker:
+    """Tracks the health of a single host and fails fast while it is down
+
+    After `failure_threshold` consecutive failures the circuit opens and requests are
+    rejected for `recovery_timeout` seconds. A single trial request is then let through
+    (half-open); success closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        host: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.recovery_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_request(self) -> bool:
+        """Raises CircuitOpenException if a request to the host should not be made
+
+        :return: True if the request is the half-open trial, which must end with
+            record_success(), record_failure() or release_trial()
+        :rtype: bool
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return False
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        retry_in = max(0.0, self.opened_at + self.recovery_timeout - self.clock())
+        raise CircuitOpenException(self.host, retry_in)
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Lets another trial through after one ended without an outcome (ex: cancelled)"""
+        self._trial_in_flight = False
+
+
+class Resilience:
+    """Retries transient failures with backoff and applies a circuit breaker per host"""
+
+    def __init__(
+        self,
+        policy: RetryPolicy = None,
+        budget: RetryBudget = None,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+    ) -> None:
+        """
+        :param policy: The retry policy, defaults to RetryPolicy()
+        :param budget: The retry budget shared by every host, defaults to RetryBudget()
+        :param failure_threshold: Consecutive failures before a host's circuit opens
+        :param recovery_timeout: Seconds before an open circuit allows a trial request
+        """
+        self.policy = policy or RetryPolicy()
+        self.budget = budget or RetryBudget()
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.logger = logging.getLogger(__name__)
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        """Returns the circuit breaker for the given host"""
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker(
+                host, self.failure_threshold, self.recovery_timeout
+            )
+        return breaker
+
+    async def call(self, host: str, func: Callable[[], Awaitable[T]]) -> T:
+        """Calls func, retrying transient failures according to the policy
+
+        :param host: The host the request is made to
+        :param func: A coroutine function performing a single attempt
+        :return: The result of func
+        :raises CircuitOpenException: If the host's circuit is open
+
+        A call counts as a single failure towards the host's circuit once its retries are
+        exhausted, however many attempts it made.
+        """
+        breaker = self.breaker(host)
+        self.budget.deposit()
+        attempt = 0
+        trial = False
+
+        try:
+            while True:
+                # the half-open trial keeps its slot across its own retries
+                if not trial:
+                    trial = breaker.before_request()
+                try:
+                    result = await func()
+                except Exception as e:
+                    if not self.policy.is_retryable(e):
+                        # the host answered, so it counts towards its health
+                        breaker.record_success()
+                        raise
+
+                    attempt += 1
+                    retry_after = getattr(e, "retry_after", None)
+                    if (
+                        attempt >= self.policy.max_attempts
+                        or (
+                            retry_after is not None
+                            and retry_after > self.policy.max_retry_after
+                        )
+                        or not self.budget.withdraw()
+                    ):
+                        breaker.record_failure()
+                        raise
+
+                    delay = self.policy.delay(attempt, retry_after)
+                    self.logger.debug(
+                        "Retrying %s in %.2fs after %r (attempt %d)",
+                        host,
+                        delay,
+                        e,
+                        attempt,
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+
+                breaker.record_success()
+                return result
+        finally:
+            # a trial cancelled mid-request must not keep the circuit open forever
+            if trial:
+                breaker.release_trial()
+
+
+DEFAULT_RESILIENCE = Resilience()
+""" The resilience layer shared by clients that aren't given one """
@@ -1,8 +1,21 @@
+import asyncio
+import json
 import aiohttp
 from typing import Dict
 from json import JSONDecodeError
 from typing import List, Dict
 
+from lcwc.utils import instrumentation
+from lcwc.utils.cache import CachedResponse, ResponseCache, cache_key
+from lcwc.utils.instrumentation import DECODE
+from lcwc.utils.resilience import (
+    DEFAULT_RESILIENCE,
+    CircuitOpenException,
+    HTTPStatusException,
+    Resilience,
+    parse_retry_after,
+)
+
 
 class Result:
     def __init__(
@@ -39,6 +52,10 @@ class RestAdapter:
         base: str = "",
         user_agent: str = "",
         ssl_verify: bool = True,
+        resilience: Resilience = None,
+        scheme: str = "https",
+        cache: ResponseCache = None,
+        name: str = "",
     ):
         """
         Constructor for RestAdapter
@@ -48,9 +65,18 @@ class RestAdapter:
         :param user_agent (optional):  User-Agent string to use when making HTTP requests
         :param ssl_verify: (optional) Verify SSL certificates. Defaults to True.
         :param logger: (optional) If your app has a logger, pass it in here.
+        :param resilience: (optional) Retry and circuit breaker policy. Defaults to the shared policy.
+        :param scheme: (optional) The URL scheme. Defaults to https.
+        :param cache: (optional) A response cache for GET requests. Defaults to no caching.
+        :param name: (optional) The name of the client, used to label instrumentation.
+            Defaults to the hostname.
         """
         self.session = session
-        self.url = f"https://{hostname}/"
+        self.hostname = hostname
+        self.resilience = resilience or DEFAULT_RESILIENCE
+        self.cache = cache
+        self.name = name or hostname
+        self.url = f"{scheme}://{hostname}/"
 
         if base:
             self.url = f"{self.url}{base}"
@@ -77,36 +103,81 @@ class RestAdapter:
         if self.user_agent:
             headers["User-Agent"] = self.user_agent
 
-        try:
-            response = await self.session.request(
+        async def attempt() -> CachedResponse:
+            async with self.session.request(
                 method=http_method,
                 url=full_url,
                 verify_ssl=self._ssl_verify,
                 headers=headers,
                 params=ep_params,
                 json=data,
+            ) as response:
+                status_code = response.status
+                # If status_code in 200-299 range, return success Result with data, otherwise raise exception
+                is_success = 299 >= status_code >= 200  # 200 to 299 is OK
+                if not is_success:
+                    raise HTTPStatusException(
+                        status_code,
+                        f"{status_code}: {response.reason}",
+                        parse_retry_after(response.headers.get("Retry-After")),
+                    )
+
+                return CachedResponse(
+                    await response.read(),
+                    str(response.url),
+                    status_code,
+                    response.reason or "",
+                    dict(response.headers),
+                )
+
+        async def fetch() -> CachedResponse:
+            # transient failures are retried by the resilience layer before surfacing here
+            try:
+                return await self.resilience.call(self.hostname, attempt)
+            except (HTTPStatusException, CircuitOpenException) as e:
+                raise RestException(str(e)) from e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise RestException("Request failed") from e
+
+        # the body is decoded once by the caller that fetched it, before it is cached
+        decoded = []
+
+        async def fetch_decoded() -> CachedResponse:
+            response = await fetch()
+            decoded.append(self._decode(response.body))
+            return response
+
+        if self.cache is None or http_method != "GET":
+            response = await fetch_decoded()
+        else:
+            response = await self.cache.fetch(
+                cache_key(full_url, ep_params),
+                fetch_decoded,
+                # API errors are reported in the body of a successful response
+                cacheable=lambda response: not self._is_error(decoded[0]),
             )
-        except aiohttp.ClientError as e:
-            raise RestException("Request failed") from e
 
-        # deserialize
+        # callers answered from the cache (or a coalesced request) decode their own copy
+        data_out = decoded[0] if decoded else self._decode(response.body)
+
+        return Result(
+            response.status,
+            headers=response.headers,
+            message=response.reason,
+            url=response.url,
+            data=data_out,
+        )
+
+    def _decode(self, body: bytes):
         try:
-            data_out = await response.json(content_type=None)
+            with instrumentation.span(DECODE, source=self.name):
+                return json.loads(body)
         except (ValueError, TypeError, JSONDecodeError) as e:
             raise RestException("Bad JSON in response") from e
 
-        status_code = response.status
-        # If status_code in 200-299 range, return success Result with data, otherwise raise exception
-        is_success = 299 >= status_code >= 200  # 200 to 299 is OK
-        if is_success:
-            return Result(
-                status_code,
-                headers=response.headers,
-                message=response.reason,
-                url=response.url,
-                data=data_out,
-            )
-        raise RestException(f"{status_code}: {response.reason}")
+    @staticmethod
+    def _is_error(data) -> bool:
+        return isinstance(data, dict) and "error" in data
 
     async def get(self, endpoint: str, ep_params: Dict = None) -> Result:
         return await self._do(http_method="GET", endpoint=endpoint, ep_params=ep_params)
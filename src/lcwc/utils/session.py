@@ -0,0 +1,67 @@
+import aiohttp
+
+DEFAULT_LIMIT = 30
+""" The maximum number of simultaneous connections """
+
+DEFAULT_LIMIT_PER_HOST = 6
+""" The maximum number of simultaneous connections to a single host """
+
+DEFAULT_DNS_TTL = 300
+""" How long resolved addresses are cached, in seconds """
+
+DEFAULT_KEEPALIVE_TIMEOUT = 120
+""" How long idle connections are kept open, in seconds
+
+This needs to outlast the polling interval so each poll reuses a warm TLS connection
+instead of doing a fresh handshake (aiohttp only keeps connections alive for 15 seconds by default).
+"""
+
+DEFAULT_TIMEOUT = 30
+""" The total request timeout in seconds """
+
+
+def create_connector(
+    limit: int = DEFAULT_LIMIT,
+    limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+    ttl_dns_cache: int = DEFAULT_DNS_TTL,
+    keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+) -> aiohttp.TCPConnector:
+    """Creates a connector tuned for polling the LCWC hosts
+
+    :param limit: The maximum number of simultaneous connections
+    :param limit_per_host: The maximum number of simultaneous connections per host
+    :param ttl_dns_cache: How long resolved addresses are cached, in seconds
+    :param keepalive_timeout: How long idle connections are kept open, in seconds
+    :return: A TCP connector
+    :rtype: aiohttp.TCPConnector
+    """
+    return aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=ttl_dns_cache,
+        use_dns_cache=True,
+        keepalive_timeout=keepalive_timeout,
+    )
+
+
+def create_session(
+    connector: aiohttp.BaseConnector = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    **kwargs,
+) -> aiohttp.ClientSession:
+    """Creates a session backed by a pooled connector
+
+    A single session can (and should) be shared by every client so connections to the
+    same host are reused across clients and polls. Must be called from a running event loop.
+
+    :param connector: The connector to use, defaults to create_connector()
+    :param timeout: The total request timeout in seconds
+    :param kwargs: Additional arguments passed to aiohttp.ClientSession
+    :return: A client session
+    :rtype: aiohttp.ClientSession
+    """
+    return aiohttp.ClientSession(
+        connector=connector or create_connector(),
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        **kwargs,
+    )
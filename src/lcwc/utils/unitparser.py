@@ -1,7 +1,21 @@
 import re
+from typing import Callable, Iterable, Optional
+from lcwc.agencies.agency import Agency
 from lcwc.agencies.agencyresolver import AgencyResolver
 from lcwc.category import IncidentCategory
 from lcwc.unit import Unit
+from lcwc.utils.unitregistry import UNIT_REGISTRY, UnitRegistry
+
+# Ex: QRS 10
+# Ex: MEDIC 56-4
+# Ex: AMB 89-1 CHESTER
+NAME_PATTERN = re.compile(r"^([a-zA-Z ]+) ([0-9]+)(?:-([0-9]+))?(?: ([a-zA-Z ]+))?")
+
+# Ex: "ENG531" -> "ENG", "531", None
+# Ex: "AMB891CHE" -> "AMB", "891", "CHE"
+SHORT_NAME_PATTERN = re.compile(r"([a-zA-Z]+)([0-9]+)([a-zA-Z]*)")
+
+AgencyLookup = Callable[[str, IncidentCategory], Optional[Agency]]
 
 
 class UnitParserException(Exception):
@@ -14,25 +28,81 @@ class UnitParser:
         unit_str: str,
         category: IncidentCategory,
         agency_resolver: AgencyResolver = AgencyResolver(),
+        registry: Optional[UnitRegistry] = UNIT_REGISTRY,
     ) -> Unit:
         """Parses the given unit string and returns a Unit object
 
         :param unit_str: The unit string to parse
         :param category: The category for for the unit
         :param agency_resolver: The agency resolver to use for agency lookups (required for shorthand unit names)
+        :param registry: The registry the unit is interned in, or None to always return a new unit
         :return: A Unit object
         :rtype: Unit
         """
 
+        u = UnitParser.__parse(unit_str, category, agency_resolver.get_agency)
+        if registry is not None:
+            u = registry.intern(u, category)
+        return u
+
+    @staticmethod
+    def parse_units(
+        unit_strs: Iterable[str],
+        category: IncidentCategory,
+        agency_resolver: AgencyResolver = AgencyResolver(),
+        errors: Optional[dict[str, Exception]] = None,
+        registry: Optional[UnitRegistry] = UNIT_REGISTRY,
+    ) -> dict[str, Unit]:
+        """Parses many unit strings of the same category at once
+
+        Each distinct string is parsed once and agencies are resolved from a station index
+        instead of scanning every agency, so pass every unit of a poll (per category) in a
+        single call. Incidents sharing a unit string share the returned Unit instance.
+
+        :param unit_strs: The unit strings to parse, duplicates and empty strings allowed
+        :param category: The category for the units
+        :param agency_resolver: The agency resolver to use for agency lookups
+        :param errors: (optional) A dictionary that receives the exception of every string that failed to parse
+        :param registry: The registry the units are interned in, or None to always return new units
+        :return: A dictionary of unit string to Unit, without the strings that failed to parse
+        :rtype: dict[str, Unit]
+        """
+        index = agency_resolver.get_station_index(category)
+
+        def get_agency(station_id: str, _: IncidentCategory) -> Optional[Agency]:
+            return index.get(station_id)
+
+        units = {}
+        for unit_str in unit_strs:
+            if not unit_str or unit_str in units:
+                continue
+            if errors is not None and unit_str in errors:
+                continue
+            try:
+                u = UnitParser.__parse(unit_str, category, get_agency)
+            except (UnitParserException, ValueError) as e:
+                if errors is None:
+                    raise
+                errors[unit_str] = e
+                continue
+            if registry is not None:
+                u = registry.intern(u, category)
+            units[unit_str] = u
+        return units
+
+    @staticmethod
+    def __parse(
+        unit_str: str, category: IncidentCategory, get_agency: AgencyLookup
+    ) -> Unit:
         is_shorthand = " " not in unit_str
         if is_shorthand:
-            return UnitParser.__parse_short_name(unit_str, category, agency_resolver)
+            return UnitParser.__parse_short_name(unit_str, category, get_agency)
         else:
-            return UnitParser.__parse_name(unit_str, category, agency_resolver)
+            return UnitParser.__parse_name(unit_str, category, get_agency)
 
     @staticmethod
     def __parse_name(
-        unit_str: str, category: IncidentCategory, agency_resolver: AgencyResolver
+        unit_str: str, category: IncidentCategory, get_agency: AgencyLookup
     ) -> Unit:
         u = Unit(full_name=unit_str)
 
@@ -40,12 +110,7 @@ class UnitParser:
             u.pending = True
             return u
 
-        # Ex: QRS 10
-        # Ex: MEDIC 56-4
-        # Ex: AMB 89-1 CHESTER
-        match = re.match(
-            r"^([a-zA-Z ]+) ([0-9]+)(?:-([0-9]+))?(?: ([a-zA-Z ]+))?", unit_str
-        )
+        match = NAME_PATTERN.match(unit_str)
         if match is None:
             raise UnitParserException(f"Unable to parse unit name: {unit_str}")
 
@@ -66,7 +131,7 @@ class UnitParser:
             u.county_name = county_name
             u.out_of_county = True
 
-        agency = agency_resolver.get_agency(station_id, category)
+        agency = get_agency(station_id, category)
         if agency:
             u.agency = agency
 
@@ -74,7 +139,7 @@ class UnitParser:
 
     @staticmethod
     def __parse_short_name(
-        unit_str: str, category: IncidentCategory, agency_resolver: AgencyResolver
+        unit_str: str, category: IncidentCategory, get_agency: AgencyLookup
     ):
         """Identifies the agency associated with the given unit short name"""
 
@@ -92,9 +157,7 @@ class UnitParser:
             u.pending = True
             return u
 
-        # Ex: "ENG531" -> "ENG", "531", None
-        # Ex: "AMB891CHE" -> "AMB", "891", "CHE"
-        match = re.match(r"([a-zA-Z]+)([0-9]+)([a-zA-Z]*)", unit_str)
+        match = SHORT_NAME_PATTERN.match(unit_str)
         if match is None:
             raise UnitParserException(f"Unable to parse unit name: {unit_str}")
 
@@ -112,7 +175,7 @@ class UnitParser:
             agency_suffix = identifer[i + 1 :]
             # agency id is padded with zeros to 2 digits (ex: "07")
             padded_id = str(agency_id_builder.zfill(2))
-            a = agency_resolver.get_agency(padded_id, category)
+            a = get_agency(padded_id, category)
             if a is not None:
                 u.station_id = padded_id
                 u.agency = a
@@ -0,0 +1,49 @@
+from typing import Optional
+from weakref import WeakValueDictionary
+
+from lcwc.category import IncidentCategory
+from lcwc.unit import Unit
+
+
+class UnitRegistry:
+    """Interns units so every poll and client shares one Unit object per apparatus
+
+    Units are keyed by (full_name, category) and held weakly, so a unit is forgotten once no
+    incident refers to it. A unit is only reused if all of its fields match, which keeps the
+    registry correct when agency resolvers disagree.
+    """
+
+    def __init__(self) -> None:
+        self._units: WeakValueDictionary = WeakValueDictionary()
+
+    def intern(self, unit: Unit, category: IncidentCategory) -> Unit:
+        """Returns the registered unit equal to the given one, registering it if there is none
+
+        :param unit: The unit to intern
+        :param category: The category the unit was parsed for
+        :return: The shared unit
+        :rtype: Unit
+        """
+        key = (unit.full_name, category)
+        existing = self._units.get(key)
+        if existing is not None and (existing is unit or vars(existing) == vars(unit)):
+            return existing
+        self._units[key] = unit
+        return unit
+
+    def get(self, full_name: str, category: IncidentCategory) -> Optional[Unit]:
+        """Returns the registered unit with the given name and category, if any"""
+        return self._units.get((full_name, category))
+
+    def clear(self) -> None:
+        self._units.clear()
+
+    def __len__(self) -> int:
+        return len(self._units)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._units
+
+
+UNIT_REGISTRY = UnitRegistry()
+""" The registry shared by every parser unless another is given """
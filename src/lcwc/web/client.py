@@ -1,6 +1,11 @@
+from typing import Optional
 import aiohttp
 from lcwc import Client
 from lcwc.agencies.agencyresolver import AgencyResolver
+from lcwc.utils import instrumentation
+from lcwc.utils.instrumentation import PARSE
+from lcwc.utils.cache import ResponseCache
+from lcwc.utils.resilience import Resilience
 from lcwc.web.incident import WebIncident as Incident
 from lcwc.web.parser import WebParser
 
@@ -11,7 +16,17 @@ class WebClient(Client):
     URL = "https://www.lcwc911.us/live-incident-list"
     """ The URL of the live incident page """
 
-    def __init__(self, agency_resolver: AgencyResolver = AgencyResolver()) -> None:
+    MIN_POLL_INTERVAL = 15
+    """ The incident page is a single request, the cheapest source to poll """
+
+    def __init__(
+        self,
+        agency_resolver: AgencyResolver = AgencyResolver(),
+        session: Optional[aiohttp.ClientSession] = None,
+        resilience: Optional[Resilience] = None,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
+        super().__init__(session, resilience, cache)
         self.agency_resolver = agency_resolver
         self.parser = WebParser()
 
@@ -21,20 +36,19 @@ class WebClient(Client):
         return "WebClient"
 
     async def get_incidents(
-        self, session: aiohttp.ClientSession, timeout: int = 10
+        self, session: aiohttp.ClientSession = None, timeout: int = 10
     ) -> list[Incident]:
         """Fetches the live incident page and returns a list of incidents
 
-        :param session: The aiohttp session to use
+        :param session: The aiohttp session to use (defaults to the client's session)
         :param timeout: The timeout in seconds
         :return: A list of incidents
         :rtype: list[Incident]
         """
-        html = None
-        async with session.get(self.URL, timeout=timeout) as resp:
-            if resp.status == 200:
-                html = await resp.read()
-            else:
-                raise Exception(f"Unable to fetch live incident page: {resp.status}")
-
-        return self.parser.parse(html, self.agency_resolver)
+        session = self._get_session(session)
+        html = await self._fetch(session, self.URL, timeout)
+
+        with instrumentation.span(PARSE, source=self.name):
+            incidents = self.parser.parse(html, self.agency_resolver)
+        self.diagnostics = self.parser.diagnostics
+        return incidents
@@ -1,10 +1,33 @@
-import datetime
-from lcwc.category import IncidentCategory
-from lcwc.incident import Incident
-from lcwc.unit import Unit
+from dataclasses import dataclass, field
+from lcwc.incident import Incident, fingerprint
 
 
+@dataclass
 class WebIncident(Incident):
-    """Represents an incident from the web incident feed"""
+    """Represents an incident from the web incident feed
 
-    pass
+    The page has no incident identifiers, so incidents are identified and hashed by a
+    fingerprint of their category, date, municipality and intersection. Equality still
+    compares every field.
+    """
+
+    """ The fingerprint of the incident, computed once when it is created """
+    fingerprint: str = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.fingerprint = fingerprint(
+            self.category, self.date, self.municipality, self.intersection
+        )
+
+    @property
+    def key(self) -> str:
+        return self.fingerprint
+
+    def to_dict(self) -> dict:
+        d = super().to_dict()
+        del d["fingerprint"]
+        return d
+
+    def __hash__(self) -> int:
+        # equal incidents share a fingerprint, so this is consistent with field equality
+        return hash(self.fingerprint)
@@ -1,25 +1,42 @@
 import datetime
 import logging
+import time
 from bs4 import BeautifulSoup
 import pytz
 from lcwc.agencies.agencyresolver import AgencyResolver
-from lcwc.agencies.exceptions import OutOfCountyException, PendingUnitException
 from lcwc.category import IncidentCategory
-from lcwc.utils.unitparser import UnitParser, UnitParserException
+from lcwc.utils import instrumentation
+from lcwc.utils.diagnostics import (
+    INVALID_FEATURE,
+    UNIT_EXCEPTIONS,
+    ParseDiagnostics,
+)
+from lcwc.utils.instrumentation import DECODE, RESOLVE
+from lcwc.utils.unitparser import UnitParser
 
 from lcwc.web.incident import WebIncident
 
 
 class WebParser:
+    SOURCE = "WebClient"
+    """ The source label used for instrumentation """
+
     def __init__(self) -> None:
         self.logger = logging.getLogger(__name__)
+        self.diagnostics = ParseDiagnostics(self.SOURCE)
+        """ The diagnostics of the last parse """
 
     def parse(self, html: str, agency_resolver: AgencyResolver) -> list[WebIncident]:
         """Parses the live incident page and returns a list of incidents"""
 
         incidents = []
+        diagnostics = ParseDiagnostics(self.SOURCE)
+        # unit resolution is only timed while instrumentation is active
+        current = instrumentation.current()
+        resolve_time = 0.0
 
-        soup = BeautifulSoup(html, "html.parser")
+        with instrumentation.span(DECODE, source=self.SOURCE):
+            soup = BeautifulSoup(html, "html.parser")
         containers = soup.find_all("div", class_="live-incident-container")
 
         for container in containers:
@@ -46,10 +63,15 @@ class WebParser:
 
                 # convert date to UTC
                 local_tz = pytz.timezone("America/New_York")
-                raw_date = datetime.datetime.strptime(
-                    date_row.text.strip(), "%a, %b %d, %Y %H:%M"
-                )
-                local_dt = local_tz.localize(raw_date, is_dst=None)
+                try:
+                    raw_date = datetime.datetime.strptime(
+                        date_row.text.strip(), "%a, %b %d, %Y %H:%M"
+                    )
+                    local_dt = local_tz.localize(raw_date, is_dst=None)
+                except (ValueError, pytz.InvalidTimeError):
+                    # malformed, or ambiguous or skipped when the clocks change
+                    diagnostics.record(INVALID_FEATURE, date_row.text.strip())
+                    continue
                 date = local_dt.astimezone(pytz.utc)
 
                 description = incident_row.text.strip().strip()
@@ -70,6 +92,7 @@ class WebParser:
                     for u in units_row.decode_contents().strip().split("<br/>")
                 ]
 
+                start = time.perf_counter() if current is not None else 0.0
                 units = []
                 for unit_name in unit_names:
                     if unit_name == "":
@@ -78,16 +101,22 @@ class WebParser:
                     try:
                         u = UnitParser.parse_unit(unit_name, category, agency_resolver)
                         units.append(u)
-                    except OutOfCountyException:
-                        self.logger.debug(f"Unit {unit_name} is out of county")
-                    except PendingUnitException:
-                        self.logger.debug(f"Unit {unit_name} is pending")
-                    except UnitParserException:
-                        self.logger.debug(f"Unable to parse unit {unit_name}")
+                    except UNIT_EXCEPTIONS as e:
+                        diagnostics.record_exception(e, unit_name)
+                if current is not None:
+                    resolve_time += time.perf_counter() - start
+                diagnostics.parsed += len(units)
 
                 incident = WebIncident(
                     category, date, description, municipality, intersection, units
                 )
                 incidents.append(incident)
 
+        if current is not None:
+            current.record_span(RESOLVE, resolve_time, source=self.SOURCE)
+        diagnostics.publish()
+        if diagnostics:
+            self.logger.debug("Unit parse failures: %s", diagnostics.counts)
+        self.diagnostics = diagnostics
+
         return incidents
@@ -0,0 +1,316 @@
+import logging
+import math
+import os
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, Sequence, Union
+
+from lcwc.arcgis.incident import ArcGISIncident
+from lcwc.utils.encoding import decode_json
+
+# the vectorized batch path is used when NumPy is installed
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+"""
+Assignment of incidents to response zones (ex: fire boxes, EMS first-due areas).
+
+A ZoneIndex is built once from a GeoJSON polygon set. It buckets each zone's bounding box into a
+uniform grid, so locating a point only runs the point-in-polygon test against the few zones
+whose boxes overlap its grid cell instead of every polygon.
+"""
+
+Ring = tuple[tuple[float, ...], tuple[float, ...]]
+""" A closed ring of a polygon as (longitudes, latitudes) """
+
+
+def _point_in_rings(x: float, y: float, rings: Sequence[Ring]) -> bool:
+    # even-odd ray casting over every ring, so holes are excluded
+    inside = False
+    for xs, ys in rings:
+        j = len(xs) - 1
+        for i in range(len(xs)):
+            yi, yj = ys[i], ys[j]
+            if (yi > y) != (yj > y):
+                crossing = (xs[j] - xs[i]) * (y - yi) / (yj - yi) + xs[i]
+                if x < crossing:
+                    inside = not inside
+            j = i
+    return inside
+
+
+@dataclass
+class Zone:
+    """Represents a response zone"""
+
+    """ The name of the zone """
+    name: str
+
+    """ The properties of the GeoJSON feature the zone was read from """
+    properties: dict = field(default_factory=dict, repr=False)
+
+    """ The polygons of the zone, each a list of rings (the exterior followed by any holes) """
+    polygons: list[list[Ring]] = field(default_factory=list, repr=False)
+
+    """ The bounding box of the zone as (min longitude, min latitude, max longitude, max latitude) """
+    bbox: tuple[float, float, float, float] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        xs = [x for polygon in self.polygons for ring in polygon for x in ring[0]]
+        ys = [y for polygon in self.polygons for ring in polygon for y in ring[1]]
+        if not xs:
+            raise ValueError(f"Zone {self.name} has no coordinates")
+        self.bbox = (min(xs), min(ys), max(xs), max(ys))
+
+    def contains(self, longitude: float, latitude: float) -> bool:
+        """Returns whether the point lies within the zone"""
+        min_x, min_y, max_x, max_y = self.bbox
+        if not (min_x <= longitude <= max_x and min_y <= latitude <= max_y):
+            return False
+        return any(
+            _point_in_rings(longitude, latitude, polygon) for polygon in self.polygons
+        )
+
+
+class ZoneIndex:
+    """A grid index of zones for fast point-in-polygon lookups
+
+    Where zones overlap, the zone listed first wins.
+    """
+
+    def __init__(
+        self, zones: Iterable[Zone], cell_size: Optional[float] = None
+    ) -> None:
+        """
+        :param zones: The zones to index
+        :param cell_size: (optional) The width of a grid cell in degrees. Defaults to a size
+            giving roughly four cells per zone.
+        """
+        self.zones = list(zones)
+        self.logger = logging.getLogger(__name__)
+
+        if not self.zones:
+            self.bbox = (0.0, 0.0, 0.0, 0.0)
+            self.cell_size = 1.0
+            self.columns = self.rows = 1
+            self._cells: list[list[int]] = [[]]
+            self._zone_cells: list[list[int]] = []
+            return
+
+        min_x = min(zone.bbox[0] for zone in self.zones)
+        min_y = min(zone.bbox[1] for zone in self.zones)
+        max_x = max(zone.bbox[2] for zone in self.zones)
+        max_y = max(zone.bbox[3] for zone in self.zones)
+        self.bbox = (min_x, min_y, max_x, max_y)
+
+        if cell_size is None:
+            area = max((max_x - min_x) * (max_y - min_y), 1e-12)
+            cell_size = math.sqrt(area / (4 * len(self.zones)))
+        self.cell_size = cell_size
+        self.columns = max(1, math.ceil((max_x - min_x) / cell_size))
+        self.rows = max(1, math.ceil((max_y - min_y) / cell_size))
+
+        # each cell lists the zones whose bounding box overlaps it, in zone order
+        # and each zone lists the cells it overlaps, for the vectorized path
+        self._cells = [[] for _ in range(self.columns * self.rows)]
+        self._zone_cells = []
+        for i, zone in enumerate(self.zones):
+            col_min, row_min = self._cell(zone.bbox[0], zone.bbox[1])
+            col_max, row_max = self._cell(zone.bbox[2], zone.bbox[3])
+            zone_cells = [
+                row * self.columns + col
+                for row in range(row_min, row_max + 1)
+                for col in range(col_min, col_max + 1)
+            ]
+            for cell in zone_cells:
+                self._cells[cell].append(i)
+            self._zone_cells.append(zone_cells)
+
+        self.logger.debug(
+            f"Indexed {len(self.zones)} zones in a {self.columns}x{self.rows} grid"
+        )
+
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        col = int((x - self.bbox[0]) / self.cell_size)
+        row = int((y - self.bbox[1]) / self.cell_size)
+        return min(max(col, 0), self.columns - 1), min(max(row, 0), self.rows - 1)
+
+    def locate(self, longitude: float, latitude: float) -> Optional[Zone]:
+        """Returns the zone containing a point
+
+        :param longitude: The longitude of the point
+        :param latitude: The latitude of the point
+        :return: The zone, or None if the point isn't in any zone
+        :rtype: Optional[Zone]
+        """
+        min_x, min_y, max_x, max_y = self.bbox
+        if not (min_x <= longitude <= max_x and min_y <= latitude <= max_y):
+            return None
+        col, row = self._cell(longitude, latitude)
+        for i in self._cells[row * self.columns + col]:
+            if self.zones[i].contains(longitude, latitude):
+                return self.zones[i]
+        return None
+
+    def locate_many(
+        self, points: Sequence[tuple[float, float]], vectorized: Optional[bool] = None
+    ) -> list[Optional[Zone]]:
+        """Returns the zone containing each point
+
+        :param points: The (longitude, latitude) of each point
+        :param vectorized: Whether to use NumPy. By default it is used when installed and there
+            are more points than zones, since its per-zone overhead outweighs the scalar path
+            for small batches such as a single poll.
+        :return: The zone of each point, or None for points outside every zone
+        :rtype: list[Optional[Zone]]
+        """
+        if vectorized is None:
+            vectorized = numpy is not None and len(points) > len(self.zones)
+        if not vectorized or not points or not self.zones:
+            return [self.locate(x, y) for x, y in points]
+        if numpy is None:
+            raise RuntimeError("NumPy is required for vectorized zone lookups")
+
+        xy = numpy.asarray(points, dtype=float)
+        x, y = xy[:, 0], xy[:, 1]
+        min_x, min_y, max_x, max_y = self.bbox
+        in_bounds = (x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y)
+        cols = numpy.clip(
+            ((x - min_x) / self.cell_size).astype(int), 0, self.columns - 1
+        )
+        rows = numpy.clip(((y - min_y) / self.cell_size).astype(int), 0, self.rows - 1)
+        cells = rows * self.columns + cols
+
+        # sort the points by cell, then test each zone against the points of its cells at once;
+        # zones are visited in order, so the first zone containing a point wins
+        result = numpy.full(len(points), -1)
+        bounded = numpy.nonzero(in_bounds)[0]
+        bounded = bounded[numpy.argsort(cells[bounded], kind="stable")]
+        groups, starts = numpy.unique(cells[bounded], return_index=True)
+        ends = numpy.append(starts[1:], len(bounded)).tolist()
+        slices = dict(zip(groups.tolist(), zip(starts.tolist(), ends)))
+        for i, zone_cells in enumerate(self._zone_cells):
+            parts = [
+                bounded[slices[cell][0] : slices[cell][1]]
+                for cell in zone_cells
+                if cell in slices
+            ]
+            if not parts:
+                continue
+            pending = numpy.concatenate(parts) if len(parts) > 1 else parts[0]
+            pending = pending[result[pending] < 0]
+            if len(pending):
+                inside = self._contains_many(self.zones[i], x[pending], y[pending])
+                result[pending[inside]] = i
+
+        return [self.zones[i] if i >= 0 else None for i in result.tolist()]
+
+    @staticmethod
+    def _contains_many(zone: Zone, x, y):
+        min_x, min_y, max_x, max_y = zone.bbox
+        inside = numpy.zeros(len(x), dtype=bool)
+        candidates = (x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y)
+        if not candidates.any():
+            return inside
+        for polygon in zone.polygons:
+            crossings = numpy.zeros(len(x), dtype=bool)
+            for xs, ys in polygon:
+                xi, yi = numpy.asarray(xs), numpy.asarray(ys)
+                xj, yj = numpy.roll(xi, 1), numpy.roll(yi, 1)
+                straddles = (yi[None, :] > y[:, None]) != (yj[None, :] > y[:, None])
+                with numpy.errstate(divide="ignore", invalid="ignore"):
+                    edge_x = (xj - xi)[None, :] * (y[:, None] - yi[None, :]) / (
+                        yj - yi
+                    )[None, :] + xi[None, :]
+                crossed = straddles & (x[:, None] < edge_x)
+                crossings ^= (crossed.sum(axis=1) % 2).astype(bool)
+            inside |= crossings
+        return inside & candidates
+
+    def assign(self, incidents: Iterable[ArcGISIncident]) -> int:
+        """Sets the zone of each incident with coordinates
+
+        :param incidents: The incidents to assign
+        :return: The number of incidents placed in a zone
+        :rtype: int
+        """
+        located = [
+            incident for incident in incidents if incident.coordinates is not None
+        ]
+        zones = self.locate_many(
+            [
+                (incident.coordinates.longitude, incident.coordinates.latitude)
+                for incident in located
+            ]
+        )
+        assigned = 0
+        for incident, zone in zip(located, zones):
+            incident.zone = zone.name if zone is not None else None
+            assigned += zone is not None
+        return assigned
+
+    @classmethod
+    def from_geojson(
+        cls,
+        data: Union[dict, bytes, str, os.PathLike],
+        name_property: str = "name",
+        cell_size: Optional[float] = None,
+    ) -> "ZoneIndex":
+        """Builds an index from a GeoJSON FeatureCollection of Polygon and MultiPolygon features
+
+        Coordinates must be WGS84 longitude/latitude, the spatial reference ArcGIS incidents
+        are requested in.
+
+        :param data: The decoded collection, its JSON document, or a path to it
+        :param name_property: The feature property holding the zone name. Features without it
+            are named by their id, or their position in the collection.
+        :param cell_size: (optional) The width of a grid cell in degrees
+        :return: The index
+        :rtype: ZoneIndex
+        :raises ValueError: If the document isn't a FeatureCollection
+        """
+        if isinstance(data, (str, os.PathLike)):
+            with open(data, "rb") as f:
+                data = f.read()
+        if isinstance(data, bytes):
+            data = decode_json(data)
+        if data.get("type") != "FeatureCollection":
+            raise ValueError("Expected a GeoJSON FeatureCollection")
+
+        logger = logging.getLogger(__name__)
+        zones = []
+        for position, feature in enumerate(data.get("features") or []):
+            geometry = feature.get("geometry") or {}
+            properties = feature.get("properties") or {}
+            if geometry.get("type") == "Polygon":
+                polygons = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiPolygon":
+                polygons = geometry["coordinates"]
+            else:
+                logger.warning(
+                    f"Skipping feature {position} with geometry {geometry.get('type')}"
+                )
+                continue
+
+            name = properties.get(name_property, feature.get("id", position))
+            zones.append(
+                Zone(
+                    str(name),
+                    properties,
+                    [
+                        [
+                            (
+                                tuple(float(p[0]) for p in ring),
+                                tuple(float(p[1]) for p in ring),
+                            )
+                            for ring in polygon
+                        ]
+                        for polygon in polygons
+                    ],
+                )
+            )
+        return cls(zones, cell_size)
+
+    def __len__(self) -> int:
+        return len(self.zones)
@@ -1,6 +1,15 @@
 import aiohttp
+import asyncio
 import unittest
+from typing import Optional
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 from lcwc.arcgis import ArcGISClient, ArcGISIncident
+from lcwc.arcgis.client import ArcGISException
+from lcwc.arcgis.query import ArcGISQuery
+from lcwc.category import IncidentCategory
+from lcwc.utils.compact import CompactCodec
+from lcwc.utils.resilience import Resilience
 from unittest import IsolatedAsyncioTestCase
 
 
@@ -28,5 +37,333 @@ class WebClientTest(IsolatedAsyncioTestCase):
             self.assertIsNotNone(first_incident.coordinates)
 
 
+def make_feature(
+    object_id,
+    number,
+    units="ENG531",
+    location="STATE RD & CENTERVILLE RD",
+    object_id_field="OBJECTID",
+):
+    return {
+        "attributes": {
+            object_id_field: object_id,
+            "IncidentNumber": number,
+            "IncidentMunicipality": "EAST HEMPFIELD TOWNSHIP",
+            "IncidentOrigination": 1674659880000,
+            "PrimaryAgency": "53",
+            "CurrentUnits": units,
+            "PublicLocation": location,
+            "PublicType": "BUILDING FIRE",
+            "IsPublic": 1,
+        },
+        "geometry": {"x": -76.3 - object_id / 100, "y": 40.05},
+    }
+
+
+class StandInServer:
+    """Answers layer queries from a scripted set of fire features, recording each query"""
+
+    def __init__(
+        self, max_record_count: int = 1000, object_id_field: str = "OBJECTID"
+    ) -> None:
+        self.features = []
+        self.object_id_field = object_id_field
+        self.queries = []
+        self.max_record_count = max_record_count
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_object_ids = False
+        self.fail_offsets = set()
+
+    async def query(self, request: web.Request) -> web.Response:
+        layer = int(request.match_info["layer"])
+        params = dict(request.query)
+        self.queries.append((layer, params))
+
+        features = self.features if layer == 0 else []
+        if "objectIds" in params:
+            if self.fail_object_ids:
+                return web.json_response({"error": {"code": 500}})
+            ids = {int(i) for i in params["objectIds"].split(",")}
+            features = [
+                f for f in features if f["attributes"][self.object_id_field] in ids
+            ]
+        if params.get("returnCountOnly") == "true":
+            return web.json_response({"count": len(features)})
+
+        offset = int(params.get("resultOffset", 0))
+        if offset in self.fail_offsets:
+            return web.json_response({"error": {"code": 500}})
+        limit = min(
+            int(params.get("resultRecordCount", self.max_record_count)),
+            self.max_record_count,
+        )
+        page = features[offset : offset + limit]
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        fields = params.get("outFields", "*").split(",")
+        out = []
+        for feature in page:
+            attributes = feature["attributes"]
+            f = {"attributes": {k: attributes[k] for k in fields if k in attributes}}
+            if params.get("returnGeometry") == "true":
+                f["geometry"] = feature["geometry"]
+            out.append(f)
+        return web.json_response(
+            {
+                "objectIdFieldName": self.object_id_field,
+                "features": out,
+                "exceededTransferLimit": offset + limit < len(features),
+            }
+        )
+
+    def fire_queries(self) -> list[dict]:
+        return [params for layer, params in self.queries if layer == 0]
+
+
+class ArcGISIncrementalTest(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.stand_in = StandInServer()
+        app = web.Application()
+        app.router.add_get("/arcgis/MapServer/{layer}/query", self.stand_in.query)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    def make_client(
+        self, incremental: bool = False, query: Optional[ArcGISQuery] = None
+    ) -> ArcGISClient:
+        return ArcGISClient(
+            resilience=Resilience(),
+            incremental=incremental,
+            query=query,
+            hostname=f"{self.server.host}:{self.server.port}",
+            base="arcgis/MapServer/",
+            scheme="http",
+        )
+
+    async def test_incremental_polls(self):
+        async with self.make_client(incremental=True) as client:
+            self.stand_in.features = [make_feature(1, 101), make_feature(2, 102)]
+            first = await client.get_incidents()
+            self.assertEqual([i.number for i in first], [101, 102])
+            self.assertEqual(first[1].coordinates.longitude, -76.32)
+            self.assertIsNotNone(first[0].units[0].agency)
+
+            queries = self.stand_in.fire_queries()
+            self.assertEqual(len(queries), 2)
+            self.assertEqual(queries[0]["returnGeometry"], "false")
+            self.assertEqual(queries[1]["objectIds"], "1,2")
+
+            # nothing changed: no geometry is fetched and the incidents are reused
+            self.stand_in.queries.clear()
+            second = await client.get_incidents()
+            self.assertEqual(len(self.stand_in.fire_queries()), 1)
+            self.assertIs(second[0], first[0])
+            self.assertIs(second[1], first[1])
+
+            # units changed on 101, 102 closed and 103 is new: only 103 is located
+            self.stand_in.queries.clear()
+            self.stand_in.features = [
+                make_feature(1, 101, units="ENG531,ENG61"),
+                make_feature(3, 103),
+            ]
+            third = await client.get_incidents()
+            queries = self.stand_in.fire_queries()
+            self.assertEqual(len(queries), 2)
+            self.assertEqual(queries[1]["objectIds"], "3")
+
+            self.assertEqual([i.number for i in third], [101, 103])
+            self.assertIsNot(third[0], first[0])
+            self.assertEqual(len(third[0].units), 2)
+            self.assertEqual(third[0].coordinates, first[0].coordinates)
+            self.assertEqual(sorted(client.features[third[0].category]), [101, 103])
+
+            # a new location is located again
+            self.stand_in.queries.clear()
+            self.stand_in.features = [
+                make_feature(1, 101, units="ENG531,ENG61", location="STATE RD"),
+                make_feature(3, 103),
+            ]
+            fourth = await client.get_incidents()
+            self.assertEqual(self.stand_in.fire_queries()[1]["objectIds"], "1")
+            self.assertEqual(fourth[0].intersection, "STATE RD")
+            self.assertIs(fourth[1], third[1])
+
+    async def test_known_incidents_survive_failed_geometry_fetch(self):
+        async with self.make_client(incremental=True) as client:
+            self.stand_in.features = [make_feature(1, 101)]
+            first = await client.get_incidents()
+
+            # 101 moved and 102 is new, but their geometry can't be fetched
+            self.stand_in.fail_object_ids = True
+            self.stand_in.features = [
+                make_feature(1, 101, location="STATE RD"),
+                make_feature(2, 102),
+            ]
+            second = await client.get_incidents()
+            self.assertEqual([i.number for i in second], [101])
+            self.assertEqual(second[0].intersection, "STATE RD")
+            self.assertEqual(second[0].coordinates, first[0].coordinates)
+
+            # the move is located once the geometry can be fetched again
+            self.stand_in.fail_object_ids = False
+            self.stand_in.features[0]["geometry"] = {"x": -76.5, "y": 40.1}
+            self.stand_in.queries.clear()
+            third = await client.get_incidents()
+            self.assertEqual(self.stand_in.fire_queries()[1]["objectIds"], "1,2")
+            self.assertEqual([i.number for i in third], [101, 102])
+            self.assertEqual(third[0].coordinates.longitude, -76.5)
+
+    async def test_other_object_id_field(self):
+        self.stand_in.object_id_field = "FID"
+        async with self.make_client(incremental=True) as client:
+            # OBJECTID is requested first, so the features are located by a full query
+            self.stand_in.features = [make_feature(1, 101, object_id_field="FID")]
+            with self.assertLogs("lcwc.arcgis.client", "WARNING"):
+                first = await client.get_incidents()
+            self.assertEqual([i.number for i in first], [101])
+            self.assertEqual(first[0].coordinates.longitude, -76.31)
+            self.assertEqual(self.stand_in.fire_queries()[1]["returnGeometry"], "true")
+
+            # then by the field the layer named
+            self.stand_in.queries.clear()
+            self.stand_in.features.append(make_feature(2, 102, object_id_field="FID"))
+            second = await client.get_incidents()
+            queries = self.stand_in.fire_queries()
+            self.assertTrue(queries[0]["outFields"].endswith(",FID"))
+            self.assertEqual(queries[1]["objectIds"], "2")
+            self.assertEqual([i.number for i in second], [101, 102])
+            self.assertEqual(second[1].coordinates.longitude, -76.32)
+
+    async def test_full_polls(self):
+        self.stand_in.features = [make_feature(1, 101), make_feature(2, 102)]
+        async with self.make_client(incremental=False) as client:
+            incidents = await client.get_incidents()
+
+        queries = self.stand_in.fire_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(queries[0]["returnGeometry"], "true")
+        self.assertEqual([i.number for i in incidents], [101, 102])
+        self.assertEqual(incidents[1].coordinates.longitude, -76.32)
+
+    async def test_pages_past_the_server_limit(self):
+        self.stand_in.max_record_count = 3
+        self.stand_in.features = [make_feature(i, 100 + i) for i in range(1, 11)]
+        async with self.make_client() as client:
+            incidents = await client.get_incidents()
+
+        self.assertEqual([i.number for i in incidents], list(range(101, 111)))
+        queries = self.stand_in.fire_queries()
+        self.assertEqual(queries[1]["returnCountOnly"], "true")
+        self.assertEqual(sorted(int(q["resultOffset"]) for q in queries[2:]), [3, 6, 9])
+        self.assertGreater(self.stand_in.max_in_flight, 1)
+
+    async def test_failed_page_fails_the_layer(self):
+        self.stand_in.max_record_count = 3
+        self.stand_in.features = [make_feature(i, 100 + i) for i in range(1, 11)]
+        self.stand_in.fail_offsets = {6}
+        async with self.make_client() as client:
+            # a partial layer would report the incidents of the missing page as removed
+            self.assertEqual(await client.get_incidents(), [])
+
+            with self.assertRaises(ArcGISException):
+                await client.get_incidents(throw_on_error=True)
+
+    async def test_page_size(self):
+        self.stand_in.features = [make_feature(i, 100 + i) for i in range(1, 11)]
+        query = ArcGISQuery().paged(4, max_concurrency=1)
+        async with self.make_client(query=query) as client:
+            incidents = await client.get_incidents()
+            self.assertEqual(len(incidents), 10)
+            self.assertEqual(self.stand_in.max_in_flight, 1)
+            self.assertEqual(self.stand_in.fire_queries()[0]["resultRecordCount"], "4")
+
+            # the pages of the object id fetch are followed too
+            self.stand_in.queries.clear()
+            client.incremental = True
+            incidents = await client.get_incidents()
+            self.assertEqual(len(incidents), 10)
+            self.assertTrue(all(i.coordinates is not None for i in incidents))
+
+    async def test_projection_without_geometry(self):
+        self.stand_in.features = [make_feature(1, 101)]
+        query = ArcGISQuery().select("CurrentUnits").without_geometry()
+        async with self.make_client(query=query) as client:
+            incidents = await client.get_incidents()
+
+        params = self.stand_in.fire_queries()[0]
+        self.assertEqual(params["outFields"], "IncidentNumber,CurrentUnits")
+        self.assertEqual(params["returnGeometry"], "false")
+        self.assertNotIn("outSR", params)
+
+        self.assertEqual(incidents[0].number, 101)
+        self.assertEqual(len(incidents[0].units), 1)
+        self.assertIsNone(incidents[0].coordinates)
+        self.assertIsNone(incidents[0].municipality)
+        self.assertIsNone(incidents[0].public)
+        self.assertEqual(
+            CompactCodec().decode(CompactCodec().encode(incidents)), incidents
+        )
+
+
+class ArcGISQueryTest(unittest.TestCase):
+    def test_params(self):
+        query = ArcGISQuery()
+        params = query.params(IncidentCategory.MEDICAL)
+        self.assertIn("Priority", params["outFields"].split(","))
+        self.assertEqual(params["outSR"], 4326)
+        self.assertEqual(params["inSR"], 102100)
+
+        # fields of other layers are dropped, unknown fields are passed through
+        query = query.select("Priority", "Custom")
+        self.assertEqual(
+            query.out_fields(IncidentCategory.FIRE), ["IncidentNumber", "Custom"]
+        )
+        self.assertEqual(
+            query.out_fields(IncidentCategory.MEDICAL),
+            ["IncidentNumber", "Priority", "Custom"],
+        )
+
+        envelope = {"xmin": -77, "ymin": 39, "xmax": -76, "ymax": 40}
+        params = query.within({**envelope, "spatialReference": {"wkid": 4326}}).params(
+            IncidentCategory.FIRE
+        )
+        self.assertEqual(params["inSR"], 4326)
+
+        query = query.on_layers({IncidentCategory.FIRE: 5})
+        self.assertEqual(query.layers, {IncidentCategory.FIRE: 5})
+        self.assertEqual(ArcGISQuery().layers[IncidentCategory.TRAFFIC], 2)
+
+        with self.assertRaises(ValueError):
+            query.paged(0)
+        with self.assertRaises(ValueError):
+            query.paged(4, max_concurrency=0)
+        with self.assertRaises(ValueError):
+            ArcGISQuery(max_concurrency=0)
+
+    def test_immutable(self):
+        query = ArcGISQuery()
+        self.assertEqual(hash(query), hash(ArcGISQuery()))
+        self.assertEqual(len({query, ArcGISQuery(), query.without_geometry()}), 2)
+
+        with self.assertRaises(TypeError):
+            query.layers[IncidentCategory.FIRE] = 5
+        with self.assertRaises(TypeError):
+            query.envelope["spatialReference"]["wkid"] = 4326
+
+        # builder arguments are copied, so changing them later doesn't change the query
+        layers = {IncidentCategory.FIRE: 5}
+        query = query.on_layers(layers)
+        layers[IncidentCategory.FIRE] = 6
+        self.assertEqual(query.layers[IncidentCategory.FIRE], 5)
+
+
 if __name__ == "__main__":
     unittest.main()
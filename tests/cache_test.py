@@ -0,0 +1,278 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import aiohttp
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from lcwc.agencies.agencyclient import AgencyClient
+from lcwc.category import IncidentCategory
+from lcwc.feed import FeedClient
+from lcwc.utils.cache import (
+    CachedResponse,
+    DiskBackend,
+    MemoryBackend,
+    ResponseCache,
+    SingleFlight,
+    cache_key,
+)
+from lcwc.utils.instrumentation import CACHE_HITS, Instrumentation
+from lcwc.utils.resilience import Resilience
+from lcwc.utils.restadapter import RestAdapter
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def read_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+class CacheKeyTest(unittest.TestCase):
+    def test_ignores_cache_busters_and_order(self):
+        a = cache_key(
+            "https://example.com/0/query?f=json",
+            {"where": "1=1", "currentTimestamp": 1},
+        )
+        b = cache_key(
+            "https://example.com/0/query",
+            {"currentTimestamp": 2, "where": "1=1", "f": "json"},
+        )
+        self.assertEqual(a, b)
+        self.assertNotEqual(
+            a, cache_key("https://example.com/1/query", {"f": "json", "where": "1=1"})
+        )
+        self.assertNotEqual(
+            a, cache_key("https://example.com/0/query?f=json", {"where": "1=1"}, "POST")
+        )
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    async def test_coalesces_concurrent_calls(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*(flight.do("key", call) for _ in range(20)))
+        self.assertEqual(results, [1] * 20)
+        self.assertEqual(len(flight), 0)
+
+        # the next call after completion starts a new one
+        self.assertEqual(await flight.do("key", call), 2)
+
+    async def test_shares_exceptions(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream")
+
+        results = await asyncio.gather(
+            *(flight.do("key", fail) for _ in range(3)), return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+    async def test_cancelled_waiter_does_not_cancel_call(self):
+        flight = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("key", call))
+        second = asyncio.ensure_future(flight.do("key", call))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, "done")
+
+
+class BackendTest(unittest.IsolatedAsyncioTestCase):
+    async def test_memory_expiry_and_eviction(self):
+        backend = MemoryBackend(max_entries=2)
+        await backend.set("a", CachedResponse(b"a"), 60)
+        await backend.set("b", CachedResponse(b"b"), 60)
+        await backend.get("a")
+        await backend.set("c", CachedResponse(b"c"), 60)
+        self.assertIsNone(await backend.get("b"))  # least recently used
+        self.assertEqual((await backend.get("a")).body, b"a")
+
+        await backend.set("d", CachedResponse(b"d"), 0)
+        self.assertIsNone(await backend.get("d"))
+
+    async def test_disk_is_shared_between_backends(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer, reader = DiskBackend(tmp), DiskBackend(tmp)
+            response = CachedResponse(
+                b"\x00body", "https://example.com", 200, "OK", {"ETag": "1"}
+            )
+            await writer.set("key", response, 60)
+            self.assertEqual(await reader.get("key"), response)
+            self.assertIsNone(await reader.get("other"))
+
+            await writer.set("expired", response, -1)
+            self.assertIsNone(await reader.get("expired"))
+            self.assertEqual(reader.clear_expired(), 1)
+            self.assertEqual(len(os.listdir(tmp)), 1)
+
+
+class ResponseCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def test_hits_and_coalescing(self):
+        cache = ResponseCache(ttl=60)
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return CachedResponse(b"body")
+
+        with Instrumentation().activate() as inst:
+            responses = await asyncio.gather(
+                *(cache.fetch("key", fetch) for _ in range(10))
+            )
+            await cache.fetch("key", fetch)
+
+        self.assertEqual(calls, 1)
+        self.assertTrue(all(r.body == b"body" for r in responses))
+        self.assertEqual(inst.count(CACHE_HITS, cache="coalesced"), 9)
+        self.assertEqual(inst.count(CACHE_HITS, cache="response"), 1)
+
+    async def test_uncacheable_and_failed_responses_are_not_stored(self):
+        cache = ResponseCache(ttl=60)
+
+        async def fetch():
+            return CachedResponse(b'{"error": {}}')
+
+        await cache.fetch("key", fetch, cacheable=lambda r: False)
+        self.assertIsNone(await cache.backend.get("key"))
+
+        async def fail():
+            raise ValueError("upstream")
+
+        with self.assertRaises(ValueError):
+            await cache.fetch("other", fail)
+        self.assertIsNone(await cache.backend.get("other"))
+
+
+class ClientCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.requests = []
+        feed = read_fixture("feed.xml")
+        arcgis = read_fixture("arcgis_0.json")
+
+        async def feed_handler(request):
+            self.requests.append(request.path)
+            return web.Response(body=feed, content_type="application/rss+xml")
+
+        async def query_handler(request):
+            self.requests.append(request.path)
+            if request.query.get("where") == "broken":
+                return web.json_response({"error": {"code": 400}})
+            return web.Response(body=arcgis, content_type="application/json")
+
+        self.agencies_status = 200
+
+        async def agencies_handler(request):
+            self.requests.append(request.path)
+            return web.Response(
+                status=self.agencies_status,
+                text="<table class='views-table'><tr><th>Agency</th></tr></table>",
+                content_type="text/html",
+            )
+
+        app = web.Application()
+        app.router.add_get("/feed.xml", feed_handler)
+        app.router.add_get("/0/query", query_handler)
+        app.router.add_get("/about/agencies-dispatched", agencies_handler)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_clients_share_responses(self):
+        cache = ResponseCache(ttl=60)
+        clients = [FeedClient(resilience=Resilience(), cache=cache) for _ in range(3)]
+        for client in clients:
+            client.URL = str(self.server.make_url("/feed.xml"))
+
+        results = await asyncio.gather(*(client.get_incidents() for client in clients))
+        results.append(await clients[0].get_incidents())
+        for client in clients:
+            await client.close()
+
+        self.assertEqual(self.requests, ["/feed.xml"])
+        self.assertTrue(all(len(r) == len(results[0]) > 0 for r in results))
+
+    async def test_rest_adapter_ignores_cache_busters(self):
+        cache = ResponseCache(ttl=60)
+        async with FeedClient() as owner:
+            session = owner._get_session()
+            adapter = RestAdapter(
+                session,
+                f"{self.server.host}:{self.server.port}",
+                resilience=Resilience(),
+                scheme="http",
+                cache=cache,
+            )
+            for timestamp in range(3):
+                result = await adapter.get(
+                    "0/query", {"where": "1=1", "currentTimestamp": timestamp}
+                )
+                self.assertIn("features", result.data)
+            self.assertEqual(len(self.requests), 1)
+
+            # a fetched body is only decoded once, even though it's checked before caching
+            with mock.patch(
+                "lcwc.utils.restadapter.json.loads", side_effect=json.loads
+            ) as loads:
+                await adapter.get("0/query", {"where": "2=2"})
+            self.assertEqual(loads.call_count, 1)
+            self.assertEqual(len(self.requests), 2)
+
+            # API errors are returned but not cached
+            for _ in range(2):
+                result = await adapter.get("0/query", {"where": "broken"})
+                self.assertIn("error", result.data)
+            self.assertEqual(len(self.requests), 4)
+
+    async def test_agency_client(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResponseCache(DiskBackend(tmp), ttl=60)
+            async with FeedClient() as owner:
+                session = owner._get_session()
+                url = str(self.server.make_url("/about/agencies-dispatched"))
+                for _ in range(2):
+                    # a fresh client each time, as in separate processes
+                    client = AgencyClient(cache)
+                    client.URL = url
+                    agencies = await client.get_agencies(
+                        session, [IncidentCategory.FIRE]
+                    )
+                    self.assertEqual(agencies, [])
+            self.assertEqual(len(self.requests), 1)
+
+    async def test_agency_error_pages_raise(self):
+        self.agencies_status = 500
+        async with FeedClient() as owner:
+            session = owner._get_session()
+            # the same with or without a cache
+            for cache in [None, ResponseCache(ttl=60)]:
+                client = AgencyClient(cache)
+                client.URL = str(self.server.make_url("/about/agencies-dispatched"))
+                with self.assertRaises(aiohttp.ClientResponseError):
+                    await client.get_agencies(session, [IncidentCategory.FIRE])
+
+
+if __name__ == "__main__":
+    unittest.main()
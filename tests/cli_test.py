@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import io
+import json
+import os
+import pstats
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+from lcwc import cli
+from lcwc.utils.compact import CompactCodec
+from lcwc.utils.encoding import iter_ndjson
+from samples import ScriptedClient, make_incidents
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+async def fake_fetch_all(clients):
+    return make_incidents()
+
+
+@mock.patch("lcwc.cli.fetch_all", fake_fetch_all)
+class CLITest(unittest.TestCase):
+    def run_cli(self, *argv) -> str:
+        out = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+        with redirect_stdout(out), redirect_stderr(io.StringIO()):
+            self.assertEqual(cli.main(list(argv)), 0)
+        out.flush()
+        return out.buffer.getvalue().decode("utf-8")
+
+    def test_fetch_formats(self):
+        table = self.run_cli("fetch", "--source", "all")
+        self.assertIn("MARTIC TOWNSHIP", table)
+        self.assertEqual(len(table.splitlines()), 3)
+
+        data = json.loads(self.run_cli("fetch", "--format", "json"))
+        self.assertEqual(data[0]["_type"], "FeedIncident")
+
+        lines = self.run_cli("fetch", "--format", "ndjson").splitlines()
+        self.assertEqual(json.loads(lines[2])["_type"], "ArcGISIncident")
+
+    def test_export(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "archive.ndjson.gz")
+            self.run_cli("export", path)
+            self.assertEqual(list(iter_ndjson(path)), make_incidents())
+
+            path = os.path.join(tmp, "archive.bin")
+            self.run_cli("export", path, "--format", "compact")
+            with open(path, "rb") as f:
+                self.assertEqual(CompactCodec().decode(f.read()), make_incidents())
+
+    def test_bench_and_profile(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            profile = os.path.join(tmp, "bench.prof")
+            output = self.run_cli(
+                "--profile", profile, "bench", "--fixtures", FIXTURES, "--number", "2"
+            )
+            self.assertIn("FeedParser", output)
+            self.assertIn("WebParser", output)
+            self.assertIn("ArcGISClient", output)
+            self.assertGreater(pstats.Stats(profile).total_calls, 0)
+
+    def test_bench_requires_fixtures(self):
+        # fixtures aren't installed with the package, so there is no default
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            cli.main(["bench"])
+
+
+class CLIPollingTest(unittest.IsolatedAsyncioTestCase):
+    async def test_fetch_all_skips_failed_sources(self):
+        clients = [
+            ScriptedClient([ValueError("down")]),
+            ScriptedClient([make_incidents()]),
+        ]
+        self.assertEqual(await cli.fetch_all(clients), make_incidents())
+
+        with self.assertRaises(ValueError):
+            await cli.fetch_all(clients[:1])
+
+    async def test_watch_polls_once_at_startup(self):
+        client = ScriptedClient([make_incidents()])
+        args = argparse.Namespace(
+            source="web", interval=30, format="table", initial=False
+        )
+        out = io.StringIO()
+        with mock.patch("lcwc.cli.create_clients", lambda source: [client]):
+            with redirect_stdout(out):
+                task = asyncio.ensure_future(cli.watch_async(args))
+                for _ in range(100):
+                    await asyncio.sleep(0.01)
+                    if client.calls:
+                        break
+                await asyncio.sleep(0.05)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+        self.assertEqual(client.calls, 1)
+        # the baseline isn't printed without --initial
+        self.assertEqual(out.getvalue(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import asyncio
+import os
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from lcwc.client import CoalescingClient
+from lcwc.feed import FeedClient
+from lcwc.utils.instrumentation import CACHE_HITS, Instrumentation
+from lcwc.utils.resilience import Resilience
+from samples import ScriptedClient, make_incidents
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class SlowClient(ScriptedClient):
+    """A scripted client whose fetches take a moment, so calls overlap"""
+
+    async def get_incidents(self, session=None, timeout: int = 10) -> list:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        poll = self.polls[min(self.calls - 1, len(self.polls) - 1)]
+        if isinstance(poll, Exception):
+            raise poll
+        return poll
+
+
+class CoalescingClientTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_calls_share_a_fetch(self):
+        incidents = make_incidents()
+        inner = SlowClient([incidents, []])
+        client = inner.coalesced()
+
+        with Instrumentation().activate() as inst:
+            results = await asyncio.gather(
+                *(client.get_incidents() for _ in range(200))
+            )
+
+        self.assertEqual(inner.calls, 1)
+        self.assertTrue(all(result == incidents for result in results))
+        # each caller gets its own list
+        results[0].clear()
+        self.assertEqual(results[1], incidents)
+        self.assertEqual(inst.count(CACHE_HITS, cache="coalesced"), 199)
+
+        # without a freshness window the next call fetches again
+        self.assertEqual(await client.get_incidents(), [])
+        self.assertEqual(inner.calls, 2)
+
+    async def test_freshness_window(self):
+        inner = SlowClient([make_incidents(), []])
+        client = CoalescingClient(inner, freshness=60)
+
+        first = await client.get_incidents()
+        self.assertEqual(await client.get_incidents(), first)
+        self.assertEqual(inner.calls, 1)
+
+        client.invalidate()
+        self.assertEqual(await client.get_incidents(), [])
+        self.assertEqual(inner.calls, 2)
+
+    async def test_arguments_are_not_shared(self):
+        inner = SlowClient([make_incidents()])
+        client = inner.coalesced(freshness=60)
+
+        await asyncio.gather(
+            client.get_incidents(timeout=5),
+            client.get_incidents(timeout=5),
+            client.get_incidents(timeout=10),
+        )
+        self.assertEqual(inner.calls, 2)
+
+    async def test_unhashable_arguments_and_expiry(self):
+        inner = SlowClient([make_incidents()])
+        inner.get_incidents = self.accept_any(inner.get_incidents)
+        client = inner.coalesced(freshness=0.05)
+
+        await asyncio.gather(
+            client.get_incidents(layers=[1, 2]), client.get_incidents(layers=[1, 2])
+        )
+        self.assertEqual(inner.calls, 1)
+        await client.get_incidents(layers={"fire": None})
+        self.assertEqual(len(client._results), 2)
+
+        # expired results are dropped when the next result is stored
+        await asyncio.sleep(0.06)
+        await client.get_incidents(layers=[3])
+        self.assertEqual(len(client._results), 1)
+
+    @staticmethod
+    def accept_any(get_incidents):
+        async def wrapper(session=None, **kwargs):
+            return await get_incidents(session)
+
+        return wrapper
+
+    async def test_diagnostics_follow_the_wrapped_client(self):
+        inner = SlowClient([make_incidents()])
+        client = inner.coalesced()
+        self.assertIsNone(client.diagnostics)
+
+        inner.diagnostics = "first"
+        await client.get_incidents()
+        self.assertEqual(client.diagnostics, "first")
+
+    async def test_failures_are_shared_but_not_kept(self):
+        inner = SlowClient([ValueError("upstream"), make_incidents()])
+        client = inner.coalesced(freshness=60)
+
+        results = await asyncio.gather(
+            *(client.get_incidents() for _ in range(3)), return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+        self.assertEqual(inner.calls, 1)
+
+        self.assertEqual(len(await client.get_incidents()), 3)
+        self.assertEqual(inner.calls, 2)
+
+    async def test_burst_against_source(self):
+        requests = 0
+        with open(os.path.join(FIXTURES, "feed.xml"), "rb") as f:
+            feed = f.read()
+
+        async def handler(request):
+            nonlocal requests
+            requests += 1
+            await asyncio.sleep(0.01)
+            return web.Response(body=feed, content_type="application/rss+xml")
+
+        app = web.Application()
+        app.router.add_get("/feed.xml", handler)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            inner = FeedClient(resilience=Resilience())
+            inner.URL = str(server.make_url("/feed.xml"))
+            async with inner.coalesced() as client:
+                self.assertEqual(client.name, inner.name)
+                results = await asyncio.gather(
+                    *(client.get_incidents() for _ in range(200))
+                )
+        finally:
+            await server.close()
+
+        self.assertEqual(requests, 1)
+        self.assertTrue(all(len(r) == len(results[0]) > 0 for r in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
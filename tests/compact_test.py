@@ -0,0 +1,66 @@
+import datetime
+import unittest
+
+from lcwc.category import IncidentCategory
+from lcwc.utils import encoding
+from lcwc.utils.compact import CodecException, CompactCodec
+from lcwc.web import WebIncident
+from samples import make_incidents
+
+
+class CompactCodecTest(unittest.TestCase):
+    def setUp(self):
+        self.codec = CompactCodec()
+
+    def test_round_trip(self):
+        incidents = make_incidents()
+        decoded = self.codec.decode(self.codec.encode(incidents))
+
+        self.assertEqual([type(i) for i in decoded], [type(i) for i in incidents])
+        self.assertEqual(decoded, incidents)
+
+    def test_unit_fields(self):
+        incidents = make_incidents()
+        decoded = self.codec.decode(self.codec.encode(incidents))
+
+        for original, unit in zip(incidents[0].units, decoded[0].units):
+            self.assertEqual(unit.__dict__, original.__dict__)
+            # agencies are restored from the resolver rather than embedded
+            self.assertIs(unit.agency, original.agency)
+
+    def test_edge_values(self):
+        incident = WebIncident(
+            IncidentCategory.UNKNOWN,
+            datetime.datetime(1969, 12, 31, 23, 59, 59, 999999),
+            "ÉMERGENCY",
+            "",
+            None,
+            [],
+        )
+        decoded = self.codec.decode(self.codec.encode([incident]))
+        self.assertEqual(decoded, [incident])
+        self.assertIsNone(decoded[0].date.tzinfo)
+
+    def test_version_2(self):
+        # snapshots without ArcGIS incidents are unchanged since version 2
+        incidents = make_incidents()[:2]
+        data = bytearray(self.codec.encode(incidents))
+        data[4] = 2
+        self.assertEqual(self.codec.decode(bytes(data)), incidents)
+
+    def test_smaller_than_json(self):
+        incidents = make_incidents() * 50
+        self.assertLess(
+            len(self.codec.encode(incidents)), len(encoding.dumps_many(incidents)) / 3
+        )
+
+    def test_corrupt(self):
+        data = self.codec.encode(make_incidents())
+        with self.assertRaises(CodecException):
+            self.codec.decode(data[:-10])
+        with self.assertRaises(CodecException):
+            self.codec.decode(b"JSON" + data[4:])
+
+
+if __name__ == "__main__":
+    unittest.main()
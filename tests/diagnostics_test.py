@@ -0,0 +1,124 @@
+import copy
+import datetime
+import json
+import os
+import time
+import unittest
+
+from lcwc.agencies.agencyresolver import AgencyResolver
+from lcwc.agencies.exceptions import OutOfCountyException
+from lcwc.arcgis import ArcGISClient
+from lcwc.category import IncidentCategory
+from lcwc.feed import FeedParser
+from lcwc.poller import Poller
+from lcwc.utils.diagnostics import (
+    INVALID_FEATURE,
+    OUT_OF_COUNTY,
+    UNPARSEABLE,
+    ParseDiagnostics,
+)
+from lcwc.utils.instrumentation import PARSE_FAILURES, Instrumentation
+from lcwc.web import WebParser
+from samples import ScriptedClient, make_incidents
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def read_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+class ParseDiagnosticsTest(unittest.TestCase):
+    def test_counts_and_samples(self):
+        diagnostics = ParseDiagnostics("test", max_samples=2)
+        for i in range(5):
+            diagnostics.record(UNPARSEABLE, f"BAD{i}")
+        diagnostics.record_exception(OutOfCountyException(), "AMB891CHE")
+        diagnostics.parsed = 4
+
+        self.assertTrue(diagnostics)
+        self.assertEqual(diagnostics.counts, {UNPARSEABLE: 5, OUT_OF_COUNTY: 1})
+        self.assertEqual(diagnostics.samples[UNPARSEABLE], ["BAD0", "BAD1"])
+        self.assertEqual(diagnostics.failures, 6)
+        self.assertAlmostEqual(diagnostics.failure_rate, 0.6)
+        self.assertEqual(diagnostics.to_dict()["counts"][OUT_OF_COUNTY], 1)
+
+    def test_merge(self):
+        a = ParseDiagnostics("test", max_samples=3)
+        a.record(UNPARSEABLE, "A")
+        b = ParseDiagnostics("test")
+        for raw in ["B", "C", "D"]:
+            b.record(UNPARSEABLE, raw)
+        b.parsed = 2
+
+        a.merge(b)
+        self.assertEqual(a.counts[UNPARSEABLE], 4)
+        self.assertEqual(a.samples[UNPARSEABLE], ["A", "B", "C"])
+        self.assertEqual(a.parsed, 2)
+        self.assertFalse(ParseDiagnostics())
+
+    def test_feed_parser(self):
+        feed = read_fixture("feed.xml").replace(b"CHIEF 6", b"ENGINE ???")
+        parser = FeedParser()
+        with Instrumentation().activate() as inst:
+            incidents = parser.parse(feed, AgencyResolver())
+
+        self.assertEqual(len(incidents), 6)
+        self.assertEqual(parser.diagnostics.counts, {UNPARSEABLE: 1})
+        self.assertEqual(parser.diagnostics.samples[UNPARSEABLE], ["ENGINE ???"])
+        self.assertEqual(
+            parser.diagnostics.parsed, sum(len(i.units) for i in incidents)
+        )
+        self.assertEqual(inst.count(PARSE_FAILURES, reason=UNPARSEABLE), 1)
+
+    def test_arcgis_degrades_per_unit(self):
+        features = json.loads(read_fixture("arcgis_0.json"))["features"]
+        features = copy.deepcopy(features)
+        features[0]["attributes"]["CurrentUnits"] = "ENG531,???,"
+        del features[1]["attributes"]["IncidentOrigination"]
+
+        client = ArcGISClient(AgencyResolver())
+        incidents = client.parse_features(IncidentCategory.FIRE, features)
+
+        self.assertEqual(len(incidents), len(features) - 1)
+        self.assertEqual([u.full_name for u in incidents[0].units], ["ENG531"])
+        self.assertEqual(
+            client.diagnostics.counts, {UNPARSEABLE: 1, INVALID_FEATURE: 1}
+        )
+        self.assertEqual(client.diagnostics.samples[UNPARSEABLE], ["???"])
+
+    def test_ambiguous_dates_are_recorded(self):
+        # 1:30 AM happens twice when the clocks go back
+        ambiguous = datetime.datetime(2023, 11, 5, 1, 30)
+        features = json.loads(read_fixture("arcgis_0.json"))["features"]
+        features = copy.deepcopy(features)
+        features[0]["attributes"]["IncidentOrigination"] = (
+            time.mktime(ambiguous.timetuple()) * 1000
+        )
+
+        client = ArcGISClient(AgencyResolver())
+        incidents = client.parse_features(IncidentCategory.FIRE, features)
+        self.assertEqual(len(incidents), len(features) - 1)
+        self.assertEqual(client.diagnostics.counts, {INVALID_FEATURE: 1})
+
+        html = read_fixture("web.html").decode("utf-8")
+        html = html.replace("Wed, Jan 25, 2023 10:18", "Sun, Nov 05, 2023 01:30", 1)
+        parser = WebParser()
+        incidents = parser.parse(html, AgencyResolver())
+        self.assertEqual(len(incidents), 4)
+        self.assertEqual(parser.diagnostics.counts[INVALID_FEATURE], 1)
+
+
+class PollResultDiagnosticsTest(unittest.IsolatedAsyncioTestCase):
+    async def test_poll_result_carries_diagnostics(self):
+        client = ScriptedClient([make_incidents()])
+        client.diagnostics = ParseDiagnostics(client.name)
+        client.diagnostics.record(UNPARSEABLE, "???")
+
+        result = await Poller(client).poll_once()
+        self.assertIs(result.diagnostics, client.diagnostics)
+
+
+if __name__ == "__main__":
+    unittest.main()
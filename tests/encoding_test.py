@@ -0,0 +1,115 @@
+import asyncio
+import datetime
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from lcwc.arcgis import ArcGISIncident
+from lcwc.feed import FeedIncident
+from lcwc.utils import encoding
+from lcwc.utils.encoding import IncidentDecoder, IncidentEncoder
+from lcwc.web import WebIncident
+from samples import make_incidents
+
+
+class EncodingTest(unittest.TestCase):
+    def test_dict_round_trip(self):
+        for incident in make_incidents():
+            d = incident.to_dict()
+            # the dictionary must be plain JSON
+            json.dumps(d)
+            self.assertEqual(type(incident).from_dict(d), incident)
+
+    def test_unit_agency_round_trip(self):
+        incident = make_incidents()[0]
+        unit = incident.units[0]
+        self.assertIsNotNone(unit.agency)
+
+        decoded = type(incident).from_dict(incident.to_dict()).units[0]
+        self.assertEqual(decoded.agency, unit.agency)
+        self.assertEqual(decoded.station_id, unit.station_id)
+
+    def test_dumps_many(self):
+        incidents = make_incidents()
+        for incident_type in (FeedIncident, WebIncident, ArcGISIncident):
+            subset = [i for i in incidents if type(i) is incident_type]
+            data = encoding.dumps_many(subset)
+            self.assertIsInstance(data, bytes)
+            self.assertEqual(encoding.loads_many(data, incident_type), subset)
+
+    def test_dumps(self):
+        incident = make_incidents()[2]
+        decoded = encoding.loads(encoding.dumps(incident), ArcGISIncident)
+        self.assertEqual(decoded, incident)
+        self.assertEqual(decoded.coordinates, incident.coordinates)
+
+    def test_json_encoder_compatibility(self):
+        incident = make_incidents()[0]
+        s = json.dumps(incident, cls=IncidentEncoder)
+        self.assertEqual(json.loads(s), json.loads(encoding.dumps(incident)))
+        self.assertEqual(IncidentDecoder().decode(s, FeedIncident), incident)
+
+    def test_json_loads_protocol(self):
+        incident = make_incidents()[2]
+        s = json.dumps(incident, cls=IncidentEncoder)
+        decoded = json.loads(s, cls=IncidentDecoder, incident_type=ArcGISIncident)
+        self.assertEqual(decoded, incident)
+
+
+class NDJSONTest(unittest.TestCase):
+    def test_stream_round_trip(self):
+        incidents = make_incidents()
+        buffer = io.BytesIO()
+        self.assertEqual(encoding.dump_ndjson(iter(incidents), buffer), 3)
+        self.assertEqual(buffer.getvalue().count(b"\n"), 3)
+
+        buffer.seek(0)
+        decoded = list(encoding.iter_ndjson(buffer))
+        self.assertEqual([type(i) for i in decoded], [type(i) for i in incidents])
+        self.assertEqual(decoded, incidents)
+
+    def test_gzip_path(self):
+        incidents = make_incidents()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "history.ndjson.gz")
+            with encoding.NDJSONWriter(path) as writer:
+                for incident in incidents * 10:
+                    writer.write(incident)
+                self.assertEqual(writer.count, 30)
+
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(2), encoding.GZIP_MAGIC)
+
+            self.assertEqual(list(encoding.iter_ndjson(path)), incidents * 10)
+
+    def test_gzip_file_object(self):
+        incidents = make_incidents()
+        buffer = io.BytesIO()
+        encoding.dump_ndjson(incidents, buffer, compress=True)
+        self.assertFalse(buffer.closed)
+
+        buffer.seek(0)
+        self.assertEqual(list(encoding.iter_ndjson(buffer, compress=True)), incidents)
+
+    def test_async_reader(self):
+        incidents = make_incidents()
+        buffer = io.BytesIO()
+        encoding.dump_ndjson(incidents, buffer)
+
+        async def read():
+            reader = asyncio.StreamReader()
+            reader.feed_data(buffer.getvalue())
+            reader.feed_eof()
+            return [i async for i in encoding.aiter_ndjson(reader)]
+
+        self.assertEqual(asyncio.run(read()), incidents)
+
+    def test_unknown_type(self):
+        with self.assertRaises(ValueError):
+            encoding.from_tagged_dict({"_type": "Nope"})
+
+
+if __name__ == "__main__":
+    unittest.main()
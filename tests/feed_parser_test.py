@@ -0,0 +1,44 @@
+import os
+import unittest
+
+from lcwc.agencies.agencyresolver import AgencyResolver
+from lcwc.feed import FeedParser
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class FeedParserTest(unittest.TestCase):
+    def setUp(self) -> None:
+        with open(os.path.join(FIXTURES, "feed.xml"), "rb") as f:
+            self.feed = f.read()
+        self.resolver = AgencyResolver()
+
+    def test_parity_with_feedparser(self):
+        fast = FeedParser()
+        slow = FeedParser(fast=False)
+
+        self.assertEqual(fast.read_entries(self.feed), slow.read_entries(self.feed))
+
+        expected = [i.to_dict() for i in slow.parse(self.feed, self.resolver)]
+        actual = [i.to_dict() for i in fast.parse(self.feed, self.resolver)]
+        self.assertEqual(len(actual), 6)
+        self.assertEqual(actual, expected)
+
+    def test_str_contents(self):
+        entries = FeedParser().read_entries(self.feed.decode("utf-8"))
+        self.assertEqual(len(entries), 6)
+
+    def test_malformed_feed_falls_back(self):
+        # cut off in the middle of the third item
+        truncated = self.feed[: self.feed.index(b"<item>", 1000) + 40]
+
+        with self.assertLogs("lcwc.feed.parser", "WARNING"):
+            entries = FeedParser().read_entries(truncated)
+        self.assertEqual(
+            [e.guid for e in entries[:2]],
+            [e.guid for e in FeedParser(fast=False).read_entries(self.feed)[:2]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
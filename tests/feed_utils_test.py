@@ -0,0 +1,60 @@
+import unittest
+
+from lcwc.category import IncidentCategory
+from lcwc.feed.utils import (
+    CLASSIFIER,
+    KeywordClassifier,
+    SegmentKind,
+    determine_category,
+)
+
+
+class KeywordClassifierTest(unittest.TestCase):
+    def test_classify_segment(self):
+        cases = {
+            " BRIDGE VALLEY RD & LAKE ALDRED TER": SegmentKind.LOCATION,
+            " MEDIC 56-1": SegmentKind.UNITS,
+            " ENGINE 6-1<br />TRUCK 6<br />CHIEF 6": SegmentKind.UNITS,
+            # location keywords match anywhere, unit keywords only as whole words
+            " EAST ENGINEERING": SegmentKind.LOCATION,
+            " ": SegmentKind.OTHER,
+            " FIRE POLICE 6": SegmentKind.UNITS,
+        }
+        for segment, kind in cases.items():
+            with self.subTest(segment=segment):
+                self.assertIs(CLASSIFIER.classify_segment(segment), kind)
+                self.assertEqual(
+                    CLASSIFIER.has_unit_names(segment), kind is SegmentKind.UNITS
+                )
+
+        self.assertTrue(CLASSIFIER.has_intersection("FRUITVILLE PIKE; MEDIC 6"))
+        self.assertTrue(CLASSIFIER.has_unit_names("FRUITVILLE PIKE; MEDIC 6"))
+
+    def test_determine_category(self):
+        cases = [
+            ("FIRE ALARM", ["ENGINE 6-1"], IncidentCategory.FIRE),
+            ("MEDICAL EMERGENCY", ["MEDIC 56-1"], IncidentCategory.MEDICAL),
+            # a fire unit wins over a medical unit in the same name
+            ("ASSIST", ["AMB RESCUE 2"], IncidentCategory.FIRE),
+            ("VEHICLE ACCIDENT-NO INJURIES", [], IncidentCategory.TRAFFIC),
+            ("VEHICLE FIRE", ["UNKNOWN 1"], IncidentCategory.FIRE),
+            ("MEDICAL EMERGENCY", [], IncidentCategory.MEDICAL),
+            ("NATURAL GAS ISSUE", [], IncidentCategory.UNKNOWN),
+        ]
+        for description, units, category in cases:
+            with self.subTest(description=description, units=units):
+                self.assertIs(determine_category(description, units), category)
+
+    def test_custom_keywords(self):
+        classifier = KeywordClassifier(fire_units=["TANKER"], locations=["HWY"])
+        self.assertIs(classifier.classify_segment(" TANKER 5"), SegmentKind.UNITS)
+        self.assertIs(classifier.classify_segment(" ENGINE 5"), SegmentKind.OTHER)
+        self.assertIs(classifier.classify_segment(" US HWY 30"), SegmentKind.LOCATION)
+        self.assertIs(
+            classifier.determine_category("ALARM", ["TANKER 5"]),
+            IncidentCategory.FIRE,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+from lcwc.arcgis.incident import ArcGISIncident, Coordinates
+from lcwc.category import IncidentCategory
+from lcwc.delta import IncidentDelta
+from lcwc.feed.incident import FeedIncident
+from lcwc.geocode import Gazetteer
+from lcwc.poller import PollResult
+
+DATE = datetime.datetime(2024, 1, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+def make_arcgis(number, municipality, intersection, longitude, latitude):
+    return ArcGISIncident(
+        IncidentCategory.FIRE,
+        DATE,
+        "BUILDING FIRE",
+        municipality,
+        intersection,
+        [],
+        number,
+        1,
+        "53",
+        True,
+        Coordinates(longitude, latitude),
+    )
+
+
+def make_feed(municipality, intersection):
+    return FeedIncident(
+        IncidentCategory.FIRE,
+        DATE,
+        "BUILDING FIRE",
+        municipality,
+        intersection,
+        [],
+        "guid",
+    )
+
+
+class GazetteerTest(unittest.TestCase):
+    def setUp(self):
+        self.gazetteer = Gazetteer()
+        self.gazetteer.learn_many(
+            [
+                make_arcgis(
+                    1,
+                    "EAST HEMPFIELD TOWNSHIP",
+                    "CENTERVILLE RD & STATE RD",
+                    -76.0,
+                    40.0,
+                ),
+                make_arcgis(
+                    2,
+                    "EAST HEMPFIELD TOWNSHIP",
+                    "CENTERVILLE RD & STATE RD",
+                    -76.2,
+                    40.2,
+                ),
+                make_arcgis(3, "LANCASTER CITY", "N DUKE ST & E KING ST", -76.3, 40.03),
+            ]
+        )
+
+    def test_exact_lookup_across_abbreviations(self):
+        coordinates = self.gazetteer.geocode(
+            make_feed("E HEMPFIELD TWP", "STATE ROAD / CENTERVILLE ROAD")
+        )
+        self.assertAlmostEqual(coordinates.longitude, -76.1)
+        self.assertAlmostEqual(coordinates.latitude, 40.1)
+        self.assertEqual(len(self.gazetteer), 2)
+
+    def test_token_fallback(self):
+        coordinates = self.gazetteer.geocode(
+            make_feed("LANCASTER CITY", "E KING ST & N QUEEN ST")
+        )
+        self.assertIsNone(coordinates)
+
+        coordinates = self.gazetteer.geocode(
+            make_feed("LANCASTER CITY", "DUKE ST & KING ST")
+        )
+        self.assertEqual(coordinates, Coordinates(-76.3, 40.03))
+
+    def test_unknown(self):
+        self.assertIsNone(self.gazetteer.geocode(make_feed("LANCASTER CITY", None)))
+        # fallback never crosses municipalities
+        self.assertIsNone(
+            self.gazetteer.geocode(
+                make_feed("MANHEIM TOWNSHIP", "N DUKE ST & E KING ST")
+            )
+        )
+
+    def test_arcgis_keeps_its_coordinates(self):
+        incident = make_arcgis(4, "LANCASTER CITY", "N DUKE ST & E KING ST", -1.0, 1.0)
+        self.assertEqual(self.gazetteer.geocode(incident), Coordinates(-1.0, 1.0))
+
+    def test_update_learns_updated_incidents(self):
+        gazetteer = Gazetteer()
+        added = make_arcgis(4, "MANHEIM TOWNSHIP", "FRUITVILLE PK", -76.3, 40.1)
+        updated = make_arcgis(5, "MANOR TOWNSHIP", "BLUE ROCK RD", -76.4, 40.0)
+        delta = IncidentDelta(added=[added], updated=[updated])
+        gazetteer.update(PollResult(None, DATE, [added, updated], delta))
+
+        self.assertEqual(
+            gazetteer.lookup("MANOR TWP", "BLUE ROCK RD"), Coordinates(-76.4, 40.0)
+        )
+        self.assertIsNotNone(gazetteer.lookup("MANHEIM TWP", "FRUITVILLE PIKE"))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "gazetteer.json")
+            self.assertTrue(self.gazetteer.dirty)
+            self.gazetteer.save(path)
+            self.assertFalse(self.gazetteer.dirty)
+
+            loaded = Gazetteer.load(path)
+            self.assertEqual(len(loaded), 2)
+            self.assertIn(("E HEMPFIELD TWP", "STATE RD & CENTERVILLE RD"), loaded)
+            coordinates = loaded.lookup("LANCASTER CITY", "DUKE ST & KING ST")
+            self.assertEqual(coordinates, Coordinates(-76.3, 40.03))
+
+            # sightings are kept, so learning after a reload averages correctly
+            loaded.learn(
+                make_arcgis(
+                    5,
+                    "EAST HEMPFIELD TOWNSHIP",
+                    "CENTERVILLE RD & STATE RD",
+                    -76.4,
+                    40.4,
+                )
+            )
+            coordinates = loaded.lookup(
+                "EAST HEMPFIELD TOWNSHIP", "CENTERVILLE RD & STATE RD"
+            )
+            self.assertAlmostEqual(coordinates.longitude, -76.2)
+
+            self.assertEqual(len(Gazetteer.load(os.path.join(tmp, "missing"))), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
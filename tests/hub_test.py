@@ -0,0 +1,111 @@
+import asyncio
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+from lcwc.category import IncidentCategory
+from lcwc.hub import BackpressurePolicy, IncidentHub
+from lcwc.poller import Poller
+from lcwc.utils.diagnostics import UNPARSEABLE, ParseDiagnostics
+from samples import ScriptedClient, make_incidents
+
+
+class HubTest(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.feed, self.web, self.arcgis = make_incidents()
+
+    async def test_fan_out_and_filters(self):
+        client = ScriptedClient([[self.feed], [self.feed, self.web, self.arcgis]])
+        poller = Poller(client)
+        hub = IncidentHub(poller)
+
+        everything = hub.subscribe()
+        fire = hub.subscribe(categories=[IncidentCategory.FIRE])
+        martic = hub.subscribe(municipalities=["martic township"])
+
+        await poller.poll_once()
+        await poller.poll_once()
+
+        first = await everything.get()
+        second = await everything.get()
+        self.assertEqual(first.delta.added, [self.feed])
+        self.assertEqual(second.delta.added, [self.web, self.arcgis])
+
+        # the fire subscriber never saw the medical-only update
+        update = await fire.get()
+        self.assertEqual(update.delta.added, [self.web])
+        self.assertEqual(update.incidents, [self.web])
+        self.assertEqual(fire.pending, 0)
+
+        update = await martic.get()
+        self.assertEqual(update.delta.added, [self.feed])
+        self.assertEqual(martic.pending, 0)
+
+    async def test_drop_oldest(self):
+        client = ScriptedClient([[self.feed], [self.web], [self.arcgis]])
+        poller = Poller(client)
+        hub = IncidentHub(poller)
+        subscription = hub.subscribe(maxsize=2)
+
+        for _ in range(3):
+            await poller.poll_once()
+
+        self.assertEqual(subscription.stats.dropped, 1)
+        self.assertEqual((await subscription.get()).incidents, [self.web])
+        self.assertEqual((await subscription.get()).incidents, [self.arcgis])
+
+    async def test_coalesce(self):
+        client = ScriptedClient([[self.feed], [self.web], [self.web, self.arcgis]])
+        poller = Poller(client)
+        hub = IncidentHub(poller)
+        subscription = hub.subscribe(maxsize=1, policy=BackpressurePolicy.COALESCE)
+
+        for _ in range(3):
+            await poller.poll_once()
+
+        self.assertEqual(subscription.pending, 1)
+        self.assertEqual(subscription.stats.coalesced, 2)
+
+        # the feed incident was added and removed in between, so it nets out
+        update = await subscription.get()
+        self.assertEqual(update.delta.added, [self.web, self.arcgis])
+        self.assertEqual(update.delta.removed, [])
+        self.assertEqual(update.incidents, [self.web, self.arcgis])
+
+    async def test_keeps_diagnostics(self):
+        client = ScriptedClient([[self.feed], [self.web], [self.web, self.arcgis]])
+        client.diagnostics = ParseDiagnostics(client.name)
+        client.diagnostics.record(UNPARSEABLE, "???")
+        poller = Poller(client)
+        hub = IncidentHub(poller)
+        fire = hub.subscribe(categories=[IncidentCategory.FIRE])
+        coalesced = hub.subscribe(maxsize=1, policy=BackpressurePolicy.COALESCE)
+
+        for _ in range(3):
+            await poller.poll_once()
+
+        self.assertIs((await fire.get()).diagnostics, client.diagnostics)
+        self.assertIs((await coalesced.get()).diagnostics, client.diagnostics)
+
+    async def test_iterate_and_close(self):
+        client = ScriptedClient([[self.feed]])
+        poller = Poller(client)
+        hub = IncidentHub(poller)
+        subscription = hub.subscribe()
+
+        async def consume():
+            return [result async for result in subscription]
+
+        task = asyncio.ensure_future(consume())
+        await poller.poll_once()
+        await asyncio.sleep(0)
+        hub.close()
+
+        results = await task
+        self.assertEqual(len(results), 1)
+        self.assertEqual(hub.subscriptions, [])
+        self.assertEqual(subscription.stats.delivered, 1)
+        self.assertGreaterEqual(subscription.stats.max_lag, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
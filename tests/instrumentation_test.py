@@ -0,0 +1,211 @@
+import json
+import os
+import unittest
+from unittest import mock
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from lcwc.agencies.agencyresolver import AgencyResolver
+from lcwc.arcgis import ArcGISClient
+from lcwc.category import IncidentCategory
+from lcwc.feed import FeedClient, FeedParser
+from lcwc.utils import instrumentation
+from lcwc.utils.instrumentation import (
+    DECODE,
+    FETCH,
+    PARSE,
+    PARSE_FAILURES,
+    RESOLVE,
+    UNITS_PARSED,
+    Instrumentation,
+    OpenTelemetryListener,
+    PrometheusListener,
+)
+from lcwc.utils.resilience import Resilience
+from lcwc.web import WebParser
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def read_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+class RecordingListener:
+    def __init__(self) -> None:
+        self.spans = []
+        self.counts = []
+
+    def on_span(self, stage: str, duration: float, labels: dict) -> None:
+        self.spans.append((stage, labels.get("source")))
+
+    def on_count(self, name: str, value: int, labels: dict) -> None:
+        self.counts.append((name, value, labels))
+
+
+class InstrumentationTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.resolver = AgencyResolver()
+
+    def test_inactive_is_noop(self):
+        self.assertIsNone(instrumentation.current())
+        with instrumentation.span(PARSE, source="test"):
+            pass
+        instrumentation.increment(UNITS_PARSED, 5)
+
+    def test_inactive_parsers_skip_timing(self):
+        for module, parse in [
+            (
+                "lcwc.feed.parser",
+                lambda: FeedParser().parse(read_fixture("feed.xml"), self.resolver),
+            ),
+            (
+                "lcwc.web.parser",
+                lambda: WebParser().parse(read_fixture("web.html"), self.resolver),
+            ),
+        ]:
+            with self.subTest(module=module):
+                with mock.patch(f"{module}.time.perf_counter") as perf_counter:
+                    self.assertTrue(parse())
+                perf_counter.assert_not_called()
+
+    def test_parsers(self):
+        listener = RecordingListener()
+        with Instrumentation([listener]).activate() as inst:
+            feed = FeedParser().parse(read_fixture("feed.xml"), self.resolver)
+            web_incidents = WebParser().parse(read_fixture("web.html"), self.resolver)
+
+        for source in ["FeedClient", "WebClient"]:
+            self.assertEqual(inst.stages[(DECODE, source)].count, 1)
+            self.assertEqual(inst.stages[(RESOLVE, source)].count, 1)
+
+        self.assertEqual(
+            inst.count(UNITS_PARSED, source="FeedClient"),
+            sum(len(i.units) for i in feed),
+        )
+        self.assertEqual(
+            inst.count(UNITS_PARSED, source="WebClient"),
+            sum(len(i.units) for i in web_incidents),
+        )
+        self.assertEqual(
+            inst.count(UNITS_PARSED),
+            inst.count(UNITS_PARSED, source="FeedClient")
+            + inst.count(UNITS_PARSED, source="WebClient"),
+        )
+        self.assertEqual(
+            inst.count(PARSE_FAILURES),
+            sum(n for name, n, _ in listener.counts if name == PARSE_FAILURES),
+        )
+        self.assertIn((DECODE, "FeedClient"), listener.spans)
+        self.assertIsNone(instrumentation.current())
+
+    def test_arcgis_parse_features(self):
+        client = ArcGISClient(self.resolver)
+        with Instrumentation().activate() as inst:
+            incidents = []
+            for layer, category in enumerate(
+                [
+                    IncidentCategory.FIRE,
+                    IncidentCategory.MEDICAL,
+                    IncidentCategory.TRAFFIC,
+                ]
+            ):
+                data = json.loads(read_fixture(f"arcgis_{layer}.json"))
+                incidents.extend(client.parse_features(category, data["features"]))
+
+        self.assertEqual(
+            inst.count(UNITS_PARSED, source=client.name),
+            sum(len(i.units) for i in incidents),
+        )
+        self.assertGreater(inst.stages[(RESOLVE, client.name)].count, 0)
+
+    def test_global_instrumentation(self):
+        inst = Instrumentation()
+        instrumentation.set_instrumentation(inst)
+        try:
+            instrumentation.increment(UNITS_PARSED, 2, source="test")
+        finally:
+            instrumentation.set_instrumentation(None)
+        self.assertEqual(inst.count(UNITS_PARSED), 2)
+
+    def test_stage_stats(self):
+        inst = Instrumentation()
+        inst.record_span(PARSE, 0.2, source="test")
+        inst.record_span(PARSE, 0.4, source="test")
+        stats = inst.stages[(PARSE, "test")]
+        self.assertEqual(stats.count, 2)
+        self.assertAlmostEqual(stats.mean, 0.3)
+        self.assertAlmostEqual(stats.max, 0.4)
+
+    def test_prometheus_listeners_share_metrics(self):
+        first = PrometheusListener(namespace="lcwc_test")
+        if not first.enabled:
+            self.skipTest("prometheus_client is not installed")
+        # a second listener on the same registry must not register the metrics again
+        second = PrometheusListener(namespace="lcwc_test")
+        self.assertIs(first.events, second.events)
+        second.on_count(UNITS_PARSED, 1, {"source": "test"})
+
+    def test_exporters_are_optional(self):
+        # both listeners must be safe to register whether or not their library is installed
+        for listener in [PrometheusListener(), OpenTelemetryListener()]:
+            if not listener.enabled:
+                listener.on_span(PARSE, 0.1, {"source": "test"})
+                listener.on_count(UNITS_PARSED, 1, {"source": "test"})
+
+
+class FetchInstrumentationTest(unittest.IsolatedAsyncioTestCase):
+    async def test_fetch_and_parse_spans(self):
+        feed = read_fixture("feed.xml")
+
+        async def handler(request):
+            return web.Response(body=feed, content_type="application/rss+xml")
+
+        app = web.Application()
+        app.router.add_get("/feed.xml", handler)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            async with FeedClient(resilience=Resilience()) as client:
+                client.URL = str(server.make_url("/feed.xml"))
+                with Instrumentation().activate() as inst:
+                    await client.get_incidents()
+        finally:
+            await server.close()
+
+        self.assertEqual(inst.stages[(FETCH, client.name)].count, 1)
+        self.assertEqual(inst.stages[(PARSE, client.name)].count, 1)
+        self.assertGreater(inst.count(UNITS_PARSED), 0)
+
+    async def test_arcgis_spans_share_the_client_name(self):
+        layers = [read_fixture(f"arcgis_{layer}.json") for layer in range(3)]
+
+        async def handler(request):
+            layer = int(request.match_info["layer"])
+            return web.Response(body=layers[layer], content_type="application/json")
+
+        app = web.Application()
+        app.router.add_get("/{layer}/query", handler)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            async with ArcGISClient(
+                resilience=Resilience(),
+                hostname=f"{server.host}:{server.port}",
+                base="",
+                scheme="http",
+            ) as client:
+                with Instrumentation().activate() as inst:
+                    await client.get_incidents()
+        finally:
+            await server.close()
+
+        # the decode span is labelled like the client's other stages, not by hostname
+        self.assertEqual(inst.stages[(DECODE, client.name)].count, 3)
+        self.assertEqual({source for _, source in inst.stages}, {client.name})
+
+
+if __name__ == "__main__":
+    unittest.main()
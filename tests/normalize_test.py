@@ -0,0 +1,116 @@
+import datetime
+import unittest
+
+from lcwc.category import IncidentCategory
+from lcwc.feed.incident import FeedIncident
+from lcwc.incident import fingerprint
+from lcwc.normalize import (
+    canonical_intersection,
+    canonical_municipality,
+    canonical_street,
+    clear_caches,
+    collapse_whitespace,
+    location_key,
+)
+from lcwc.utils import is_related_incident
+
+
+class NormalizeTest(unittest.TestCase):
+    def setUp(self):
+        clear_caches()
+
+    def test_collapse_whitespace(self):
+        self.assertEqual(
+            collapse_whitespace("  N DUKE ST \t&  E KING ST "), "N DUKE ST & E KING ST"
+        )
+
+    def test_municipality(self):
+        self.assertEqual(
+            canonical_municipality("E hempfield twp"), "EAST HEMPFIELD TOWNSHIP"
+        )
+        self.assertEqual(
+            canonical_municipality("EAST HEMPFIELD TOWNSHIP"), "EAST HEMPFIELD TOWNSHIP"
+        )
+        self.assertEqual(canonical_municipality("MT JOY BORO"), "MOUNT JOY BOROUGH")
+        self.assertIsNone(canonical_municipality(None))
+        self.assertIsNone(canonical_municipality("  "))
+
+    def test_street(self):
+        self.assertEqual(canonical_street("N DUKE ST."), "NORTH DUKE STREET")
+        self.assertEqual(
+            canonical_street("OLD PHILADELPHIA PK"), "OLD PHILADELPHIA PIKE"
+        )
+
+    def test_intersection_order_and_separators(self):
+        expected = "EAST KING STREET & NORTH DUKE STREET"
+        self.assertEqual(canonical_intersection("N DUKE ST & E KING ST"), expected)
+        self.assertEqual(canonical_intersection("E KING ST / N DUKE ST"), expected)
+        self.assertEqual(canonical_intersection("e king st and  n duke st"), expected)
+        self.assertEqual(
+            canonical_intersection("100 BLOCK N DUKE ST"), "100 BLOCK NORTH DUKE STREET"
+        )
+        self.assertIsNone(canonical_intersection(None))
+        self.assertIsNone(canonical_intersection(""))
+
+    def test_cached(self):
+        canonical_intersection("N DUKE ST & E KING ST")
+        canonical_intersection("N DUKE ST & E KING ST")
+        self.assertEqual(canonical_intersection.cache_info().hits, 1)
+
+    def test_location_key(self):
+        incident = FeedIncident(
+            IncidentCategory.FIRE,
+            datetime.datetime(2024, 1, 1, 12, 0, tzinfo=datetime.timezone.utc),
+            "BUILDING FIRE",
+            "LANCASTER CITY",
+            "N DUKE ST & E KING ST",
+            [],
+            "guid",
+        )
+        self.assertEqual(
+            location_key(incident),
+            ("LANCASTER CITY", "EAST KING STREET & NORTH DUKE STREET"),
+        )
+
+    def test_related_incident_abbreviations(self):
+        date = datetime.datetime(2024, 1, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+        def make(intersection):
+            return FeedIncident(
+                IncidentCategory.FIRE,
+                date,
+                "BUILDING FIRE",
+                "LANCASTER CITY",
+                intersection,
+                [],
+                "guid",
+            )
+
+        delta = datetime.timedelta(minutes=5)
+        a = make("N DUKE ST & E KING ST")
+        self.assertTrue(
+            is_related_incident(a, make("EAST KING STREET / NORTH DUKE STREET"), delta)
+        )
+        self.assertFalse(is_related_incident(a, make("N QUEEN ST & E KING ST"), delta))
+        self.assertFalse(is_related_incident(make(None), make(None), delta))
+
+    def test_fingerprint_abbreviations(self):
+        date = datetime.datetime(2024, 1, 1, 12, 0, tzinfo=datetime.timezone.utc)
+        self.assertEqual(
+            fingerprint(
+                IncidentCategory.FIRE,
+                date,
+                "E HEMPFIELD TWP",
+                "STATE RD & CENTERVILLE RD",
+            ),
+            fingerprint(
+                IncidentCategory.FIRE,
+                date,
+                "EAST HEMPFIELD TOWNSHIP",
+                "CENTERVILLE ROAD & STATE ROAD",
+            ),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import datetime
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+from lcwc.arcgis import ArcGISClient
+from lcwc.delta import diff_incidents
+from lcwc.feed import FeedClient
+from lcwc.poller import Poller
+from lcwc.web import WebClient
+from samples import ScriptedClient, make_incidents
+
+
+class DeltaTest(unittest.TestCase):
+    def test_diff(self):
+        feed, web, arcgis = make_incidents()
+        changed = type(arcgis).from_dict(arcgis.to_dict())
+        changed.units = feed.units
+
+        delta = diff_incidents([feed, arcgis], [changed, web])
+        self.assertEqual(delta.added, [web])
+        self.assertEqual(delta.removed, [feed])
+        self.assertEqual(delta.updated, [changed])
+        self.assertEqual(delta.churn, 3)
+
+        self.assertFalse(diff_incidents([feed, web], [web, feed]))
+
+
+class PollerTest(IsolatedAsyncioTestCase):
+    async def test_adapts_to_churn(self):
+        feed, web, arcgis = make_incidents()
+        client = ScriptedClient([[feed], [feed, web], [feed, web], [feed, web]])
+        poller = Poller(client, interval=40, min_interval=10, max_interval=100)
+
+        result = await poller.poll_once()
+        self.assertEqual(result.delta.added, [feed])
+        self.assertEqual(poller.interval, 20)
+
+        await poller.poll_once()
+        self.assertEqual(poller.interval, 10)
+
+        # idle polls slow down until the maximum
+        for _ in range(20):
+            result = await poller.poll_once()
+        self.assertFalse(result.delta)
+        self.assertEqual(poller.interval, 100)
+
+    async def test_respects_client_minimum(self):
+        client = ScriptedClient([[]])
+        client.MIN_POLL_INTERVAL = 15
+        poller = Poller(client, interval=1, min_interval=5, jitter=0.5)
+        self.assertEqual(poller.min_interval, 15)
+        for _ in range(10):
+            self.assertGreaterEqual(poller.next_sleep(), 15)
+
+    async def test_per_source_minimums(self):
+        for client, minimum in [
+            (FeedClient(), 30),
+            (WebClient(), 15),
+            (ArcGISClient(), 30),
+        ]:
+            with self.subTest(client=client.name):
+                self.assertEqual(client.MIN_POLL_INTERVAL, minimum)
+                poller = Poller(client, interval=1, min_interval=5)
+                self.assertEqual(poller.min_interval, minimum)
+                self.assertEqual(poller.interval, minimum)
+
+        # callers can raise the minimum of a single client
+        client = WebClient()
+        client.MIN_POLL_INTERVAL = 45
+        self.assertEqual(Poller(client).min_interval, 45)
+        self.assertEqual(Poller(WebClient()).min_interval, 15)
+
+    async def test_subscribers(self):
+        feed, web, _ = make_incidents()
+        poller = Poller(ScriptedClient([[feed], [web]]))
+        received = []
+
+        async def on_async(result):
+            received.append(("async", result.delta.churn))
+
+        unsubscribe = poller.subscribe(on_async)
+        poller.subscribe(
+            lambda result: received.append(("sync", len(result.incidents)))
+        )
+
+        await poller.poll_once()
+        unsubscribe()
+        await poller.poll_once()
+
+        self.assertEqual(received, [("async", 1), ("sync", 1), ("sync", 1)])
+
+    async def test_run_and_stop(self):
+        feed = make_incidents()[0]
+        client = ScriptedClient([RuntimeError("upstream down"), [feed]])
+        poller = Poller(client, interval=0.01, max_interval=0.01, jitter=0)
+        results = []
+        poller.subscribe(results.append)
+
+        poller.start()
+        while not results:
+            await asyncio.sleep(0.01)
+        await poller.stop()
+
+        # the failed poll didn't stop the loop
+        self.assertGreaterEqual(client.calls, 2)
+        self.assertEqual(poller.incidents, [feed])
+        self.assertIsInstance(results[0].timestamp, datetime.datetime)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import asyncio
+import os
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from lcwc.feed import FeedClient
+from lcwc.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenException,
+    HTTPStatusException,
+    Resilience,
+    RetryBudget,
+    RetryPolicy,
+    parse_retry_after,
+)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ResiliencePolicyTest(unittest.TestCase):
+    def test_backoff(self):
+        policy = RetryPolicy(base_delay=1, multiplier=2, max_delay=5, jitter=False)
+        self.assertEqual([policy.delay(n) for n in range(1, 6)], [1, 2, 4, 5, 5])
+
+        policy.jitter = True
+        for n in range(1, 6):
+            self.assertLessEqual(policy.delay(n), 5)
+
+        # the upstream's Retry-After wins when it asks for longer
+        self.assertEqual(policy.delay(1, retry_after=8), 8)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("120"), 120)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+
+    def test_budget(self):
+        budget = RetryBudget(ratio=0.5, max_tokens=2)
+        self.assertTrue(budget.withdraw())
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        budget.deposit()
+        self.assertTrue(budget.withdraw())
+
+    def test_circuit_breaker(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            "host", failure_threshold=2, recovery_timeout=10, clock=clock
+        )
+
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenException):
+            breaker.before_request()
+
+        # a single trial request is let through once the timeout passes
+        clock.now = 10
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        breaker.before_request()
+        with self.assertRaises(CircuitOpenException):
+            breaker.before_request()
+
+        # a failed trial reopens the circuit
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        clock.now = 20
+        breaker.before_request()
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class ResilienceClientTest(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        with open(os.path.join(FIXTURES, "feed.xml"), "rb") as f:
+            feed = f.read()
+
+        self.requests = 0
+        self.statuses = []
+
+        async def handler(request):
+            self.requests += 1
+            if self.statuses:
+                return web.Response(
+                    status=self.statuses.pop(0), headers={"Retry-After": "0"}
+                )
+            return web.Response(body=feed)
+
+        app = web.Application()
+        app.router.add_get("/feed", handler)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+        self.resilience = Resilience(
+            RetryPolicy(max_attempts=3, base_delay=0), failure_threshold=3
+        )
+        self.client = FeedClient(resilience=self.resilience)
+        self.client.URL = str(self.server.make_url("/feed"))
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+
+    async def test_retry_transient(self):
+        self.statuses = [503, 429]
+        incidents = await self.client.get_incidents()
+        self.assertEqual(len(incidents), 6)
+        self.assertEqual(self.requests, 3)
+
+    async def test_no_retry_client_error(self):
+        self.statuses = [404]
+        with self.assertRaises(HTTPStatusException) as cm:
+            await self.client.get_incidents()
+        self.assertEqual(cm.exception.status, 404)
+        self.assertEqual(self.requests, 1)
+
+    async def test_circuit_opens(self):
+        self.statuses = [503] * 9
+        for calls in range(1, 4):
+            with self.assertRaises(HTTPStatusException):
+                await self.client.get_incidents()
+            self.assertEqual(self.requests, 3 * calls)
+
+            # retries within a call only count as one failure
+            breaker = self.resilience.breaker(self.server.host)
+            self.assertEqual(breaker.failures, calls)
+
+        # the upstream is not contacted while the circuit is open
+        with self.assertRaises(CircuitOpenException):
+            await self.client.get_incidents()
+        self.assertEqual(self.requests, 9)
+
+    async def test_cancelled_trial_is_released(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            "host", failure_threshold=1, recovery_timeout=10, clock=clock
+        )
+        self.resilience.breakers["host"] = breaker
+        breaker.record_failure()
+        clock.now = 10
+
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.sleep(60)
+
+        trial = asyncio.ensure_future(self.resilience.call("host", hang))
+        await started.wait()
+        trial.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await trial
+
+        # the next call is let through as a new trial and closes the circuit
+        async def ok():
+            return "ok"
+
+        self.assertEqual(await self.resilience.call("host", ok), "ok")
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+if __name__ == "__main__":
+    unittest.main()
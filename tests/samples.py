@@ -0,0 +1,75 @@
+import datetime
+
+from lcwc.agencies.agencyresolver import AgencyResolver
+from lcwc.arcgis import ArcGISIncident
+from lcwc.arcgis.incident import Coordinates
+from lcwc.category import IncidentCategory
+from lcwc.client import Client
+from lcwc.feed import FeedIncident
+from lcwc.utils.unitparser import UnitParser
+from lcwc.web import WebIncident
+
+""" Sample incidents shared by the offline tests """
+
+
+def make_incidents() -> list:
+    resolver = AgencyResolver()
+    date = datetime.datetime(2023, 1, 25, 15, 22, tzinfo=datetime.timezone.utc)
+    units = [
+        UnitParser.parse_unit("MEDIC 56-1", IncidentCategory.MEDICAL, resolver),
+        UnitParser.parse_unit("AMB891CHE", IncidentCategory.MEDICAL, resolver),
+    ]
+    return [
+        FeedIncident(
+            IncidentCategory.MEDICAL,
+            date,
+            "MEDICAL EMERGENCY",
+            "MARTIC TOWNSHIP",
+            "BRIDGE VALLEY RD & LAKE ALDRED TER",
+            units,
+            "792d7e14-34ef-4907-bb50-86c43cd3d570",
+        ),
+        WebIncident(
+            IncidentCategory.FIRE,
+            date,
+            "BUILDING FIRE",
+            "EAST HEMPFIELD TOWNSHIP",
+            None,
+            [UnitParser.parse_unit("ENGINE 6-1", IncidentCategory.FIRE, resolver)],
+        ),
+        ArcGISIncident(
+            IncidentCategory.TRAFFIC,
+            date,
+            "VEHICLE ACCIDENT-NO INJURIES",
+            "MANHEIM TOWNSHIP",
+            "FRUITVILLE PIKE & RED ROSE CIR",
+            [],
+            230012345,
+            2,
+            "57",
+            True,
+            Coordinates(-76.28, 40.07),
+        ),
+    ]
+
+
+class ScriptedClient(Client):
+    """Returns a scripted sequence of polls, repeating the last one"""
+
+    MIN_POLL_INTERVAL = 0
+
+    def __init__(self, polls: list) -> None:
+        super().__init__()
+        self.polls = polls
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return "ScriptedClient"
+
+    async def get_incidents(self, session=None) -> list:
+        poll = self.polls[min(self.calls, len(self.polls) - 1)]
+        self.calls += 1
+        if isinstance(poll, Exception):
+            raise poll
+        return poll
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from lcwc.server import IncidentServer
+from lcwc.utils.encoding import from_tagged_dict
+from samples import ScriptedClient, make_incidents
+
+
+class ServerTest(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.feed, self.web, self.arcgis = make_incidents()
+        self.source = ScriptedClient([[self.feed], [self.feed, self.arcgis]])
+        self.server = IncidentServer([self.source], interval=0.05)
+        self.http = TestClient(TestServer(self.server.create_app()))
+        await self.http.start_server()
+
+        # stop the background poller so the tests drive polls themselves
+        for poller in self.server.pollers:
+            await poller.stop()
+        self.poller = self.server.pollers[0]
+        self.poller.incidents = []
+        self.source.calls = 0
+
+    async def asyncTearDown(self):
+        await self.http.close()
+
+    async def test_incidents_etag(self):
+        await self.poller.poll_once()
+
+        resp = await self.http.get("/incidents")
+        self.assertEqual(resp.status, 200)
+        body = await resp.json()
+        self.assertEqual(body[0]["guid"], self.feed.guid)
+        self.assertEqual(body[0]["_type"], "FeedIncident")
+
+        etag = resp.headers["ETag"]
+        resp = await self.http.get("/incidents", headers={"If-None-Match": etag})
+        self.assertEqual(resp.status, 304)
+
+        await self.poller.poll_once()
+        resp = await self.http.get("/incidents", headers={"If-None-Match": etag})
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(len(await resp.json()), 2)
+
+    async def test_incidents_source(self):
+        resp = await self.http.get("/incidents", params={"source": "Nope"})
+        self.assertEqual(resp.status, 404)
+
+        resp = await self.http.get("/incidents", params={"source": "ScriptedClient"})
+        self.assertEqual(resp.status, 200)
+
+    async def test_stream(self):
+        resp = await self.http.get("/stream", params={"category": "Traffic"})
+        self.assertEqual(resp.headers["Content-Type"], "text/event-stream")
+
+        await self.poller.poll_once()
+        await self.poller.poll_once()
+
+        event = await asyncio.wait_for(resp.content.readuntil(b"\n\n"), 5)
+        lines = event.decode().splitlines()
+        self.assertEqual(lines[0], "event: delta")
+        data = json.loads(lines[1][len("data: ") :])
+        self.assertEqual(data["source"], "ScriptedClient")
+        # only the traffic incident matches the filter
+        self.assertEqual([i["number"] for i in data["added"]], [self.arcgis.number])
+        # and it decodes like the snapshot
+        self.assertEqual([from_tagged_dict(i) for i in data["added"]], [self.arcgis])
+        resp.close()
+
+    async def test_stream_bad_category(self):
+        resp = await self.http.get("/stream", params={"category": "Nope"})
+        self.assertEqual(resp.status, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
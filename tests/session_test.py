@@ -0,0 +1,72 @@
+import os
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from lcwc.feed import FeedClient, FeedIncident
+from lcwc.utils.session import DEFAULT_KEEPALIVE_TIMEOUT, create_session
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class SessionTest(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        with open(os.path.join(FIXTURES, "feed.xml"), "rb") as f:
+            feed = f.read()
+
+        self.peers = set()
+
+        async def handler(request):
+            self.peers.add(request.transport.get_extra_info("peername"))
+            return web.Response(body=feed, content_type="application/rss+xml")
+
+        app = web.Application()
+        app.router.add_get("/feed", handler)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.url = str(self.server.make_url("/feed"))
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_owned_session(self):
+        async with FeedClient() as client:
+            client.URL = self.url
+            session = client.session
+            self.assertIsNotNone(session)
+            self.assertEqual(
+                session.connector._keepalive_timeout, DEFAULT_KEEPALIVE_TIMEOUT
+            )
+
+            incidents = await client.get_incidents()
+            self.assertIsInstance(incidents[0], FeedIncident)
+
+        self.assertTrue(session.closed)
+        self.assertIsNone(client.session)
+
+    async def test_shared_session(self):
+        async with create_session() as session:
+            async with FeedClient(session=session) as client:
+                client.URL = self.url
+                await client.get_incidents()
+                await client.get_incidents()
+
+            # the caller's session is left open
+            self.assertFalse(session.closed)
+
+            # both polls went over the same pooled connection
+            self.assertEqual(len(self.peers), 1)
+
+    async def test_explicit_session(self):
+        client = FeedClient()
+        client.URL = self.url
+        async with create_session() as session:
+            incidents = await client.get_incidents(session)
+            self.assertEqual(len(incidents), 6)
+        self.assertIsNone(client.session)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import datetime
+import io
+import unittest
+
+from lcwc.agencies.agencyresolver import AgencyResolver
+from lcwc.category import IncidentCategory
+from lcwc.delta import IncidentDelta
+from lcwc.poller import PollResult
+from lcwc.stats import AgencyStats, RingCounter
+from lcwc.utils.encoding import dump_ndjson, iter_ndjson
+from lcwc.utils.unitparser import UnitParser
+from lcwc.web import WebIncident
+from samples import ScriptedClient
+
+START = datetime.datetime(2023, 1, 25, 15, 0, tzinfo=datetime.timezone.utc)
+HOUR = datetime.timedelta(hours=1)
+
+
+class RingCounterTest(unittest.TestCase):
+    def test_rolling_window(self):
+        counter = RingCounter(bucket_seconds=60, buckets=10)
+        for minute in range(15):
+            counter.add(minute * 60 + 1)
+
+        now = 14 * 60 + 30
+        # only the last ten minutes survive the wrap-around
+        self.assertEqual(counter.total(now, 3600), 10)
+        # buckets partly inside the window count in full
+        self.assertEqual(counter.total(now, 180), 4)
+
+        counter.add(0)  # older than the ring, ignored
+        self.assertEqual(counter.total(now, 3600), 10)
+
+        counter.maximum(now, 4)
+        counter.maximum(now, 2)
+        self.assertEqual(counter.peak(now, 60), 4)
+
+
+class AgencyStatsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        resolver = AgencyResolver()
+        self.engine = UnitParser.parse_unit(
+            "ENGINE 53-1", IncidentCategory.FIRE, resolver
+        )
+        self.truck = UnitParser.parse_unit("TRUCK 53", IncidentCategory.FIRE, resolver)
+        self.agency = self.engine.agency
+        self.client = ScriptedClient([])
+
+    def make_incident(self, hours: float, *units) -> WebIncident:
+        return WebIncident(
+            IncidentCategory.FIRE,
+            START + hours * HOUR,
+            "BUILDING FIRE",
+            "CONESTOGA TOWNSHIP",
+            f"MAIN ST & {hours} AVE",
+            list(units),
+        )
+
+    def poll(self, stats: AgencyStats, hours: float, **delta) -> None:
+        result = PollResult(
+            self.client, START + hours * HOUR, delta=IncidentDelta(**delta)
+        )
+        stats.update(result)
+
+    def test_live_updates(self):
+        stats = AgencyStats()
+        first = self.make_incident(0, self.engine)
+        second = self.make_incident(1, self.engine)
+
+        self.poll(stats, 0, added=[first])
+        # a second unit of the same agency isn't a second call
+        first.units = [self.engine, self.truck]
+        self.poll(stats, 0.5, updated=[first])
+        self.poll(stats, 1, added=[second])
+
+        now = START + 2 * HOUR
+        self.assertEqual(stats.call_volume(self.agency, now=now), 2)
+        self.assertEqual(stats.call_volume(self.agency, window=HOUR, now=now), 1)
+        self.assertEqual(
+            stats.call_volume(self.agency, IncidentCategory.MEDICAL, now=now), 0
+        )
+        self.assertEqual(stats.concurrent(self.agency), 2)
+        self.assertEqual(stats.peak_concurrent(self.agency, now=now), 2)
+
+        self.poll(stats, 1.5, removed=[first])
+        self.assertEqual(stats.concurrent(self.agency), 1)
+        self.assertEqual(stats.peak_concurrent(self.agency, now=now), 2)
+        self.assertEqual(stats.agencies(), {self.agency})
+
+    def test_busiest_hours(self):
+        stats = AgencyStats()
+        for hours in [0, 0.25, 0.5, 1, 24]:
+            stats.observe(self.make_incident(hours, self.engine), commit=False)
+
+        now = START + 25 * HOUR
+        # START is 10:00 in Lancaster
+        self.assertEqual(stats.busiest_hours(self.agency, now=now), [(10, 4), (11, 1)])
+        self.assertEqual(
+            stats.busiest_hours(self.agency, window=2 * HOUR, now=now), [(10, 1)]
+        )
+
+    def test_backfill(self):
+        archive = io.BytesIO()
+        incident = self.make_incident(0, self.engine)
+        # an archive holds every added or updated version of an incident
+        dump_ndjson([incident, incident, self.make_incident(3, self.engine)], archive)
+        archive.seek(0)
+
+        stats = AgencyStats()
+        self.assertEqual(stats.backfill(iter_ndjson(archive)), 3)
+        self.assertEqual(stats.call_volume(self.agency, now=START + 4 * HOUR), 2)
+        self.assertEqual(stats.concurrent(self.agency), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
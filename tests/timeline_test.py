@@ -0,0 +1,98 @@
+import datetime
+import unittest
+
+from lcwc.agencies.agencyresolver import AgencyResolver
+from lcwc.category import IncidentCategory
+from lcwc.poller import PollResult
+from lcwc.timeline import UnitTimeline
+from lcwc.utils.unitparser import UnitParser
+from samples import ScriptedClient, make_incidents
+
+START = datetime.datetime(2023, 1, 25, 15, 22, tzinfo=datetime.timezone.utc)
+
+
+def at(minutes: float) -> datetime.datetime:
+    return START + datetime.timedelta(minutes=minutes)
+
+
+class UnitTimelineTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = ScriptedClient([])
+        self.incidents = make_incidents()
+        self.feed, self.web, _ = self.incidents
+        self.medic = self.feed.units[0]
+
+    def poll(self, timeline: UnitTimeline, minutes: float, incidents: list) -> None:
+        timeline.update(PollResult(self.client, at(minutes), incidents))
+
+    def test_first_and_last_seen(self):
+        timeline = UnitTimeline()
+        self.poll(timeline, 0, self.incidents)
+        self.poll(timeline, 1, self.incidents)
+        self.assertEqual(timeline.open_count, 3)
+        self.assertIsNone(timeline.average_assigned_time())
+
+        # the ambulance clears after two minutes, the engine's incident closes after three
+        self.feed.units = [self.medic]
+        self.poll(timeline, 2, self.incidents)
+        self.poll(timeline, 3, [self.feed])
+
+        assignments = {a.unit: a for a in timeline.assignments()}
+        self.assertTrue(assignments["AMB891CHE"].cleared)
+        self.assertEqual(
+            assignments["AMB891CHE"].duration, datetime.timedelta(minutes=1)
+        )
+        self.assertEqual(assignments["ENGINE 6-1"].last_seen, at(2))
+        self.assertFalse(assignments["MEDIC 56-1"].cleared)
+        self.assertEqual(
+            assignments["MEDIC 56-1"].duration, datetime.timedelta(minutes=3)
+        )
+
+        self.assertEqual(
+            timeline.average_assigned_time(), datetime.timedelta(seconds=90)
+        )
+        self.assertEqual(len(timeline.assignments(self.web.key)), 1)
+
+    def test_average_per_agency(self):
+        resolver = AgencyResolver()
+        engine = UnitParser.parse_unit("ENGINE 53-1", IncidentCategory.FIRE, resolver)
+        self.assertIsNotNone(engine.agency)
+
+        timeline = UnitTimeline()
+        self.web.units = [engine]
+        self.poll(timeline, 0, [self.web])
+        self.poll(timeline, 10, [self.web])
+        self.poll(timeline, 11, [])
+
+        self.assertEqual(
+            timeline.average_assigned_time(engine.agency),
+            datetime.timedelta(minutes=10),
+        )
+        self.assertEqual(timeline.agency_stats()[engine.agency].count, 1)
+
+    def test_compaction(self):
+        timeline = UnitTimeline(retention=datetime.timedelta(minutes=30))
+        self.poll(timeline, 0, [self.web])
+        self.poll(timeline, 5, [])
+        self.assertEqual(len(timeline), 1)
+
+        # completed assignments past the window are dropped but still count in the averages
+        self.assertEqual(timeline.compact(at(40)), 1)
+        self.assertEqual(len(timeline), 0)
+        self.assertEqual(timeline.average_assigned_time(), datetime.timedelta(0))
+
+        # open assignments that stop being seen are completed by compaction
+        self.poll(timeline, 0, [self.feed])
+        timeline.compact(at(60))
+        self.assertEqual(timeline.open_count, 0)
+        self.assertEqual(sum(s.count for s in timeline.agency_stats().values()), 3)
+
+    def test_sources_are_independent(self):
+        timeline = UnitTimeline()
+        timeline.record("a", [self.web], at(0))
+        timeline.record("b", [], at(1))
+        self.assertEqual(timeline.open_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
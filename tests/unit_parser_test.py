@@ -0,0 +1,65 @@
+import unittest
+
+from lcwc.agencies.agency import Agency
+from lcwc.agencies.agencyresolver import AgencyResolver
+from lcwc.category import IncidentCategory
+from lcwc.utils.unitparser import UnitParser, UnitParserException
+
+NAMES = ["ENG61", "TRK6", "ENG131", "AMB891CHE", "ENGINE 6-1", "PENDING", "QRS 10"]
+
+
+class UnitParserTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.resolver = AgencyResolver()
+
+    def test_parse_units_matches_parse_unit(self):
+        units = UnitParser.parse_units(NAMES, IncidentCategory.FIRE, self.resolver)
+        for name in NAMES:
+            expected = UnitParser.parse_unit(name, IncidentCategory.FIRE, self.resolver)
+            self.assertEqual(units[name].__dict__, expected.__dict__)
+
+    def test_parse_units_dedupes(self):
+        names = ["ENG61", "", "ENG61", "TRK6", "ENG61"]
+        units = UnitParser.parse_units(names, IncidentCategory.FIRE, self.resolver)
+        self.assertEqual(list(units), ["ENG61", "TRK6"])
+
+        # incidents sharing a unit share the instance
+        first, second = [units[name] for name in ["ENG61", "ENG61"]]
+        self.assertIs(first, second)
+
+    def test_parse_units_errors(self):
+        errors = {}
+        units = UnitParser.parse_units(
+            ["ENG61", "???", "???"], IncidentCategory.FIRE, self.resolver, errors
+        )
+        self.assertEqual(list(units), ["ENG61"])
+        self.assertIsInstance(errors["???"], UnitParserException)
+
+        with self.assertRaises(UnitParserException):
+            UnitParser.parse_units(["???"], IncidentCategory.FIRE, self.resolver)
+
+    def test_station_index(self):
+        resolver = AgencyResolver(load_known=False)
+        agency = Agency(
+            category=IncidentCategory.FIRE,
+            station_number="99",
+            name="Test Fire Company",
+            url="",
+            address="",
+            city="Lancaster",
+            state="PA",
+            zip_code=17601,
+            phone="",
+        )
+        self.assertNotIn("99", resolver.get_station_index(IncidentCategory.FIRE))
+
+        resolver.add_agency(agency)
+        self.assertIs(resolver.get_station_index(IncidentCategory.FIRE)["99"], agency)
+        self.assertEqual(resolver.get_station_index(IncidentCategory.MEDICAL), {})
+
+        units = UnitParser.parse_units(["ENG991"], IncidentCategory.FIRE, resolver)
+        self.assertIs(units["ENG991"].agency, agency)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import gc
+import os
+import unittest
+
+from lcwc.agencies.agencyresolver import AgencyResolver
+from lcwc.category import IncidentCategory
+from lcwc.feed import FeedParser
+from lcwc.unit import Unit
+from lcwc.utils.unitparser import UnitParser
+from lcwc.utils.unitregistry import UnitRegistry
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class UnitRegistryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.registry = UnitRegistry()
+        self.resolver = AgencyResolver()
+
+    def test_interns_across_calls(self):
+        first = UnitParser.parse_unit(
+            "ENG61", IncidentCategory.FIRE, self.resolver, self.registry
+        )
+        second = UnitParser.parse_unit(
+            "ENG61", IncidentCategory.FIRE, self.resolver, self.registry
+        )
+        batch = UnitParser.parse_units(
+            ["ENG61"], IncidentCategory.FIRE, self.resolver, registry=self.registry
+        )
+        self.assertIs(first, second)
+        self.assertIs(batch["ENG61"], first)
+        self.assertIs(self.registry.get("ENG61", IncidentCategory.FIRE), first)
+
+        # the category is part of the identity
+        medical = UnitParser.parse_unit(
+            "ENG61", IncidentCategory.MEDICAL, self.resolver, self.registry
+        )
+        self.assertIsNot(medical, first)
+
+        unregistered = UnitParser.parse_unit(
+            "ENG61", IncidentCategory.FIRE, self.resolver, None
+        )
+        self.assertIsNot(unregistered, first)
+
+    def test_differing_units_replace(self):
+        first = self.registry.intern(Unit(full_name="ENG61"), IncidentCategory.FIRE)
+        other = self.registry.intern(
+            Unit(full_name="ENG61", station_id="06"), IncidentCategory.FIRE
+        )
+        self.assertIsNot(other, first)
+        self.assertIs(self.registry.get("ENG61", IncidentCategory.FIRE), other)
+
+    def test_units_are_held_weakly(self):
+        unit = self.registry.intern(Unit(full_name="ENG61"), IncidentCategory.FIRE)
+        self.assertEqual(len(self.registry), 1)
+        del unit
+        gc.collect()
+        self.assertEqual(len(self.registry), 0)
+
+    def test_polls_share_units(self):
+        with open(os.path.join(FIXTURES, "feed.xml"), "rb") as f:
+            feed = f.read()
+        parser = FeedParser()
+        first = parser.parse(feed, self.resolver)
+        second = parser.parse(feed, self.resolver)
+
+        for a, b in zip(first, second):
+            for unit_a, unit_b in zip(a.units, b.units):
+                self.assertIs(unit_a, unit_b)
+
+    def test_hashing(self):
+        units = {
+            Unit(full_name="ENG61"),
+            Unit(full_name="ENG61"),
+            Unit(full_name="TRK6"),
+        }
+        self.assertEqual(len(units), 2)
+
+        agencies = self.resolver.get_agencies(IncidentCategory.FIRE)[:3]
+        self.assertEqual(len(set(agencies + agencies)), len(set(agencies)))
+
+
+if __name__ == "__main__":
+    unittest.main()
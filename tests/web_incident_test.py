@@ -0,0 +1,104 @@
+import datetime
+import unittest
+
+import pytz
+
+from lcwc.category import IncidentCategory
+from lcwc.delta import diff_incidents
+from lcwc.incident import fingerprint
+from lcwc.unit import Unit
+from lcwc.web import WebIncident
+
+
+def make_incident(**kwargs) -> WebIncident:
+    fields = {
+        "category": IncidentCategory.FIRE,
+        "date": datetime.datetime(2023, 1, 25, 15, 18, tzinfo=datetime.timezone.utc),
+        "description": "FIRE ALARM",
+        "municipality": "EAST HEMPFIELD TOWNSHIP",
+        "intersection": "CENTERVILLE RD & STATE RD",
+        "units": [Unit(full_name="ENGINE 6-1")],
+    }
+    fields.update(kwargs)
+    return WebIncident(**fields)
+
+
+class WebIncidentTest(unittest.TestCase):
+    def test_fingerprint_is_stable(self):
+        incident = make_incident()
+        self.assertEqual(len(incident.fingerprint), 16)
+        self.assertEqual(incident.key, incident.fingerprint)
+
+        # seconds, time zones, case and whitespace don't matter
+        local = pytz.timezone("America/New_York").localize(
+            datetime.datetime(2023, 1, 25, 10, 18, 54)
+        )
+        same = make_incident(
+            date=local,
+            municipality="east hempfield  township",
+            description="FIRE ALARM - COMMERCIAL",
+            units=[],
+        )
+        self.assertEqual(same.fingerprint, incident.fingerprint)
+        self.assertEqual(same.key, incident.key)
+        # but equality still compares every field
+        self.assertNotEqual(same, incident)
+
+        for change in [
+            {"category": IncidentCategory.MEDICAL},
+            {"date": incident.date + datetime.timedelta(minutes=1)},
+            {"municipality": "MANOR TOWNSHIP"},
+            {"intersection": None},
+        ]:
+            with self.subTest(change=change):
+                self.assertNotEqual(make_incident(**change).key, incident.key)
+
+    def test_sets_and_dicts(self):
+        incidents = {
+            make_incident(),
+            make_incident(),
+            make_incident(intersection=None),
+        }
+        self.assertEqual(len(incidents), 2)
+        self.assertIn(make_incident(), {make_incident(): True})
+
+        # updates of the same incident share a key
+        by_key = {i.key: i for i in [make_incident(), make_incident(units=[])]}
+        self.assertEqual(list(by_key.values()), [make_incident(units=[])])
+
+    def test_matches_other_sources(self):
+        incident = make_incident()
+        self.assertEqual(
+            fingerprint(
+                incident.category,
+                incident.date.replace(second=2),
+                incident.municipality,
+                incident.intersection,
+            ),
+            incident.fingerprint,
+        )
+
+    def test_dict_round_trip(self):
+        incident = make_incident()
+        d = incident.to_dict()
+        self.assertNotIn("fingerprint", d)
+
+        decoded = WebIncident.from_dict(d)
+        self.assertEqual(decoded, incident)
+        self.assertNotEqual(
+            decoded, make_incident(description="FIRE ALARM - COMMERCIAL")
+        )
+
+    def test_diff_detects_unit_changes(self):
+        before = make_incident()
+        after = make_incident(
+            units=[Unit(full_name="ENGINE 6-1"), Unit(full_name="TRUCK 6")]
+        )
+
+        delta = diff_incidents([before], [after])
+        self.assertEqual(delta.updated, [after])
+        self.assertFalse(diff_incidents([before], [make_incident()]))
+
+
+if __name__ == "__main__":
+    unittest.main()
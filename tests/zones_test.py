@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+import unittest
+
+from lcwc.arcgis import ArcGISClient
+from lcwc.category import IncidentCategory
+from lcwc.utils.compact import CompactCodec
+from lcwc.zones import ZoneIndex, numpy
+from samples import make_incidents
+
+
+def square(x, y, size):
+    return [[x, y], [x + size, y], [x + size, y + size], [x, y + size], [x, y]]
+
+
+# a 3x3 grid of boxes with a hole in the middle of box 1-1 and an overlapping box on top
+GEOJSON = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "properties": {"name": "OVERLAP"},
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [square(-76.25, 40.05, 0.1)],
+            },
+        },
+    ]
+    + [
+        {
+            "type": "Feature",
+            "properties": {"name": f"BOX {col}-{row}"},
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [square(-76.5 + col * 0.2, 40.0 + row * 0.2, 0.2)]
+                + ([square(-76.25, 40.25, 0.1)] if (col, row) == (1, 1) else []),
+            },
+        }
+        for col in range(3)
+        for row in range(3)
+    ]
+    + [
+        {
+            "type": "Feature",
+            "id": "ISLANDS",
+            "properties": {},
+            "geometry": {
+                "type": "MultiPolygon",
+                "coordinates": [
+                    [square(-77.0, 41.0, 0.1)],
+                    [square(-76.8, 41.0, 0.1)],
+                ],
+            },
+        },
+        {
+            "type": "Feature",
+            "properties": {"name": "STATION"},
+            "geometry": {"type": "Point", "coordinates": [-76.3, 40.0]},
+        },
+    ],
+}
+
+POINTS = [
+    (-76.45, 40.05),  # BOX 0-0
+    (-76.2, 40.1),  # OVERLAP wins over BOX 1-0
+    (-76.2, 40.3),  # the hole of BOX 1-1
+    (-76.28, 40.22),  # BOX 1-1 around the hole
+    (-76.75, 41.05),  # the second island
+    (-76.9, 41.05),  # between the islands
+    (-80.0, 40.0),  # outside every zone
+]
+EXPECTED = ["BOX 0-0", "OVERLAP", None, "BOX 1-1", "ISLANDS", None, None]
+
+
+class ZoneIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = ZoneIndex.from_geojson(GEOJSON)
+
+    def names(self, zones):
+        return [zone.name if zone is not None else None for zone in zones]
+
+    def test_from_geojson(self):
+        self.assertEqual(len(self.index), 11)  # the point feature is skipped
+        self.assertEqual(self.index.zones[-1].name, "ISLANDS")
+
+    def test_locate(self):
+        self.assertEqual(
+            self.names(self.index.locate(x, y) for x, y in POINTS), EXPECTED
+        )
+
+    def test_cell_size_does_not_change_results(self):
+        for cell_size in (0.01, 0.3, 10):
+            with self.subTest(cell_size=cell_size):
+                index = ZoneIndex(self.index.zones, cell_size)
+                self.assertEqual(
+                    self.names(index.locate_many(POINTS, vectorized=False)), EXPECTED
+                )
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_vectorized(self):
+        self.assertEqual(
+            self.names(self.index.locate_many(POINTS, vectorized=True)), EXPECTED
+        )
+
+    def test_from_path(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "zones.geojson")
+            with open(path, "w") as f:
+                json.dump(GEOJSON, f)
+            self.assertEqual(len(ZoneIndex.from_geojson(path)), 11)
+
+        with self.assertRaises(ValueError):
+            ZoneIndex.from_geojson({"type": "Feature"})
+
+    def test_client_assigns_zones_by_category(self):
+        incident = make_incidents()[2]
+        self.assertIsNone(incident.zone)
+
+        client = ArcGISClient(zone_index={IncidentCategory.FIRE: self.index})
+        client.assign_zones(incident.category, [incident])
+        self.assertIsNone(incident.zone)
+
+        client = ArcGISClient(zone_index=self.index)
+        client.assign_zones(incident.category, [incident])
+        self.assertEqual(incident.zone, "BOX 1-0")
+
+        codec = CompactCodec()
+        decoded = codec.decode(codec.encode([incident]))
+        self.assertEqual(decoded[0].zone, "BOX 1-0")
+
+
+if __name__ == "__main__":
+    unittest.main()